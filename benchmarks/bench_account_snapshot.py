@@ -0,0 +1,119 @@
+"""
+Benchmark de carga de cuentas: CSV contra snapshot binario (memory-mapping).
+
+Por tamaño de tabla, mide en un proceso nuevo para cada modo (como un worker
+recién arrancado) el tiempo de carga, el RSS tras la carga y tras --queries
+consultas de balance, y el pico de RSS:
+
+- csv-pandas    pd.read_csv + DataFrame + índice hash
+- csv-columnar  pd.read_csv completo + almacén columnar
+- csv-chunked   pd.read_csv por bloques (ACCOUNT_CSV_CHUNK_ROWS) + almacén columnar
+- snapshot      almacén columnar abierto desde el snapshot (np.load mmap)
+
+El snapshot se mide con el caché de páginas caliente (recién escrito): es
+el caso de varios workers en una misma máquina.
+
+Uso:
+    python benchmarks/bench_account_snapshot.py --sizes 1000000 10000000
+"""
+
+import argparse
+import json
+import logging
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench_csv_lookup import generate_csv
+
+from src.account_snapshot import source_stat, write_snapshot
+from src.csv_query import CSVQueryManager
+
+MODES = {
+    "csv-pandas": {"backend": "pandas", "snapshot": False},
+    "csv-columnar": {"backend": "columnar", "snapshot": False, "chunk_rows": 0},
+    "csv-chunked": {"backend": "columnar", "snapshot": False},
+    "snapshot": {"backend": "columnar", "snapshot": True},
+}
+
+
+def proc_status_mb(field: str) -> float:
+    """Campo de memoria de /proc/self/status (VmRSS, VmHWM) en MiB."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def child(mode: str, csv_path: Path, queries: int) -> None:
+    """Carga las cuentas en este proceso e imprime las mediciones como JSON."""
+    logging.disable(logging.WARNING)
+    rng = random.Random(0)
+    with open(csv_path, encoding="utf-8") as f:
+        next(f)
+        cedulas = [line.split(",", 1)[0] for line, _ in zip(f, range(100_000))]
+
+    start_time = time.perf_counter()
+    manager = CSVQueryManager(csv_path, **MODES[mode])
+    load_seconds = time.perf_counter() - start_time
+    rss_loaded = proc_status_mb("VmRSS")
+
+    for _ in range(queries):
+        manager.get_balance_by_cedula(rng.choice(cedulas))
+
+    print(json.dumps({
+        "loaded_from": manager.loaded_from,
+        "load_seconds": load_seconds,
+        "rss_loaded": rss_loaded,
+        "rss_queried": proc_status_mb("VmRSS"),
+        # ru_maxrss sobrevive al exec del proceso padre: VmHWM es solo de este proceso
+        "max_rss": proc_status_mb("VmHWM"),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--queries", type=int, default=10_000)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "CSV"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], Path(args.child[1]), args.queries)
+        return
+
+    logging.disable(logging.WARNING)
+    print(
+        f"{'Filas':>11} {'Modo':<13} {'Carga (s)':>10} {'RSS carga':>10} "
+        f"{'RSS +consultas':>15} {'Pico RSS':>9}  (MiB)"
+    )
+    print("─" * 80)
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "saldos.csv"
+            generate_csv(csv_path, size)
+            source = source_stat(csv_path)
+            write_snapshot(CSVQueryManager(csv_path, backend="columnar", snapshot=False).store, csv_path, source=source)
+
+            for mode in MODES:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--child", mode, str(csv_path), "--queries", str(args.queries)],
+                    capture_output=True, text=True, check=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                assert result["loaded_from"] == ("snapshot" if mode == "snapshot" else "csv")
+                print(
+                    f"{size:>11,} {mode:<13} {result['load_seconds']:>10.3f} "
+                    f"{result['rss_loaded']:>10.1f} {result['rss_queried']:>15.1f} "
+                    f"{result['max_rss']:>9.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
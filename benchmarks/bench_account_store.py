@@ -0,0 +1,88 @@
+"""
+Benchmark de memoria y latencia de los backends de cuentas.
+
+Compara, por tamaño de tabla, el backend "pandas" (DataFrame + índice hash)
+contra el "columnar" (cédulas int64 ordenadas, nombres en un buffer UTF-8,
+balances en centavos): tiempo de carga, memoria del almacén (medida con
+tracemalloc tras la carga) y su pico durante la carga, latencia p50/p99 de
+get_balance_by_cedula y de search_by_name.
+
+Uso:
+    python benchmarks/bench_account_store.py --sizes 100000 1000000
+"""
+
+import argparse
+import gc
+import logging
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench_csv_lookup import generate_csv, measure
+
+from src.account_store import ACCOUNT_STORE_BACKENDS
+from src.csv_query import CSVQueryManager
+
+
+def run(csv_path: Path, n_rows: int, backend: str, cedulas: list, n_queries: int) -> None:
+    # tracemalloc enlentece las asignaciones: la carga se cronometra aparte
+    start_time = time.perf_counter()
+    CSVQueryManager(csv_path, backend=backend)
+    load_seconds = time.perf_counter() - start_time
+
+    gc.collect()
+    tracemalloc.start()
+    manager = CSVQueryManager(csv_path, backend=backend)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    queries = cedulas[:n_queries] + ["V-1"] * (n_queries // 10)
+    random.Random(0).shuffle(queries)
+    lookup = measure(manager.get_balance_by_cedula, queries)
+
+    # La primera búsqueda por nombre construye estructuras auxiliares
+    manager.search_by_name("cliente 1")
+    search = measure(manager.search_by_name, ["cliente 12345", "CLIENTE 9", "no existe"] * 3)
+
+    print(
+        f"{n_rows:>10,} {backend:<9} {load_seconds:>8.2f} {current / 2**20:>10.1f} "
+        f"{peak / 2**20:>10.1f} {current / n_rows:>8.1f} {lookup['p50']:>9.1f} "
+        f"{lookup['p99']:>9.1f} {search['p50'] / 1000:>11.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument(
+        "--backends", nargs="+", choices=ACCOUNT_STORE_BACKENDS, default=list(ACCOUNT_STORE_BACKENDS)
+    )
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    print(
+        f"{'Filas':>10} {'Backend':<9} {'Carga(s)':>8} {'Mem (MiB)':>10} {'Pico (MiB)':>10} "
+        f"{'B/cuenta':>8} {'p50 (µs)':>9} {'p99 (µs)':>9} {'Nombre(ms)':>11}"
+    )
+    print("─" * 94)
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "saldos.csv"
+            generate_csv(csv_path, size)
+            with open(csv_path, encoding="utf-8") as f:
+                next(f)
+                cedulas = [line.split(",", 1)[0] for line, _ in zip(f, range(args.queries))]
+            for backend in args.backends:
+                run(csv_path, size, backend, cedulas, args.queries)
+
+
+if __name__ == "__main__":
+    main()
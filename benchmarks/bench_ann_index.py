@@ -0,0 +1,139 @@
+"""
+Benchmark de índices FAISS aproximados: recall@k vs. latencia.
+
+Genera un corpus sintético de vectores agrupados en clusters (parecido a la
+distribución de embeddings reales, a diferencia de ruido uniforme), obtiene
+los vecinos exactos con el índice flat y para cada tipo de índice
+(IVF-Flat, HNSW, IVF-PQ) mide el tiempo de construcción, la memoria del
+índice y el recall@k / latencia por consulta con distintos nprobe/efSearch.
+
+Los índices se construyen de a uno para no multiplicar la memoria pico.
+
+Uso:
+    python benchmarks/bench_ann_index.py --size 1000000 --dim 384 --queries 1000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.knowledge_base import build_faiss_index, set_search_params
+
+SWEEPS = {
+    "ivf_flat": ("nprobe", [1, 4, 16, 64]),
+    "hnsw": ("efSearch", [16, 64, 128, 256]),
+    "ivf_pq": ("nprobe", [1, 4, 16, 64]),
+}
+
+
+def synthetic_corpus(
+    size: int, centroids: np.ndarray, rng: np.random.Generator, spread: float = 0.25
+) -> np.ndarray:
+    """Vectores normalizados alrededor de los centroides dados."""
+    dim = centroids.shape[1]
+    corpus = np.empty((size, dim), dtype=np.float32)
+    step = 100_000
+    for start in range(0, size, step):
+        end = min(start + step, size)
+        assignment = rng.integers(0, len(centroids), end - start)
+        noise = rng.standard_normal((end - start, dim)).astype(np.float32)
+        corpus[start:end] = centroids[assignment] + spread * noise
+    faiss.normalize_L2(corpus)
+    return corpus
+
+
+def index_memory_mb(index: faiss.Index) -> float:
+    """Tamaño del índice en disco en MB (sin copiarlo en memoria)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.faiss")
+        faiss.write_index(index, path)
+        return os.path.getsize(path) / 1e6
+
+
+def timed_search(index: faiss.Index, queries: np.ndarray, k: int):
+    """Busca consulta por consulta (como en producción) y retorna (ids, µs/consulta)."""
+    found = np.empty((len(queries), k), dtype=np.int64)
+    start_time = time.perf_counter()
+    for i in range(len(queries)):
+        _, found[i] = index.search(queries[i : i + 1], k)
+    elapsed = time.perf_counter() - start_time
+    return found, elapsed / len(queries) * 1e6
+
+
+def recall_at_k(expected: np.ndarray, found: np.ndarray) -> float:
+    k = expected.shape[1]
+    hits = sum(len(set(e) & set(f)) for e, f in zip(expected, found))
+    return hits / (len(expected) * k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--size", type=int, default=1_000_000, help="Vectores del corpus")
+    parser.add_argument("--dim", type=int, default=384, help="Dimensión (all-MiniLM-L6-v2: 384)")
+    parser.add_argument("--queries", type=int, default=1000, help="Consultas a medir")
+    parser.add_argument("-k", type=int, default=4, help="Vecinos por consulta")
+    parser.add_argument("--clusters", type=int, default=2000, help="Clusters del corpus sintético")
+    parser.add_argument("--nlist", type=int, default=1024, help="Listas invertidas (IVF)")
+    parser.add_argument("--pq-m", type=int, default=48, help="Subvectores por código (PQ)")
+    parser.add_argument("--train-size", type=int, default=100_000, help="Vectores de entrenamiento")
+    parser.add_argument(
+        "--types",
+        nargs="+",
+        default=list(SWEEPS),
+        choices=list(SWEEPS),
+        help="Índices a comparar",
+    )
+    args = parser.parse_args()
+
+    print(f"Generando corpus sintético: {args.size:,} x {args.dim}...")
+    rng = np.random.default_rng(0)
+    centroids = rng.standard_normal((args.clusters, args.dim)).astype(np.float32)
+    corpus = synthetic_corpus(args.size, centroids, rng)
+    queries = synthetic_corpus(args.queries, centroids, rng)
+    training = corpus[rng.choice(args.size, min(args.train_size, args.size), replace=False)]
+
+    flat = build_faiss_index("flat", training)
+    flat.add(corpus)
+    _, expected = flat.search(queries, args.k)
+    _, flat_latency = timed_search(flat, queries, args.k)
+    flat_memory = index_memory_mb(flat)
+    del flat
+
+    print(f"\n{'Índice':<10} {'Parámetro':<14} {'Recall@' + str(args.k):>9} "
+          f"{'µs/consulta':>12} {'Speedup':>8} {'Build (s)':>10} {'MB':>8}")
+    print("─" * 76)
+    print(f"{'flat':<10} {'-':<14} {1.0:>9.3f} {flat_latency:>12.0f} {1.0:>7.1f}x "
+          f"{'-':>10} {flat_memory:>8.0f}")
+
+    for index_type in args.types:
+        start_time = time.perf_counter()
+        index = build_faiss_index(index_type, training, nlist=args.nlist, pq_m=args.pq_m)
+        index.add(corpus)
+        build_time = time.perf_counter() - start_time
+        memory = index_memory_mb(index)
+
+        param_name, values = SWEEPS[index_type]
+        for value in values:
+            if param_name == "nprobe":
+                set_search_params(index, nprobe=value)
+            else:
+                set_search_params(index, ef_search=value)
+            found, latency = timed_search(index, queries, args.k)
+            print(
+                f"{index_type:<10} {f'{param_name}={value}':<14} "
+                f"{recall_at_k(expected, found):>9.3f} {latency:>12.0f} "
+                f"{flat_latency / latency:>7.1f}x {build_time:>10.1f} {memory:>8.0f}"
+            )
+        del index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark de throughput del modo batch según el número de workers.
+
+Reemplaza los clientes de OpenAI y la base de conocimientos por un LLM falso
+local con latencia fija, de modo que el resultado refleje únicamente la
+concurrencia del pipeline y no la red.
+
+Uso:
+    python benchmarks/bench_batch_workers.py --queries 200 --latency 0.2 --workers 1 4 16
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.agent import CustomerServiceAgent
+from src.main import batch_mode
+
+SAMPLE_QUERIES = [
+    "Balance V-12345678",
+    "¿Cómo abrir una cuenta de ahorros?",
+    "Hola, buenos días",
+    "Consultar saldo V-91827364",
+    "¿Qué hora es?",
+]
+
+
+class FakeKnowledgeChain:
+    """Chain RetrievalQA falso con la misma latencia que el LLM."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def invoke(self, inputs: dict) -> dict:
+        time.sleep(self.latency)
+        return {"result": "Respuesta simulada", "source_documents": []}
+
+
+def build_fake_agent(latency: float) -> CustomerServiceAgent:
+    """Crea un CustomerServiceAgent con LLM y base de conocimientos falsos."""
+
+    def fake_llm(*args, **kwargs):
+        return FakeListChatModel(responses=["general"], sleep=latency)
+
+    def fake_chain(agent):
+        return FakeKnowledgeChain(latency)
+
+    with patch("langchain_openai.ChatOpenAI", fake_llm), patch(
+        "src.knowledge_base.KnowledgeBaseManager"
+    ), patch(
+        "src.agent.SEMANTIC_CACHE_ENABLED", False
+    ), patch("src.agent.INTENT_CLASSIFIER_ENABLED", False), patch.object(
+        CustomerServiceAgent, "_build_knowledge_chain", fake_chain
+    ):
+        # Inicializar dentro de los patches (los componentes son lazy)
+        agent = CustomerServiceAgent()
+        agent.warmup()
+        return agent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2, help="Segundos por llamada")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    # src.main configura logging al importarse: silenciarlo para el benchmark
+    logging.getLogger().setLevel(logging.ERROR)
+    queries = (SAMPLE_QUERIES * (args.queries // len(SAMPLE_QUERIES) + 1))[: args.queries]
+
+    for workers in args.workers:
+        agent = build_fake_agent(args.latency)
+        with patch("src.main.CustomerServiceAgent", return_value=agent):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = batch_mode(queries, workers=workers)
+            elapsed = time.perf_counter() - start
+
+        assert [r["query"] for r in results] == queries
+        assert agent.get_statistics()["total_queries"] == len(queries)
+        print(
+            f"workers={workers:>3} | {elapsed:7.2f}s | "
+            f"{len(queries) / elapsed:8.2f} consultas/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark de chunking: tokens de prompt y latencia de recuperación.
+
+Construye el índice con documentos completos (sin chunking) y con chunks de
+distintos tamaños, y para un conjunto de consultas mide los tokens del
+contexto que se inyecta en el prompt de GPT-4 (chain "stuff" con k
+documentos) y la latencia de búsqueda en FAISS.
+
+Por defecto usa embeddings deterministas falsos para poder correr sin
+descargar modelos (la relevancia no es representativa, pero el tamaño del
+prompt sí lo es); con --hf usa el modelo de embeddings configurado.
+
+Uso:
+    python benchmarks/bench_chunking.py --repeat 20 --chunk-sizes 300 500 1000
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.config import CHUNK_OVERLAP, EMBEDDINGS_MODEL_NAME, KNOWLEDGE_BASE_DIR, RETRIEVER_K
+from src.knowledge_base import KnowledgeBaseManager
+
+QUERIES = [
+    "¿Cómo abrir una cuenta de ahorros?",
+    "¿Qué requisitos necesito para una tarjeta de crédito?",
+    "¿Cómo hago una transferencia a otro banco?",
+    "¿Cuánto tarda la aprobación de la tarjeta?",
+]
+
+
+def load_token_counter():
+    """
+    Retorna una función que cuenta tokens con tiktoken (cl100k_base). Si la
+    codificación no está disponible (sin red), estima 4 caracteres por token.
+    """
+    try:
+        import tiktoken
+
+        encoder = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoder.encode(text))
+    except Exception:
+        print("⚠️  tiktoken no disponible: tokens estimados como caracteres/4")
+        return lambda text: len(text) / 4
+
+
+def build_corpus(target: Path, repeat: int) -> None:
+    """Genera documentos largos repitiendo las secciones de la KB real."""
+    target.mkdir(parents=True)
+    for path in KNOWLEDGE_BASE_DIR.glob("*.txt"):
+        text = path.read_text(encoding="utf-8")
+        (target / path.name).write_text("\n\n".join([text] * repeat), encoding="utf-8")
+
+
+def run(kb_dir: Path, index_dir: Path, embeddings, chunk_size, count_tokens) -> dict:
+    kb = KnowledgeBaseManager(
+        index_path=index_dir,
+        knowledge_base_path=kb_dir,
+        embeddings=embeddings,
+        chunk_size=chunk_size,
+        chunk_overlap=CHUNK_OVERLAP,
+    )
+
+    tokens, latencies = [], []
+    for query in QUERIES:
+        start = time.perf_counter()
+        docs = kb.search(query, k=RETRIEVER_K)
+        latencies.append((time.perf_counter() - start) * 1000)
+        context = "\n\n".join(doc.page_content for doc in docs)
+        tokens.append(count_tokens(context))
+
+    return {
+        "vectors": kb.vectorstore.index.ntotal,
+        "tokens": float(np.mean(tokens)),
+        "latency_ms": float(np.median(latencies)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20, help="Secciones por documento")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[300, 500, 1000])
+    parser.add_argument("--hf", action="store_true", help="Usar embeddings reales")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    count_tokens = load_token_counter()
+
+    if args.hf:
+        from langchain_community.embeddings.huggingface import HuggingFaceEmbeddings
+
+        embeddings = HuggingFaceEmbeddings(model_name=EMBEDDINGS_MODEL_NAME)
+    else:
+        embeddings = DeterministicFakeEmbedding(size=384)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        kb_dir = Path(tmp) / "kb"
+        build_corpus(kb_dir, args.repeat)
+
+        baseline = run(kb_dir, Path(tmp) / "index-full", embeddings, None, count_tokens)
+        print(
+            f"{'sin chunking':>14} | vectores={baseline['vectors']:>5} | "
+            f"tokens de contexto={baseline['tokens']:>8.0f} | "
+            f"búsqueda p50={baseline['latency_ms']:.2f}ms"
+        )
+
+        for size in args.chunk_sizes:
+            result = run(kb_dir, Path(tmp) / f"index-{size}", embeddings, size, count_tokens)
+            print(
+                f"{f'chunk={size}':>14} | vectores={result['vectors']:>5} | "
+                f"tokens de contexto={result['tokens']:>8.0f} | "
+                f"búsqueda p50={result['latency_ms']:.2f}ms | "
+                f"tokens -{(1 - result['tokens'] / baseline['tokens']) * 100:.0f}%"
+            )
+
+
+if __name__ == "__main__":
+    main()
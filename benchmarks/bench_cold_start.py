@@ -0,0 +1,135 @@
+"""
+Benchmark de arranque en frío por tipo de consulta.
+
+Para cada tipo de consulta lanza un proceso nuevo que crea el agente y
+procesa una única consulta, y mide el tiempo de inicialización del agente y
+el de la primera respuesta. Compara la inicialización lazy (default) con la
+eager (warmup() antes de la primera consulta, como haría un servidor).
+
+El LLM se reemplaza por uno falso sin latencia. Con --fake-embeddings (para
+correr sin red) el modelo de embeddings se reemplaza por uno determinista,
+pero se importa igual sentence_transformers/torch para contar su costo.
+
+Uso:
+    python benchmarks/bench_cold_start.py --fake-embeddings
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+QUERIES = {
+    "balance": "Balance de la cédula V-12345678",
+    "knowledge": "¿Cómo abrir una cuenta de ahorros?",
+    "general": "Hola, ¿qué servicios ofrecen?",
+}
+
+WORKER_CODE = """
+import json, logging, sys, time
+from unittest.mock import patch
+sys.path.insert(0, {root!r})
+logging.disable(logging.CRITICAL)
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+def fake_llm():
+    import langchain_openai  # Costo de importar el cliente real
+    return FakeListChatModel(responses=[{response!r}])
+
+def fake_embeddings(*args, **kwargs):
+    import sentence_transformers  # Costo de importar torch
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    return DeterministicFakeEmbedding(size=384)
+
+start_time = time.perf_counter()
+from src.agent import CustomerServiceAgent
+from src.router import QueryRouter
+import_time = time.perf_counter() - start_time
+
+# Los patches no deben importar de antemano los módulos que el agente difiere
+router_llm = []
+original_create_kb_manager = CustomerServiceAgent._create_kb_manager
+
+def create_kb_manager(self):
+    if not {fake_embeddings!r}:
+        return original_create_kb_manager(self)
+    import src.knowledge_base
+    with patch("src.knowledge_base.HuggingFaceEmbeddings", fake_embeddings):
+        return original_create_kb_manager(self)
+
+def get_router_llm(self):
+    if not router_llm:
+        router_llm.append(fake_llm())
+    return router_llm[0]
+
+patch.object(CustomerServiceAgent, "_create_llm", lambda self: fake_llm()).start()
+patch.object(CustomerServiceAgent, "_create_kb_manager", create_kb_manager).start()
+patch.object(QueryRouter, "llm", property(get_router_llm)).start()
+
+start_time = time.perf_counter()
+agent = CustomerServiceAgent()
+if {eager!r}:
+    agent.warmup()
+init_time = time.perf_counter() - start_time
+
+start_time = time.perf_counter()
+result = agent.process_query({query!r})
+query_time = time.perf_counter() - start_time
+
+print(json.dumps({{
+    "import_s": import_time,
+    "init_s": init_time,
+    "first_query_s": query_time,
+    "query_type": result["query_type"],
+    "components": sorted(agent.init_times),
+}}))
+"""
+
+
+def run(query_type: str, eager: bool, fake_embeddings: bool) -> dict:
+    """Procesa una consulta en un proceso nuevo y retorna sus tiempos."""
+    code = WORKER_CODE.format(
+        root=str(ROOT),
+        response=query_type,
+        query=QUERIES[query_type],
+        eager=eager,
+        fake_embeddings=fake_embeddings,
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--fake-embeddings",
+        action="store_true",
+        help="No descargar el modelo de embeddings (usa vectores deterministas)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Procesos por combinación")
+    args = parser.parse_args()
+
+    print(f"{'Consulta':<10} {'Modo':<6} {'Imports':>8} {'Init':>8} {'1ª resp.':>9} "
+          f"{'Total':>8}  Componentes cargados")
+    print("─" * 88)
+    for query_type in QUERIES:
+        for eager in (True, False):
+            runs = [run(query_type, eager, args.fake_embeddings) for _ in range(args.repeat)]
+            best = min(runs, key=lambda r: r["init_s"] + r["first_query_s"])
+            print(
+                f"{query_type:<10} {'eager' if eager else 'lazy':<6} "
+                f"{best['import_s']:>7.2f}s {best['init_s']:>7.2f}s "
+                f"{best['first_query_s']:>8.2f}s "
+                f"{best['import_s'] + best['init_s'] + best['first_query_s']:>7.2f}s  "
+                f"{', '.join(best['components'])}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark de búsqueda de balance por cédula.
+
+Compara la latencia p50/p99 del escaneo completo del DataFrame (implementación
+original) contra el índice hash de CSVQueryManager.
+
+Uso:
+    python benchmarks/bench_csv_lookup.py --sizes 10000 1000000 10000000
+"""
+
+import argparse
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.csv_query import CSVQueryManager
+
+
+def generate_csv(path: Path, n_rows: int, seed: int = 42) -> None:
+    """Genera un CSV sintético de cuentas con n_rows registros."""
+    rng = np.random.default_rng(seed)
+    cedulas = rng.choice(np.arange(1_000_000, 99_999_999), size=n_rows, replace=False)
+    df = pd.DataFrame(
+        {
+            "ID_Cedula": [f"V-{c}" for c in cedulas],
+            "Nombre": [f"Cliente {i}" for i in range(n_rows)],
+            "Balance": rng.uniform(0, 10_000, size=n_rows).round(2),
+        }
+    )
+    df.to_csv(path, index=False)
+
+
+def scan_lookup(df: pd.DataFrame, cedula_id: str) -> dict:
+    """Búsqueda original: máscara booleana sobre todo el DataFrame."""
+    result = df[df["ID_Cedula"] == cedula_id]
+    if result.empty:
+        return {"found": False}
+    row = result.iloc[0]
+    return {"found": True, "balance": float(row["Balance"])}
+
+
+def measure(fn, queries) -> dict:
+    """Mide la latencia de cada llamada y retorna percentiles en microsegundos."""
+    latencies = []
+    for q in queries:
+        start = time.perf_counter_ns()
+        fn(q)
+        latencies.append(time.perf_counter_ns() - start)
+    arr = np.array(latencies) / 1_000
+    return {"p50": np.percentile(arr, 50), "p99": np.percentile(arr, 99)}
+
+
+def run(n_rows: int, n_queries: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "saldos.csv"
+        generate_csv(csv_path, n_rows)
+        manager = CSVQueryManager(csv_path)
+
+    existing = manager.df["ID_Cedula"].sample(
+        n=min(n_queries, n_rows), replace=True, random_state=0
+    )
+    queries = list(existing) + ["V-00000001"] * (n_queries // 10)
+    random.Random(0).shuffle(queries)
+
+    # El escaneo es O(n): limitar consultas en tablas grandes
+    scan_queries = queries[: max(10, min(n_queries, 50_000_000 // n_rows))]
+
+    scan = measure(lambda q: scan_lookup(manager.df, q), scan_queries)
+    indexed = measure(manager.get_balance_by_cedula, queries)
+
+    print(
+        f"{n_rows:>10,} filas | "
+        f"scan p50={scan['p50']:>10.1f}µs p99={scan['p99']:>10.1f}µs | "
+        f"índice p50={indexed['p50']:>6.1f}µs p99={indexed['p99']:>6.1f}µs | "
+        f"speedup p50 x{scan['p50'] / indexed['p50']:.0f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000]
+    )
+    parser.add_argument("--queries", type=int, default=1_000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    for size in args.sizes:
+        run(size, args.queries)
+
+
+if __name__ == "__main__":
+    main()
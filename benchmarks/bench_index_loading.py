@@ -0,0 +1,144 @@
+"""
+Benchmark de carga del índice: pickle (FAISS.load_local) vs. memory-mapping.
+
+Construye un índice sintético (vectores aleatorios de la dimensión del modelo
+y textos del tamaño de un chunk), lo guarda en ambos formatos y lanza N
+procesos worker que cargan el índice, hacen algunas búsquedas y reportan:
+
+- tiempo de carga
+- RSS (memoria residente, cuenta también las páginas compartidas)
+- PSS (memoria proporcional: las páginas compartidas se dividen entre los
+  procesos que las mapean; es la métrica que refleja el ahorro real)
+
+Uso:
+    python benchmarks/bench_index_loading.py --chunks 200000 --workers 16
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores.faiss import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.mmap_docstore import write_mmap_docstore
+
+WORKER_CODE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+def memory_kb(path, field):
+    with open(path) as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+embeddings = DeterministicFakeEmbedding(size={dim})
+start_time = time.perf_counter()
+if {mode!r} == "mmap":
+    from src.mmap_docstore import load_mmap_vectorstore
+    vectorstore = load_mmap_vectorstore({path!r}, embeddings)
+else:
+    from langchain_community.vectorstores.faiss import FAISS
+    vectorstore = FAISS.load_local({path!r}, embeddings, allow_dangerous_deserialization=True)
+load_time = time.perf_counter() - start_time
+
+for query in ["cuenta de ahorros", "tarjeta de crédito", "transferencia"]:
+    vectorstore.similarity_search(query, k=3)
+
+print(json.dumps({{
+    "load_s": load_time,
+    "rss_mb": memory_kb("/proc/self/status", "VmRSS") / 1024,
+    "pss_mb": memory_kb("/proc/self/smaps_rollup", "Pss") / 1024,
+}}))
+sys.stdout.flush()
+sys.stdin.read()  # Mantener vivo hasta que todos midan
+"""
+
+
+def build_index(path: Path, chunks: int, dim: int, text_size: int) -> None:
+    """Genera y guarda un índice sintético en ambos formatos."""
+    rng = np.random.default_rng(0)
+    words = ["cuenta", "tarjeta", "transferencia", "saldo", "banco", "requisitos", "cliente"]
+    vectorstore = FAISS(
+        DeterministicFakeEmbedding(size=dim), faiss.IndexFlatL2(dim), InMemoryDocstore(), {}
+    )
+    step = 10_000
+    for start in range(0, chunks, step):
+        end = min(start + step, chunks)
+        vectors = rng.standard_normal((end - start, dim)).astype(np.float32)
+        texts = [
+            " ".join(rng.choice(words, text_size // 8)) for _ in range(end - start)
+        ]
+        metadatas = [{"source": f"doc_{i // 20}.txt", "chunk": i % 20} for i in range(start, end)]
+        ids = [f"doc_{i // 20}.txt#{i % 20}" for i in range(start, end)]
+        vectorstore.add_embeddings(zip(texts, vectors.tolist()), metadatas, ids=ids)
+
+    vectorstore.save_local(str(path))
+    write_mmap_docstore(vectorstore, path)
+
+
+def run_workers(path: Path, mode: str, workers: int, dim: int) -> list:
+    """Lanza los workers a la vez y recolecta sus mediciones."""
+    code = WORKER_CODE.format(
+        root=str(Path(__file__).parent.parent), dim=dim, mode=mode, path=str(path)
+    )
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-c", code],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(workers)
+    ]
+    results = [json.loads(process.stdout.readline()) for process in processes]
+    for process in processes:
+        process.communicate("")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--chunks", type=int, default=200_000, help="Chunks del índice sintético")
+    parser.add_argument("--dim", type=int, default=384, help="Dimensión de los vectores")
+    parser.add_argument("--text-size", type=int, default=500, help="Caracteres por chunk")
+    parser.add_argument("--workers", type=int, default=16, help="Procesos que cargan el índice")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "index"
+        print(f"Construyendo índice sintético: {args.chunks:,} chunks x {args.dim} dims...")
+        start_time = time.perf_counter()
+        build_index(path, args.chunks, args.dim, args.text_size)
+        print(f"Construido en {time.perf_counter() - start_time:.1f}s")
+        for file in sorted(path.iterdir()):
+            print(f"  {file.name:<24} {file.stat().st_size / 1e6:>8.1f} MB")
+
+        print(f"\n{'Modo':<8} {'Carga (s)':>10} {'RSS/worker':>12} {'PSS/worker':>12} {'PSS total':>11}")
+        print("─" * 57)
+        for mode in ("pickle", "mmap"):
+            results = run_workers(path, mode, args.workers, args.dim)
+            load = np.mean([r["load_s"] for r in results])
+            rss = np.mean([r["rss_mb"] for r in results])
+            pss = np.mean([r["pss_mb"] for r in results])
+            print(
+                f"{mode:<8} {load:>10.3f} {rss:>10.0f}MB {pss:>10.0f}MB "
+                f"{sum(r['pss_mb'] for r in results):>9.0f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark del clasificador de intención local (embeddings).
+
+Evalúa precisión, tasa de escalamiento al LLM y latencia sobre los casos de
+tests/test_router.py, sin llamar a OpenAI.
+
+Uso:
+    python benchmarks/bench_intent_classifier.py
+"""
+
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_community.embeddings.huggingface import HuggingFaceEmbeddings
+
+from src.config import EMBEDDINGS_MODEL_NAME
+from src.intent_classifier import EmbeddingIntentClassifier
+from src.router import QueryRouter, QueryType
+
+# Casos de tests/test_router.py (clasificación)
+LABELED_QUERIES = [
+    ("¿Cuál es el balance de la cédula V-12345678?", QueryType.BALANCE),
+    ("Consultar saldo V-87654321", QueryType.BALANCE),
+    ("Balance de cuenta V-11111111", QueryType.BALANCE),
+    ("¿Cuánto dinero tengo en mi cuenta?", QueryType.BALANCE),
+    ("Consultar mi saldo", QueryType.BALANCE),
+    ("Estado de cuenta", QueryType.BALANCE),
+    ("¿Cómo abrir una cuenta de ahorros?", QueryType.KNOWLEDGE),
+    ("Como puedo abrir una cuenta?", QueryType.KNOWLEDGE),
+    ("Pasos para abrir cuenta", QueryType.KNOWLEDGE),
+    ("¿Cómo solicitar una tarjeta de crédito?", QueryType.KNOWLEDGE),
+    ("Información sobre tarjetas de credito", QueryType.KNOWLEDGE),
+    ("Requisitos para tarjeta de crédito", QueryType.KNOWLEDGE),
+    ("¿Cómo hacer una transferencia?", QueryType.KNOWLEDGE),
+    ("Como transferir dinero", QueryType.KNOWLEDGE),
+    ("Procedimiento para transferir", QueryType.KNOWLEDGE),
+    ("¿Cómo abrir cuenta?", QueryType.KNOWLEDGE),
+    ("Hola", QueryType.GENERAL),
+    ("¿Qué hora es?", QueryType.GENERAL),
+    ("Gracias", QueryType.GENERAL),
+    ("Adiós", QueryType.GENERAL),
+    ("Hola, buenos días", QueryType.GENERAL),
+]
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+
+    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDINGS_MODEL_NAME)
+    classifier = EmbeddingIntentClassifier(embeddings)
+    classifier.fit()
+
+    # Solo para reutilizar las reglas; el LLM no se invoca
+    router = QueryRouter.__new__(QueryRouter)
+
+    latencies, correct, escalated, rule_hits = [], 0, 0, 0
+    for query, expected in LABELED_QUERIES:
+        if router._rule_based_classification(query) is not None:
+            rule_hits += 1
+
+        start = time.perf_counter()
+        prediction = classifier.predict(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        accepted = classifier._accept(prediction)
+
+        if accepted is None:
+            escalated += 1
+        elif accepted == expected:
+            correct += 1
+
+        status = "LLM" if accepted is None else ("OK " if accepted == expected else "ERR")
+        print(
+            f"[{status}] {query[:45]:<45} -> {prediction.query_type.value:<9} "
+            f"conf={prediction.confidence:.3f} margen={prediction.margin:.3f}"
+        )
+
+    answered = len(LABELED_QUERIES) - escalated
+    print()
+    print(f"Casos: {len(LABELED_QUERIES)} (reglas cubren {rule_hits})")
+    print(f"Resueltos localmente: {answered}  escalados al LLM: {escalated}")
+    if answered:
+        print(f"Precisión en resueltos localmente: {correct / answered * 100:.1f}%")
+    print(
+        f"Latencia local p50={np.percentile(latencies, 50):.2f}ms "
+        f"p99={np.percentile(latencies, 99):.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark del cliente LLM: un ChatOpenAI por consulta vs. el cliente compartido.
+
+Levanta un servidor HTTP local que imita /v1/chat/completions (con una latencia
+fija configurable) y envía N consultas desde T threads con cada estrategia:
+
+- per-request: crea un ChatOpenAI (y su pool HTTP) en cada consulta, como
+  hacían los chains que se construían dentro de las tools
+- shared: usa get_chat_model(), un único cliente y pool keep-alive
+
+Reporta consultas/s, latencia p50/p99 y conexiones TCP abiertas en el servidor.
+Sobre loopback sin TLS la diferencia subestima la real: contra la API cada
+conexión nueva paga además un handshake TLS con el servidor remoto.
+
+Uso:
+    python benchmarks/bench_llm_client.py --requests 500 --threads 16
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+RESPONSE = json.dumps({
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4",
+    "choices": [{
+        "index": 0,
+        "message": {"role": "assistant", "content": "knowledge"},
+        "finish_reason": "stop",
+    }],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11},
+}).encode()
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Responde cualquier POST con una completion fija, manteniendo keep-alive."""
+
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    latency = 0.0
+    counter_lock = threading.Lock()
+
+    def setup(self):
+        with FakeOpenAIHandler.counter_lock:
+            FakeOpenAIHandler.connections += 1
+        super().setup()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(mode: str, base_url: str, requests: int, threads: int) -> dict:
+    """Envía las consultas con una estrategia y retorna sus métricas."""
+    from langchain_openai import ChatOpenAI
+
+    from src import llm_client
+
+    llm_client.reset_clients()
+
+    def query(i: int) -> float:
+        start_time = time.perf_counter()
+        if mode == "shared":
+            llm = llm_client.get_chat_model("gpt-4", 0.0, base_url=base_url)
+        else:
+            llm = ChatOpenAI(model="gpt-4", temperature=0.0, base_url=base_url)
+        llm.invoke(f"Consulta {i}")
+        return time.perf_counter() - start_time
+
+    FakeOpenAIHandler.connections = 0
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = np.array(list(executor.map(query, range(requests))))
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        "qps": requests / elapsed,
+        "p50_ms": np.percentile(latencies, 50) * 1000,
+        "p99_ms": np.percentile(latencies, 99) * 1000,
+        "connections": FakeOpenAIHandler.connections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=500, help="Consultas por estrategia")
+    parser.add_argument("--threads", type=int, default=16, help="Consultas concurrentes")
+    parser.add_argument(
+        "--latency-ms", type=float, default=20.0, help="Latencia simulada del servidor"
+    )
+    args = parser.parse_args()
+
+    FakeOpenAIHandler.latency = args.latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAIHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    # Calentar imports antes de medir
+    run("shared", base_url, requests=4, threads=1)
+
+    print(f"{'Modo':<12} {'Consultas/s':>12} {'p50 (ms)':>10} {'p99 (ms)':>10} {'Conexiones':>11}")
+    print("─" * 59)
+    for mode in ("per-request", "shared"):
+        result = run(mode, base_url, args.requests, args.threads)
+        print(
+            f"{mode:<12} {result['qps']:>12.1f} {result['p50_ms']:>10.1f} "
+            f"{result['p99_ms']:>10.1f} {result['connections']:>11}"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
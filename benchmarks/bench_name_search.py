@@ -0,0 +1,158 @@
+"""
+Benchmark de search_by_name: índice de nombres contra el recorrido completo.
+
+Genera nombres sintéticos con acentos (nombres y apellidos frecuentes más
+una cola de apellidos poco comunes) y compara, por consulta:
+
+- pandas   implementación anterior: str.lower().str.contains sobre la columna
+- find     implementación anterior del backend columnar: str.find sobre todos
+           los nombres en minúsculas concatenados
+- índice   NameSearchIndex (src/name_index.py), todas las coincidencias
+- página   índice con limit=20 (primera página)
+
+Las latencias son la mediana en ms de search_by_name (incluye construir el
+DataFrame de resultados); antes se reportan el tiempo de construcción del
+índice y su memoria.
+
+Uso:
+    python benchmarks/bench_name_search.py --size 1000000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.account_store import DataFrameAccountStore
+
+FIRST_NAMES = (
+    "María José Juan Carlos Ana Luis Pedro Carmen Rosa Jesús Andrés Sofía Ángel Lucía "
+    "Miguel Valentina Gabriel Daniela Ramón Inés Teresa Eduardo Mónica Héctor Raúl"
+).split()
+SURNAMES = (
+    "Pérez González Rodríguez Hernández García Martínez López Díaz Sánchez Ramírez "
+    "Torres Flores Rivera Gómez Núñez Muñoz Castillo Jiménez Ortega Peña Vargas "
+    "Méndez Ruiz Morales Rojas Medina Aguilar Suárez Romero Álvarez"
+).split()
+SYLLABLES = "ba be bi bo ca ce co da de do fa ga go la le lo ma me mo na ne no ra re ri ro sa se so ta te to va ve za zu".split()
+
+QUERIES = [
+    ("pérez", False),
+    ("PEREZ", False),
+    ("ez", False),
+    ("gonz", True),
+    ("josé pér", False),
+    ("rare", False),  # Se reemplaza por un apellido poco común
+    ("no existe", False),
+]
+
+
+def generate_names(size: int, seed: int = 42) -> list:
+    """Nombres de una o dos palabras más dos apellidos; 5% con un apellido poco común."""
+    rng = random.Random(seed)
+    rare = sorted({"".join(rng.choices(SYLLABLES, k=rng.randint(3, 4))).capitalize() for _ in range(50_000)})
+    names = []
+    for _ in range(size):
+        first = " ".join(rng.sample(FIRST_NAMES, rng.randint(1, 2)))
+        surname = rng.choice(rare) if rng.random() < 0.05 else rng.choice(SURNAMES)
+        names.append(f"{first} {surname} {rng.choice(SURNAMES)}")
+    return names
+
+
+def pandas_search(df: pd.DataFrame, name: str) -> pd.DataFrame:
+    """Implementación anterior del backend pandas."""
+    return df[df["Nombre"].str.lower().str.contains(name.lower(), na=False)]
+
+
+class FindSearch:
+    """Implementación anterior del backend columnar: str.find sobre un texto único."""
+
+    def __init__(self, df: pd.DataFrame):
+        lowered = [name.lower() for name in df["Nombre"]]
+        self.starts = np.zeros(len(lowered) + 1, dtype=np.int64)
+        np.cumsum([len(name) + 1 for name in lowered], out=self.starts[1:])
+        self.text = "\n".join(lowered) + "\n"
+        self.df = df
+
+    def __call__(self, name: str) -> pd.DataFrame:
+        needle = name.lower()
+        rows = []
+        position = self.text.find(needle)
+        while position != -1:
+            row = int(self.starts.searchsorted(position, side="right")) - 1
+            rows.append(row)
+            position = self.text.find(needle, int(self.starts[row + 1]))
+        return self.df.iloc[rows]
+
+
+def median_ms(fn, repeat: int) -> float:
+    """Mediana de `repeat` llamadas, en ms."""
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start_time)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--size", type=int, default=1_000_000, help="Cantidad de nombres")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por consulta")
+    args = parser.parse_args()
+
+    names = generate_names(args.size)
+    df = pd.DataFrame(
+        {
+            "ID_Cedula": [f"V-{i + 1}" for i in range(args.size)],
+            "Nombre": names,
+            "Balance": np.zeros(args.size),
+        }
+    )
+    rare = next(name.split()[-2] for name in names if name.split()[-2] not in SURNAMES)
+    queries = [(rare.lower() if query == "rare" else query, prefix) for query, prefix in QUERIES]
+
+    store = DataFrameAccountStore(df)
+    start_time = time.perf_counter()
+    index = store.name_index()
+    build_seconds = time.perf_counter() - start_time
+    find_search = FindSearch(df)
+
+    print(
+        f"\n{args.size:,} nombres, {len(index.vocabulary):,} palabras distintas: índice construido "
+        f"en {build_seconds:.2f}s, {index.memory_bytes() / 2**20:.1f} MiB\n"
+    )
+    print(
+        f"{'Consulta':<14} {'Modo':<9} {'Resultados':>10} {'pandas':>9} {'find':>9} "
+        f"{'índice':>9} {'página':>9} {'vs pandas':>10}  (ms)"
+    )
+    print("─" * 88)
+    for query, prefix in queries:
+        mode = "prefijo" if prefix else "subcadena"
+        results = store.search_by_name(query, prefix=prefix)
+        indexed = median_ms(lambda: store.search_by_name(query, prefix=prefix), args.repeat)
+        page = median_ms(lambda: store.search_by_name(query, prefix=prefix, limit=20), args.repeat)
+        if prefix:
+            # Las implementaciones anteriores no tenían búsqueda por prefijo
+            previous = f"{'-':>9} {'-':>9}"
+            speedup = "-"
+        else:
+            baseline = median_ms(lambda: pandas_search(df, query), args.repeat)
+            find = median_ms(lambda: find_search(query), args.repeat)
+            previous = f"{baseline:>9.1f} {find:>9.1f}"
+            speedup = f"{baseline / indexed:.0f}x"
+        print(
+            f"{query:<14} {mode:<9} {len(results):>10,} {previous} "
+            f"{indexed:>9.2f} {page:>9.3f} {speedup:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark de la tabla de routing precompilada.
+
+Compara, por consulta, la implementación original (patrones evaluados uno
+por uno con re.search, más cuatro búsquedas para extraer la cédula) contra
+QueryRouter.analyze_query, que clasifica y extrae la cédula en una sola
+pasada sobre la consulta en minúsculas.
+
+Uso:
+    python benchmarks/bench_routing.py --iterations 2000
+"""
+
+import argparse
+import logging
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.router import BALANCE_PATTERNS, KNOWLEDGE_PATTERNS, QueryRouter, QueryType
+
+QUERIES = [
+    "¿Cuál es el balance de la cédula V-12345678?",
+    "Consultar saldo V-87654321",
+    "¿Cuánto dinero tengo en mi cuenta?",
+    "Estado de cuenta",
+    "¿Cómo abrir una cuenta de ahorros?",
+    "Requisitos para tarjeta de crédito",
+    "Información sobre transferencias",
+    "La cédula V-99999999",
+    "cedula 12345678",
+    "Hola, buenos días",
+    "¿Qué hora es?",
+    "Hola " * 100 + "¿Cómo abrir una cuenta?",
+]
+
+
+def legacy_classification(query: str):
+    """Implementación original de la clasificación por reglas."""
+    query_lower = query.lower()
+    for pattern in BALANCE_PATTERNS:
+        if re.search(pattern, query_lower):
+            return QueryType.BALANCE
+    for pattern in KNOWLEDGE_PATTERNS:
+        if re.search(pattern, query_lower):
+            return QueryType.KNOWLEDGE
+    if re.search(r"v-\d{7,8}", query_lower):
+        return QueryType.BALANCE
+    return None
+
+
+def legacy_extract_cedula(query: str):
+    """Implementación original de la extracción de cédula."""
+    for pattern in [r"(V-\d{7,8})", r"v-(\d{7,8})", r"cedula\s*(\d{7,8})", r"cédula\s*(\d{7,8})"]:
+        match = re.search(pattern, query, re.IGNORECASE)
+        if match:
+            cedula = match.group(1).upper()
+            return cedula if cedula.startswith("V-") else f"V-{cedula}"
+    return None
+
+
+def ns_per_query(fn, iterations: int) -> float:
+    """Nanosegundos promedio por consulta de fn sobre QUERIES."""
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        for query in QUERIES:
+            fn(query)
+    return (time.perf_counter_ns() - start) / (iterations * len(QUERIES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--iterations", type=int, default=2000, help="Pasadas sobre las consultas")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    router = QueryRouter(intent_classifier=None)
+
+    def legacy(query):
+        legacy_classification(query)
+        legacy_extract_cedula(query)
+
+    legacy_ns = ns_per_query(legacy, args.iterations)
+    compiled_ns = ns_per_query(router.analyze_query, args.iterations)
+
+    print(f"\n{'Implementación':<28} {'ns/consulta':>12}")
+    print("─" * 41)
+    print(f"{'original (clasificar+cédula)':<28} {legacy_ns:>12,.0f}")
+    print(f"{'analyze_query':<28} {compiled_ns:>12,.0f}")
+    print(f"\nMejora: x{legacy_ns / compiled_ns:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark de tiempo hasta el primer token: process_query vs. stream_query.
+
+Reemplaza el LLM por el stub local (src/fake_llm.py), que genera la
+respuesta con una latencia al primer token y una velocidad de tokens fijas,
+y mide, para una consulta general y una de conocimiento, cuánto tarda el
+usuario en ver el primer fragmento de texto y la respuesta completa con
+cada API.
+
+Uso:
+    python benchmarks/bench_streaming.py --chars 800 --tokens-per-second 30
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from langchain_core.documents import Document
+
+from src.agent import CustomerServiceAgent
+from src.fake_llm import FakeChatModel
+from src.router import QueryType
+
+QUERIES = {
+    QueryType.GENERAL: "Hola, ¿qué servicios ofrecen?",
+    QueryType.KNOWLEDGE: "¿Cómo abrir una cuenta de ahorros?",
+}
+
+
+class FixedRetriever:
+    """Retriever con un documento fijo (sin modelo de embeddings)."""
+
+    def invoke(self, query):
+        return [Document(page_content="Requisitos: cédula", metadata={"source": "cuentas.txt"})]
+
+
+def measure(agent: CustomerServiceAgent, query: str, streaming: bool) -> tuple:
+    """Retorna (tiempo al primer texto visible, tiempo total) de una consulta."""
+    start_time = time.perf_counter()
+    if not streaming:
+        agent.process_query(query)
+        elapsed = time.perf_counter() - start_time
+        return elapsed, elapsed
+
+    first_token = None
+    for event in agent.stream_query(query):
+        if event["type"] == "token" and first_token is None:
+            first_token = time.perf_counter() - start_time
+    return first_token, time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--chars", type=int, default=800, help="Largo de la respuesta")
+    parser.add_argument(
+        "--latency-ms", type=float, default=300.0, help="Latencia al primer token del LLM"
+    )
+    parser.add_argument(
+        "--tokens-per-second", type=float, default=30.0, help="Velocidad de generación"
+    )
+    args = parser.parse_args()
+
+    response = ("Para abrir una cuenta necesitas tu cédula vigente. " * args.chars)[: args.chars]
+    with patch("src.agent.SEMANTIC_CACHE_ENABLED", False):
+        agent = CustomerServiceAgent()
+    agent.llm = FakeChatModel(
+        responses=[response], latency_ms=args.latency_ms, tokens_per_second=args.tokens_per_second
+    )
+    # Chain equivalente a RetrievalQA: recupera y espera la respuesta completa
+    retriever = FixedRetriever()
+    agent.knowledge_chain = SimpleNamespace(
+        retriever=retriever,
+        invoke=lambda inputs: {
+            "result": agent.llm.invoke(inputs["query"]).content,
+            "source_documents": retriever.invoke(inputs["query"]),
+        },
+    )
+
+    print(f"{'Consulta':<10} {'API':<14} {'Primer texto':>13} {'Total':>9}")
+    print("─" * 50)
+    for query_type, query in QUERIES.items():
+        with patch.object(agent.router, "classify_query", return_value=query_type):
+            for streaming in (False, True):
+                first, total = measure(agent, query, streaming)
+                api = "stream_query" if streaming else "process_query"
+                print(f"{query_type.value:<10} {api:<14} {first * 1000:>11.0f}ms {total:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
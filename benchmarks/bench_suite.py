@@ -0,0 +1,432 @@
+"""
+Suite de benchmarks del pipeline de consultas, con resultados en JSON.
+
+Casos:
+- routing.rules             clasificación por reglas del router
+- cedula.extract            extracción de cédula con regex
+- csv.lookup[n=...]         búsqueda de balance a varios tamaños de tabla
+- faiss.search[n=...]       búsqueda FAISS (k=RETRIEVER_K) a varios tamaños de corpus
+- embedding.documents       throughput de embeddings (lotes de EMBEDDING_BATCH_SIZE)
+- process_query[tipo]       consulta completa por tipo, con el LLM local
+                            (backend "fake", sin latencia: mide el overhead
+                            del pipeline, no la del modelo)
+
+Cada caso reporta mediana y p95 por operación (µs) y operaciones/s. Con
+--baseline compara la mediana contra una corrida anterior y termina con
+código 1 si algún caso empeora más que --threshold y, a la vez, más que
+--min-delta µs en valor absoluto (en casos de 1-2 µs el ruido del timer
+supera cualquier umbral relativo). Los casos marcados se vuelven a medir
+hasta --retries veces y se conserva la mejor mediana antes de fallar.
+
+Uso:
+    python benchmarks/bench_suite.py --output results.json
+    python benchmarks/bench_suite.py --quick --fake-embeddings --baseline results.json
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+from unittest.mock import patch
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+os.environ["LLM_BACKEND"] = "fake"
+
+from bench_csv_lookup import generate_csv
+
+from src.config import EMBEDDING_BATCH_SIZE, RETRIEVER_K
+
+ROUTING_QUERIES = [
+    "¿Cuál es el balance de la cédula V-12345678?",
+    "Consultar saldo de mi cuenta",
+    "¿Cómo abrir una cuenta de ahorros?",
+    "Requisitos para una tarjeta de crédito",
+    "¿Cómo hacer una transferencia?",
+    "Hola, buenos días",
+    "Gracias por la ayuda",
+]
+
+CEDULA_QUERIES = [
+    "Balance de la cédula V-12345678",
+    "mi cédula es v 87654321, cuánto tengo",
+    "Saldo de 12345678",
+    "Consultar saldo de mi cuenta",
+    "¿Cómo abrir una cuenta de ahorros?",
+]
+
+PIPELINE_QUERIES = {
+    "balance": "Balance de la cédula V-12345678",
+    "knowledge": "¿Cómo abrir una cuenta de ahorros?",
+    "general": "Hola, ¿qué servicios ofrecen?",
+}
+
+CONFIGS = {
+    "full": {
+        "csv_sizes": [1_000, 100_000, 1_000_000],
+        "faiss_sizes": [10_000, 100_000],
+        "iterations": 2_000,
+        "embedding_docs": 512,
+    },
+    "quick": {
+        "csv_sizes": [1_000, 100_000],
+        "faiss_sizes": [10_000],
+        "iterations": 300,
+        "embedding_docs": 128,
+    },
+}
+
+
+def measure(
+    fn: Callable, inputs: Sequence, iterations: int, warmup: int = 10, rounds: int = 5
+) -> Dict:
+    """
+    Mide la latencia de fn sobre las entradas (cíclicas) y resume.
+
+    Las iteraciones se reparten en rondas y se reporta la menor mediana por
+    ronda: en casos de microsegundos es mucho más estable entre corridas que
+    la mediana global, que absorbe las pausas del sistema.
+
+    Args:
+        fn: Función a medir (recibe una entrada)
+        inputs: Entradas a usar en orden cíclico
+        iterations: Llamadas medidas
+        warmup: Llamadas previas sin medir
+        rounds: Rondas en que se reparten las iteraciones
+
+    Returns:
+        Diccionario con n, median_us, p95_us y ops_per_s
+    """
+    for i in range(warmup):
+        fn(inputs[i % len(inputs)])
+
+    latencies = np.empty(iterations)
+    for i in range(iterations):
+        value = inputs[i % len(inputs)]
+        start = time.perf_counter_ns()
+        fn(value)
+        latencies[i] = time.perf_counter_ns() - start
+    latencies /= 1_000
+    rounds = max(1, min(rounds, iterations // 10))
+    median = float(min(np.median(chunk) for chunk in np.array_split(latencies, rounds)))
+    return {
+        "n": iterations,
+        "median_us": median,
+        "p95_us": float(np.percentile(latencies, 95)),
+        "ops_per_s": 1e6 / median if median > 0 else float("inf"),
+    }
+
+
+def bench_routing(config: Dict, args) -> Dict[str, Dict]:
+    from src.router import QueryRouter
+
+    router = QueryRouter(intent_classifier=None)
+    return {
+        "routing.rules": measure(
+            router._rule_based_classification, ROUTING_QUERIES, config["iterations"] * 10
+        ),
+        "cedula.extract": measure(
+            router.extract_cedula, CEDULA_QUERIES, config["iterations"] * 10
+        ),
+    }
+
+
+def bench_csv(config: Dict, args) -> Dict[str, Dict]:
+    from src.csv_query import CSVQueryManager
+
+    results = {}
+    for size in config["csv_sizes"]:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "saldos.csv"
+            generate_csv(csv_path, size)
+            manager = CSVQueryManager(csv_path)
+        rng = random.Random(0)
+        cedulas = list(manager.df["ID_Cedula"].sample(n=min(size, 1_000), random_state=0))
+        queries = cedulas + ["V-00000001"] * (len(cedulas) // 10)  # 10% no encontradas
+        rng.shuffle(queries)
+        results[f"csv.lookup[n={size}]"] = measure(
+            manager.get_balance_by_cedula, queries, config["iterations"] * 10
+        )
+    return results
+
+
+def bench_faiss(config: Dict, args) -> Dict[str, Dict]:
+    import faiss
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores.faiss import FAISS
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    dim = 384
+    rng = np.random.default_rng(0)
+    results = {}
+    for size in config["faiss_sizes"]:
+        vectorstore = FAISS(
+            DeterministicFakeEmbedding(size=dim), faiss.IndexFlatL2(dim), InMemoryDocstore(), {}
+        )
+        for start in range(0, size, 10_000):
+            count = min(10_000, size - start)
+            vectors = rng.standard_normal((count, dim)).astype(np.float32)
+            vectorstore.add_embeddings(
+                [(f"chunk {start + i}", vector) for i, vector in enumerate(vectors.tolist())],
+                ids=[str(start + i) for i in range(count)],
+            )
+        queries = rng.standard_normal((100, dim)).astype(np.float32).tolist()
+        results[f"faiss.search[n={size}]"] = measure(
+            lambda vector: vectorstore.similarity_search_by_vector(vector, k=RETRIEVER_K),
+            queries,
+            max(50, config["iterations"] // 10),
+        )
+    return results
+
+
+def load_embeddings(args):
+    """Modelo de embeddings real, o uno determinista con --fake-embeddings."""
+    if args.fake_embeddings:
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+
+        return DeterministicFakeEmbedding(size=384)
+
+    from langchain_community.embeddings.huggingface import HuggingFaceEmbeddings
+
+    from src.config import EMBEDDINGS_MODEL_NAME
+
+    return HuggingFaceEmbeddings(model_name=EMBEDDINGS_MODEL_NAME)
+
+
+def bench_embeddings(config: Dict, args) -> Dict[str, Dict]:
+    embeddings = load_embeddings(args)
+    words = ["cuenta", "tarjeta", "transferencia", "saldo", "banco", "requisitos", "cliente"]
+    rng = random.Random(0)
+    texts = [" ".join(rng.choice(words) for _ in range(70)) for _ in range(config["embedding_docs"])]
+    batches = [
+        texts[i : i + EMBEDDING_BATCH_SIZE] for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+    ]
+    result = measure(embeddings.embed_documents, batches, len(batches), warmup=1)
+
+    # Reportar por documento para que sea comparable entre tamaños de lote
+    per_doc = EMBEDDING_BATCH_SIZE
+    result.update(
+        median_us=result["median_us"] / per_doc,
+        p95_us=result["p95_us"] / per_doc,
+        ops_per_s=result["ops_per_s"] * per_doc,
+    )
+    return {"embedding.documents": result}
+
+
+def bench_pipeline(config: Dict, args) -> Dict[str, Dict]:
+    from src import llm_client
+    from src.agent import CustomerServiceAgent
+    from src.knowledge_base import KnowledgeBaseManager
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, patch(
+        "src.agent.SEMANTIC_CACHE_ENABLED", False
+    ):
+        agent = CustomerServiceAgent()
+        agent.llm = llm_client.get_chat_model(latency_ms=0, tokens_per_second=0)
+        agent.router.llm = agent.llm
+        agent.kb_manager = KnowledgeBaseManager(
+            index_path=Path(tmp) / "index", embeddings=load_embeddings(args)
+        )
+        agent.warmup()
+
+        for query_type, query in PIPELINE_QUERIES.items():
+            results[f"process_query[{query_type}]"] = measure(
+                agent.process_query, [query], max(50, config["iterations"] // 10)
+            )
+    return results
+
+
+BENCHMARKS = {
+    "routing": bench_routing,
+    "csv": bench_csv,
+    "faiss": bench_faiss,
+    "embedding": bench_embeddings,
+    "pipeline": bench_pipeline,
+}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return "unknown"
+
+
+def run_benchmarks(groups: Sequence[str], config: Dict, args, verbose: bool = True) -> Dict:
+    """Corre los grupos de casos indicados y devuelve sus resultados por nombre."""
+    results = {}
+    for group in groups:
+        for name, result in BENCHMARKS[group](config, args).items():
+            result["group"] = group
+            results[name] = result
+            if verbose:
+                print(
+                    f"{name:<32} {result['median_us']:>13.2f} {result['p95_us']:>11.2f} "
+                    f"{result['ops_per_s']:>12,.0f}"
+                )
+    return results
+
+
+def compare(
+    results: Dict,
+    baseline: Dict,
+    threshold: float,
+    min_delta_us: float = 1.0,
+    verbose: bool = True,
+) -> List[str]:
+    """
+    Compara las medianas contra una corrida anterior.
+
+    Un caso solo cuenta como regresión si empeora más que el umbral relativo
+    y también más que min_delta_us: en casos de pocos µs el ruido del timer
+    entre corridas de un mismo código ya supera el 20%.
+
+    Args:
+        results: Resultados de esta corrida
+        baseline: Resultados de la corrida de referencia
+        threshold: Empeoramiento relativo tolerado (0.2 = 20%)
+        min_delta_us: Empeoramiento absoluto mínimo (µs) para marcar un caso
+        verbose: Imprimir la tabla comparativa
+
+    Returns:
+        Casos que empeoraron más que ambos umbrales
+    """
+    regressions = []
+    if verbose:
+        print(f"\n{'Caso':<32} {'Base (µs)':>12} {'Actual (µs)':>12} {'Cambio':>9}")
+        print("─" * 68)
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["median_us"]
+        delta = result["median_us"] - before
+        change = delta / before if before > 0 else 0.0
+        flag = ""
+        if change > threshold and delta > min_delta_us:
+            regressions.append(name)
+            flag = "  ❌ regresión"
+        if verbose:
+            print(
+                f"{name:<32} {before:>12.2f} {result['median_us']:>12.2f} {change:>+8.1%}{flag}"
+            )
+    return regressions
+
+
+def recheck(
+    regressions: List[str],
+    results: Dict,
+    baseline: Dict,
+    config: Dict,
+    args,
+) -> List[str]:
+    """
+    Vuelve a medir los casos marcados y conserva la mejor mediana de cada uno.
+
+    Una pausa del sistema durante una corrida no debe hacer fallar la
+    comparación: solo se reporta lo que sigue empeorado tras args.retries
+    mediciones adicionales.
+
+    Returns:
+        Casos que siguen empeorados
+    """
+    for attempt in range(1, args.retries + 1):
+        if not regressions:
+            break
+        print(f"\nVolviendo a medir {len(regressions)} caso(s) (intento {attempt}/{args.retries})...")
+        groups = [group for group in BENCHMARKS if any(results[name]["group"] == group for name in regressions)]
+        for name, result in run_benchmarks(groups, config, args, verbose=False).items():
+            if name in results and result["median_us"] < results[name]["median_us"]:
+                results[name] = result
+        regressions = compare(
+            {name: results[name] for name in regressions},
+            baseline,
+            args.threshold,
+            args.min_delta,
+            verbose=False,
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--quick", action="store_true", help="Tamaños e iteraciones reducidos")
+    parser.add_argument(
+        "--only", nargs="+", choices=list(BENCHMARKS), help="Grupos de casos a correr"
+    )
+    parser.add_argument(
+        "--fake-embeddings",
+        action="store_true",
+        help="No cargar el modelo de embeddings (usa vectores deterministas)",
+    )
+    parser.add_argument("--output", type=Path, help="Archivo JSON de resultados")
+    parser.add_argument("--baseline", type=Path, help="JSON de una corrida anterior")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Empeoramiento tolerado (default: 0.2)"
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=1.0,
+        help="Empeoramiento absoluto mínimo en µs para marcar un caso (default: 1.0)",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=2,
+        help="Remediciones de un caso marcado antes de fallar (default: 2)",
+    )
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    config = CONFIGS["quick" if args.quick else "full"]
+
+    print(f"{'Caso':<32} {'Mediana (µs)':>13} {'p95 (µs)':>11} {'ops/s':>12}")
+    print("─" * 71)
+    groups = [group for group in BENCHMARKS if not args.only or group in args.only]
+    results = run_benchmarks(groups, config, args)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "mode": "quick" if args.quick else "full",
+            "fake_embeddings": args.fake_embeddings,
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"\nResultados guardados en {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline["meta"].get("fake_embeddings") != args.fake_embeddings:
+            print("⚠️  La referencia usó otro modelo de embeddings: los casos no son comparables")
+        regressions = compare(results, baseline["results"], args.threshold, args.min_delta)
+        regressions = recheck(regressions, results, baseline["results"], config, args)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regresión(es) > {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\n✅ Sin regresiones > {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
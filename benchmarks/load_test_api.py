@@ -0,0 +1,201 @@
+"""
+Prueba de carga del servicio HTTP (src/api.py) contra un LLM falso local.
+
+Levanta el servicio con uvicorn en este proceso, con un agente cuyo LLM es
+el stub local de src/fake_llm.py (latencia al primer token y velocidad de
+tokens configurables) y cuyos embeddings son deterministas con un costo por
+llamada simulado (para que el micro-batching tenga efecto medible), y lanza
+--concurrency clientes que envían --requests consultas mezclando balance,
+conocimiento y generales.
+
+Reporta, por tipo de request: respuestas OK, rechazadas (503), latencia
+p50/p95/p99 y consultas/s; al final, las estadísticas de /stats.
+
+Uso:
+    python benchmarks/load_test_api.py --requests 2000 --concurrency 100
+    python benchmarks/load_test_api.py --stream --no-micro-batching
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-load-test")
+
+import httpx
+import uvicorn
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+
+from src.agent import CustomerServiceAgent
+from src.api import create_app
+from src.embedding_batcher import MicroBatchingEmbeddings
+from src.fake_llm import FakeChatModel
+from src.knowledge_base import KnowledgeBaseManager
+
+QUERIES = {
+    "balance": ["Balance de la cédula V-12345678", "Saldo de V-87654321"],
+    "knowledge": [
+        "¿Cómo abrir una cuenta de ahorros?",
+        "¿Cómo solicitar una tarjeta de crédito?",
+        "¿Cómo hacer una transferencia?",
+    ],
+    "general": ["Hola, ¿qué servicios ofrecen?", "¿Cuál es el horario de atención?"],
+}
+
+class CostlyFakeEmbeddings(Embeddings):
+    """Embeddings deterministas con costo fijo por llamada más costo por texto."""
+
+    def __init__(self, call_ms: float, text_ms: float):
+        self.embeddings = DeterministicFakeEmbedding(size=384)
+        self.call_ms = call_ms
+        self.text_ms = text_ms
+        self._lock = threading.Lock()  # Un único modelo: las llamadas se serializan
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            time.sleep((self.call_ms + self.text_ms * len(texts)) / 1000)
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def agent_factory(args: argparse.Namespace, index_path: Path):
+    """Crea la función que construye el agente de la prueba."""
+
+    def create_agent() -> CustomerServiceAgent:
+        embeddings = CostlyFakeEmbeddings(args.embedding_call_ms, args.embedding_text_ms)
+        if not args.no_micro_batching:
+            embeddings = MicroBatchingEmbeddings(embeddings)
+
+        agent = CustomerServiceAgent()
+        llm = FakeChatModel(latency_ms=args.latency_ms, tokens_per_second=args.tokens_per_second)
+        agent.llm = llm
+        agent.router.llm = llm
+        agent.kb_manager = KnowledgeBaseManager(index_path=index_path, embeddings=embeddings)
+        agent.kb_manager.add_index_listener(agent._on_index_changed)
+        return agent
+
+    return create_agent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app, port: int) -> uvicorn.Server:
+    """Arranca uvicorn en un thread y espera a que acepte conexiones."""
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run_load(base_url: str, args: argparse.Namespace) -> tuple:
+    """Envía las consultas con `concurrency` clientes y registra los resultados."""
+    results = defaultdict(list)  # tipo -> [(status, latencia, primer byte)]
+    rng = random.Random(0)
+    plan = [rng.choice(list(QUERIES)) for _ in range(args.requests)]
+    pending = iter(enumerate(plan))
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+
+        async def send(i: int, kind: str) -> tuple:
+            # Consultas distintas entre sí: el caché semántico no las resuelve
+            query = f"{rng.choice(QUERIES[kind])} ({i})"
+            start_time = time.perf_counter()
+            if not args.stream:
+                response = await client.post("/query", json={"query": query})
+                elapsed = time.perf_counter() - start_time
+                return response.status_code, elapsed, elapsed
+
+            first_byte = None
+            async with client.stream("POST", "/query/stream", json={"query": query}) as response:
+                async for _ in response.aiter_lines():
+                    if first_byte is None:
+                        first_byte = time.perf_counter() - start_time
+            return response.status_code, time.perf_counter() - start_time, first_byte
+
+        async def worker():
+            for i, kind in pending:
+                results[kind].append(await send(i, kind))
+
+        start_time = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start_time
+        stats = (await client.get("/stats")).json()
+
+    return results, elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=1000, help="Consultas totales")
+    parser.add_argument("--concurrency", type=int, default=100, help="Clientes simultáneos")
+    parser.add_argument("--max-in-flight", type=int, default=64, help="Backpressure del servidor")
+    parser.add_argument("--stream", action="store_true", help="Usar /query/stream")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Latencia al primer token del LLM")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Velocidad del LLM")
+    parser.add_argument("--embedding-call-ms", type=float, default=20.0, help="Costo fijo por llamada al modelo de embeddings")
+    parser.add_argument("--embedding-text-ms", type=float, default=1.0, help="Costo por texto embebido")
+    parser.add_argument("--no-micro-batching", action="store_true", help="Embeber cada consulta por separado")
+    args = parser.parse_args()
+
+    import logging
+
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(
+            agent_factory=agent_factory(args, Path(tmp) / "index"),
+            max_in_flight=args.max_in_flight,
+        )
+        port = free_port()
+        server = start_server(app, port)
+        try:
+            results, elapsed, stats = asyncio.run(run_load(f"http://127.0.0.1:{port}", args))
+        finally:
+            server.should_exit = True
+
+    latency_label = "1er byte" if args.stream else "latencia"
+    print(f"\n{args.requests} consultas, {args.concurrency} clientes, "
+          f"max_in_flight={args.max_in_flight}, {elapsed:.1f}s "
+          f"({args.requests / elapsed:.1f} consultas/s)\n")
+    print(f"{'Tipo':<10} {'OK':>6} {'503':>6} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}  "
+          f"{latency_label} p50")
+    print("─" * 70)
+    for kind, entries in sorted(results.items()):
+        ok = [entry for entry in entries if entry[0] == 200]
+        rejected = sum(1 for entry in entries if entry[0] == 503)
+        latencies = np.array([entry[1] for entry in ok]) * 1000 if ok else np.zeros(1)
+        first = np.array([entry[2] for entry in ok]) * 1000 if ok else np.zeros(1)
+        print(
+            f"{kind:<10} {len(ok):>6} {rejected:>6} {np.percentile(latencies, 50):>9.0f} "
+            f"{np.percentile(latencies, 95):>9.0f} {np.percentile(latencies, 99):>9.0f}  "
+            f"{np.percentile(first, 50):>8.0f}"
+        )
+
+    print(f"\nServidor: {stats['server']}")
+    if "embedding_batching" in stats:
+        print(f"Micro-batching: {stats['embedding_batching']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,68 @@
-from langchain_community.document_loaders.directory import DirectoryLoader
-from langchain_community.vectorstores.faiss import FAISS
-from langchain_community.embeddings.huggingface import HuggingFaceEmbeddings
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
 
-loader = DirectoryLoader("../knowledge_base", glob="**/*.txt")
+SOLUTION_DIR = Path(__file__).parent
+sys.path.insert(0, str(SOLUTION_DIR.parent))
 
-docs = loader.load()
+from src.config import EMBEDDING_BATCH_SIZE, EMBEDDING_WORKERS
+from src.knowledge_base import KnowledgeBaseManager
 
-embeddings_model_name = "sentence-transformers/all-MiniLM-L6-v2"
-embeddings = HuggingFaceEmbeddings(model_name=embeddings_model_name)
 
-db = FAISS.from_documents(docs, embeddings)
+def main():
+    parser = argparse.ArgumentParser(description="Construye el índice FAISS de la base de conocimientos")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Re-embeber solo los documentos agregados/modificados según el manifiesto",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=EMBEDDING_WORKERS,
+        help=f"Procesos para embeber (default: {EMBEDDING_WORKERS})",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=EMBEDDING_BATCH_SIZE,
+        help=f"Chunks por lote de embedding (default: {EMBEDDING_BATCH_SIZE})",
+    )
+    args = parser.parse_args()
 
-db.save_local("./index")
+    if args.workers < 1:
+        parser.error("--workers debe ser al menos 1")
+    if args.batch_size < 1:
+        parser.error("--batch-size debe ser al menos 1")
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+
+    kb = KnowledgeBaseManager(
+        index_path=SOLUTION_DIR / "index",
+        knowledge_base_path=SOLUTION_DIR.parent / "knowledge_base",
+        auto_load=False,
+        embedding_batch_size=args.batch_size,
+        embedding_workers=args.workers,
+    )
+
+    start_time = time.perf_counter()
+    if args.incremental:
+        summary = kb.update_index()
+        print(
+            f"Agregados: {len(summary['added'])} | "
+            f"Modificados: {len(summary['changed'])} | "
+            f"Eliminados: {len(summary['deleted'])}"
+        )
+    else:
+        kb.create_index()
+    elapsed_time = time.perf_counter() - start_time
+
+    total = kb.vectorstore.index.ntotal
+    print(f"Índice con {total} chunks en {elapsed_time:.2f}s ({total / elapsed_time:.1f} docs/s)")
+
+
+# El guard es necesario: los workers de embedding se lanzan con "spawn"
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
-from langchain_openai import ChatOpenAI
+import sys
+from pathlib import Path
+
 from langchain_core.tools import tool
 from langchain_community.vectorstores.faiss import FAISS
 from langchain_community.embeddings.huggingface import HuggingFaceEmbeddings
@@ -10,19 +12,32 @@ from dotenv import load_dotenv, find_dotenv
 
 _ = load_dotenv(find_dotenv())  # read local .env file
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.knowledge_base import current_index_dir
+from src.llm_client import get_chat_model
 
-llm = ChatOpenAI(model="gpt-4-0125-preview")
+# Cliente compartido (pool HTTP keep-alive del proceso)
+llm = get_chat_model("gpt-4-0125-preview")
 
 embeddings_model_name = "sentence-transformers/all-MiniLM-L6-v2"
 embeddings = HuggingFaceEmbeddings(model_name=embeddings_model_name)
 
 db = FAISS.load_local(
-    "./index",
+    str(current_index_dir(Path("./index"))),
     embeddings,
     allow_dangerous_deserialization=True,
 )
 retriever = db.as_retriever(k=1)
 
+# Se construye una sola vez: la tool se invoca en cada paso del agente
+bank_info_chain = RetrievalQA.from_chain_type(
+    llm=llm,
+    chain_type="stuff",
+    retriever=retriever,
+    verbose=True,
+)
+
 from langchain.agents import tool
 
 
@@ -38,12 +53,6 @@ def get_balance_by_id(cedula_id: str) -> str:
 @tool
 def get_bank_information(question: str) -> str:
     """Obtiene informacion general del banco sobre tramites de cuentas de ahorros, tarjetas de credito y transferencias."""
-    bank_info_chain = RetrievalQA.from_chain_type(
-        llm=llm,
-        chain_type="stuff",
-        retriever=retriever,
-        verbose=True,
-    )
     response = bank_info_chain.invoke({"query": question})
     return response["result"]
 
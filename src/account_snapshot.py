@@ -0,0 +1,198 @@
+"""
+Snapshot binario del almacén columnar de cuentas.
+
+Guarda las columnas de ColumnarAccountStore como archivos .npy junto al CSV
+para abrirlas con memory-mapping: cargar un snapshot no parsea texto ni
+copia datos (las páginas se leen bajo demanda y los procesos worker las
+comparten vía el caché del sistema operativo).
+
+Estructura del directorio (por defecto `saldos.snapshot/` junto a `saldos.csv`):
+    snapshot.json       Generación vigente y stat (tamaño, mtime) del CSV de origen
+    gen-<id>/           Columnas: keys.npy, name_buffer.npy, name_offsets.npy,
+                        balance_cents.npy, file_rows.npy e irregular.json
+
+Cada escritura crea una generación nueva y reemplaza snapshot.json con
+os.replace, de modo que un lector nunca ve columnas de versiones mezcladas.
+Después se borran las generaciones más viejas que la anterior a la vigente
+(los procesos que las tienen mapeadas siguen leyendo los archivos ya
+abiertos); varios procesos pueden escribir a la vez sin borrarse entre sí
+la generación publicada ni los directorios de staging en uso.
+
+Uso (conversión explícita):
+    python -m src.account_snapshot data/saldos.csv
+"""
+
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from src.account_store import ColumnarAccountStore
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 2
+SNAPSHOT_MANIFEST = "snapshot.json"
+SNAPSHOT_COLUMNS = ("keys", "name_buffer", "name_offsets", "balance_cents", "file_rows")
+SNAPSHOT_IRREGULAR = "irregular.json"
+
+# Antigüedad (segundos) a partir de la cual un directorio de staging se
+# considera resto de una escritura interrumpida y se borra
+STALE_STAGING_SECONDS = 3600
+
+
+def snapshot_path_for(csv_path: Path) -> Path:
+    """Directorio del snapshot de un CSV (ej: data/saldos.csv -> data/saldos.snapshot)."""
+    return Path(csv_path).with_suffix(".snapshot")
+
+
+def source_stat(csv_path: Path) -> dict:
+    """Tamaño y mtime del CSV: identifican la versión de la que sale un snapshot."""
+    stat = os.stat(csv_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def write_snapshot(
+    store: ColumnarAccountStore,
+    csv_path: Path,
+    source: Optional[dict] = None,
+    path: Optional[Path] = None,
+) -> Path:
+    """
+    Escribe el snapshot de un almacén columnar construido a partir de un CSV.
+
+    Args:
+        store: Almacén construido desde csv_path
+        csv_path: CSV de origen
+        source: source_stat del CSV tomado antes de leerlo (default: el
+            actual); si el CSV cambia durante la carga, el snapshot queda
+            marcado con la versión leída y no se usa
+        path: Directorio del snapshot (default: junto al CSV)
+
+    Returns:
+        Directorio de la generación escrita
+    """
+    path = Path(path) if path is not None else snapshot_path_for(csv_path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    generation = f"gen-{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+    staging = path / f".{generation}"
+    staging.mkdir()
+    for column in SNAPSHOT_COLUMNS:
+        np.save(staging / f"{column}.npy", np.ascontiguousarray(getattr(store, column)))
+    with open(staging / SNAPSHOT_IRREGULAR, "w", encoding="utf-8") as f:
+        json.dump(store.irregular_index, f, ensure_ascii=False)
+    os.replace(staging, path / generation)
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "generation": generation,
+        "rows": len(store),
+        "source": source or source_stat(csv_path),
+    }
+    manifest_tmp = path / f".{SNAPSHOT_MANIFEST}.{generation}"
+    with open(manifest_tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_tmp, path / SNAPSHOT_MANIFEST)
+
+    _remove_old_generations(path)
+
+    logger.info(f"Snapshot de cuentas escrito en {path / generation} ({len(store)} registros)")
+    return path / generation
+
+
+def _remove_old_generations(path: Path) -> None:
+    """
+    Borra las generaciones que ya no puede estar usando nadie.
+
+    La generación vigente se relee del manifiesto (otro proceso pudo
+    publicar después de esta escritura) y se conservan ella, las más nuevas
+    (escritores que todavía no reemplazaron el manifiesto) y la anterior,
+    que un lector que leyó el manifiesto justo antes del reemplazo puede
+    estar abriendo. Los nombres gen-<time_ns>-... ordenan por antigüedad.
+    """
+    try:
+        with open(path / SNAPSHOT_MANIFEST, "r", encoding="utf-8") as f:
+            current = json.load(f)["generation"]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return
+
+    generations = sorted(
+        entry.name for entry in path.iterdir() if entry.is_dir() and entry.name.startswith("gen-")
+    )
+    older = [name for name in generations if name < current]
+    for name in older[:-1]:
+        shutil.rmtree(path / name, ignore_errors=True)
+
+    # Staging de escrituras interrumpidas (los de escrituras en curso son recientes)
+    stale = time.time() - STALE_STAGING_SECONDS
+    for entry in path.iterdir():
+        try:
+            if entry.is_dir() and entry.name.startswith(".gen-") and entry.stat().st_mtime < stale:
+                shutil.rmtree(entry, ignore_errors=True)
+        except FileNotFoundError:
+            continue
+
+
+def load_snapshot(csv_path: Path, path: Optional[Path] = None) -> Optional[ColumnarAccountStore]:
+    """
+    Abre el snapshot de un CSV con memory-mapping, si está vigente.
+
+    Args:
+        csv_path: CSV de origen
+        path: Directorio del snapshot (default: junto al CSV)
+
+    Returns:
+        Almacén columnar de solo lectura, o None si no hay snapshot o el CSV
+        cambió desde que se escribió
+    """
+    path = Path(path) if path is not None else snapshot_path_for(csv_path)
+    try:
+        with open(path / SNAPSHOT_MANIFEST, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        logger.info(f"Snapshot de cuentas con versión distinta en {path}: se ignora")
+        return None
+    if manifest["source"] != source_stat(csv_path):
+        logger.info(f"Snapshot de cuentas desactualizado respecto de {csv_path}")
+        return None
+
+    generation = path / manifest["generation"]
+    try:
+        columns = {
+            column: np.load(generation / f"{column}.npy", mmap_mode="r")
+            for column in SNAPSHOT_COLUMNS
+        }
+        with open(generation / SNAPSHOT_IRREGULAR, "r", encoding="utf-8") as f:
+            irregular_index = json.load(f)
+    except FileNotFoundError:
+        # Otro proceso reemplazó la generación entre la lectura del manifiesto y la apertura
+        logger.warning(f"Snapshot de cuentas incompleto en {generation}: se ignora")
+        return None
+
+    store = ColumnarAccountStore(irregular_index=irregular_index, **columns)
+    if len(store) != manifest["rows"]:
+        logger.warning(f"Snapshot de cuentas inconsistente en {generation}: se ignora")
+        return None
+    return store
+
+
+if __name__ == "__main__":
+    from src.config import CSV_FILE
+    from src.csv_query import CSVQueryManager
+
+    logging.basicConfig(level=logging.INFO)
+    csv_file = Path(sys.argv[1]) if len(sys.argv) > 1 else CSV_FILE
+    source = source_stat(csv_file)
+    manager = CSVQueryManager(csv_file, backend="columnar", snapshot=False)
+    write_snapshot(manager.store, csv_file, source=source)
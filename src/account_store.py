@@ -0,0 +1,513 @@
+"""
+Almacenes en memoria de las cuentas del CSV.
+
+- DataFrameAccountStore: DataFrame de pandas más un índice hash
+  cédula -> fila. Simple, pero cada cédula y cada nombre es un objeto str de
+  Python (~60+ bytes por celda).
+- ColumnarAccountStore: columnas compactas. Las cédulas se codifican como
+  int64 ordenados (búsqueda binaria), los nombres van en un único buffer
+  UTF-8 con offsets, los balances en centavos (int64) y la posición de cada
+  fila en el archivo (int64): unos 32 bytes más el nombre por cuenta, pensado para decenas de millones de cuentas por proceso.
+  Se puede construir por bloques de filas (from_chunks), sin tener nunca el
+  CSV completo en un DataFrame.
+
+Ambos reciben cédulas ya normalizadas (strip + upper) y exponen la misma
+interfaz: find, search_by_name, to_dataframe y memory_bytes.
+"""
+
+import re
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.name_index import NameSearchIndex
+
+# Backends disponibles (ACCOUNT_STORE_BACKEND)
+ACCOUNT_STORE_BACKENDS = ("pandas", "columnar")
+
+ACCOUNT_COLUMNS = ["ID_Cedula", "Nombre", "Balance"]
+
+# Cuenta encontrada: (cédula, nombre, balance)
+Account = Tuple[str, str, float]
+
+# Forma canónica de una cédula normalizada: letra, guion y número sin ceros
+# a la izquierda (así la codificación a entero es reversible)
+CEDULA_PATTERN = re.compile(r"^([A-Z])-([1-9]\d{0,11})$")
+_LETTER_BASE = 10**12
+
+
+def encode_cedula(cedula: str) -> Optional[int]:
+    """
+    Codifica una cédula normalizada como entero (letra * 10^12 + número).
+
+    Args:
+        cedula: Cédula normalizada (ej: "V-12345678")
+
+    Returns:
+        Entero que conserva el orden y es reversible, o None si la cédula no
+        tiene la forma canónica
+    """
+    match = CEDULA_PATTERN.match(cedula)
+    if match is None:
+        return None
+    return (ord(match.group(1)) - 64) * _LETTER_BASE + int(match.group(2))
+
+
+def decode_cedula(key: int) -> str:
+    """Inversa de encode_cedula."""
+    letter, number = divmod(int(key), _LETTER_BASE)
+    return f"{chr(letter + 64)}-{number}"
+
+
+def normalize_cedulas(cedulas: pd.Series) -> pd.Series:
+    """Normaliza una columna de cédulas igual que las consultas (strip + upper)."""
+    return cedulas.astype(str).str.strip().str.upper()
+
+
+class DataFrameAccountStore:
+    """Cuentas en un DataFrame de pandas con índice hash de cédulas."""
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Construye el índice de cédulas sobre el DataFrame.
+
+        Args:
+            df: DataFrame con las columnas ID_Cedula, Nombre y Balance
+        """
+        self.df = df
+        self._build_cedula_index()
+
+        self._name_index_lock = threading.Lock()
+        self._name_index: Optional[NameSearchIndex] = None
+
+    def _build_cedula_index(self) -> None:
+        """
+        Construye un índice hash cédula normalizada -> posición de fila.
+
+        Se construye una sola vez al cargar los datos para que cada consulta
+        de balance sea O(1) en lugar de recorrer todo el DataFrame. Ante
+        cédulas duplicadas se conserva la primera aparición.
+        """
+        keys = normalize_cedulas(self.df["ID_Cedula"])
+        unique_keys = keys.drop_duplicates(keep="first")
+        self.cedula_index: Dict[str, int] = dict(zip(unique_keys.to_numpy(), unique_keys.index))
+
+        # Columnas como arrays para evitar construir un Series por consulta
+        self._cedulas = self.df["ID_Cedula"].to_numpy()
+        self._nombres = self.df["Nombre"].to_numpy()
+        self._balances = self.df["Balance"].to_numpy(dtype=float)
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def find(self, cedula: str) -> Optional[Account]:
+        """
+        Busca una cuenta por cédula normalizada.
+
+        Args:
+            cedula: Cédula normalizada (strip + upper)
+
+        Returns:
+            (cédula, nombre, balance) o None si no existe
+        """
+        position = self.cedula_index.get(cedula)
+        if position is None:
+            return None
+        return (
+            self._cedulas[position],
+            self._nombres[position],
+            float(self._balances[position]),
+        )
+
+    def search_by_name(
+        self, name: str, limit: Optional[int] = None, offset: int = 0, prefix: bool = False
+    ) -> pd.DataFrame:
+        """Filas cuyo nombre contiene el texto (ver ColumnarAccountStore.search_by_name)."""
+        return self.df.iloc[self.name_index().search(name, prefix=prefix, limit=limit, offset=offset)]
+
+    @property
+    def name_index_built(self) -> bool:
+        """Si ya se construyó el índice de nombres."""
+        return self._name_index is not None
+
+    def name_index(self) -> NameSearchIndex:
+        """Índice de búsqueda por nombre (se construye en la primera búsqueda)."""
+        if self._name_index is None:
+            with self._name_index_lock:
+                if self._name_index is None:
+                    self._name_index = NameSearchIndex(self.df["Nombre"].fillna("").astype(str).tolist())
+        return self._name_index
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """El DataFrame subyacente (sin copiar)."""
+        return self.df
+
+    def memory_bytes(self) -> int:
+        """Memoria aproximada del DataFrame y del índice, en bytes."""
+        index_bytes = sys.getsizeof(self.cedula_index) + sum(
+            sys.getsizeof(key) for key in self.cedula_index
+        )
+        if self._name_index is not None:
+            index_bytes += self._name_index.memory_bytes()
+        return int(self.df.memory_usage(deep=True).sum()) + index_bytes
+
+
+class ColumnarAccountStore:
+    """
+    Cuentas en columnas compactas ordenadas por cédula.
+
+    Las filas con cédula en forma canónica van primero, ordenadas por su
+    codificación entera (búsqueda binaria con np.searchsorted); las demás
+    (formatos irregulares, raras en la práctica) van al final con un índice
+    hash aparte. file_rows guarda la posición de cada fila en el archivo:
+    las búsquedas por nombre y to_dataframe devuelven las cuentas en ese
+    orden, igual que DataFrameAccountStore.
+    """
+
+    def __init__(
+        self,
+        keys: np.ndarray,
+        name_buffer: np.ndarray,
+        name_offsets: np.ndarray,
+        balance_cents: np.ndarray,
+        irregular_index: Optional[Dict[str, int]] = None,
+        file_rows: Optional[np.ndarray] = None,
+    ):
+        """
+        Inicializa el almacén con columnas ya construidas.
+
+        Args:
+            keys: Cédulas codificadas (int64, ordenadas, sin duplicados), una
+                por cada fila regular
+            name_buffer: Nombres concatenados en UTF-8 (uint8)
+            name_offsets: Offset de inicio de cada nombre en name_buffer más
+                el final (int64, len = filas + 1)
+            balance_cents: Balances en centavos (int64)
+            irregular_index: Cédula normalizada -> fila, para las cédulas sin
+                forma canónica (ubicadas después de las regulares)
+            file_rows: Posición en el archivo de cada fila (int64; default:
+                las filas ya están en el orden del archivo)
+        """
+        self.keys = keys
+        self.name_buffer = name_buffer
+        self.name_offsets = name_offsets
+        self.balance_cents = balance_cents
+        self.irregular_index = irregular_index or {}
+        self._irregular_cedulas = {row: cedula for cedula, row in self.irregular_index.items()}
+        self.file_rows = (
+            file_rows if file_rows is not None else np.arange(len(balance_cents), dtype=np.int64)
+        )
+
+        self._name_index_lock = threading.Lock()
+        self._name_index: Optional[NameSearchIndex] = None
+        self._file_order: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "ColumnarAccountStore":
+        """
+        Construye las columnas compactas a partir de un DataFrame.
+
+        Ante cédulas duplicadas se conserva la primera aparición, como en
+        DataFrameAccountStore.
+
+        Args:
+            df: DataFrame con las columnas ID_Cedula, Nombre y Balance
+
+        Returns:
+            Almacén columnar
+
+        Raises:
+            ValueError: Si algún balance no es numérico
+        """
+        return cls.from_chunks([df])
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame]) -> "ColumnarAccountStore":
+        """
+        Construye las columnas compactas a partir de bloques de filas.
+
+        Cada bloque se convierte de inmediato a columnas compactas (cédula
+        codificada, nombre en UTF-8 y balance en centavos) y se descarta:
+        la memoria depende del tamaño del bloque y no del CSV completo. Al
+        final se ordena por cédula como en from_dataframe.
+
+        Args:
+            chunks: DataFrames con las columnas ID_Cedula, Nombre y Balance,
+                en el orden del archivo (ej: pd.read_csv con chunksize)
+
+        Returns:
+            Almacén columnar
+
+        Raises:
+            ValueError: Si algún balance no es numérico
+        """
+        key_parts: List[np.ndarray] = []
+        length_parts: List[np.ndarray] = []
+        buffer_parts: List[np.ndarray] = []
+        cents_parts: List[np.ndarray] = []
+        irregular_first: Dict[str, int] = {}  # Cédula irregular -> primera fila del archivo
+        irregular_rows = 0
+        total = 0
+
+        for chunk in chunks:
+            cedulas = normalize_cedulas(chunk["ID_Cedula"]).to_numpy()
+            encoded = np.fromiter(
+                (encode_cedula(cedula) or -1 for cedula in cedulas), dtype=np.int64, count=len(cedulas)
+            )
+            irregular = np.flatnonzero(encoded < 0)
+            irregular_rows += len(irregular)
+            for row in irregular:
+                irregular_first.setdefault(cedulas[row], total + int(row))
+
+            balances = chunk["Balance"].to_numpy(dtype=float)
+            if np.isnan(balances).any():
+                raise ValueError("El CSV contiene balances vacíos o no numéricos")
+
+            buffer, offsets = encode_names(chunk["Nombre"].fillna("").astype(str).to_numpy())
+            key_parts.append(encoded)
+            length_parts.append(np.diff(offsets))
+            buffer_parts.append(buffer)
+            cents_parts.append(np.rint(balances * 100).astype(np.int64))
+            total += len(cedulas)
+
+        # Cada columna se une y sus bloques se liberan antes de la siguiente
+        encoded = _concatenate(key_parts, np.int64)
+        balance_cents = _concatenate(cents_parts, np.int64)
+        name_buffer = _concatenate(buffer_parts, np.uint8)
+        name_offsets = np.zeros(total + 1, dtype=np.int64)
+        np.cumsum(_concatenate(length_parts, np.int64), out=name_offsets[1:])
+
+        # Filas regulares: ordenar por cédula codificada (estable, para que
+        # entre duplicados quede primero la primera aparición). Las
+        # irregulares (-1) quedan al principio del orden y se saltan
+        order = np.argsort(encoded, kind="stable")[irregular_rows:]
+        keys = encoded[order]
+        del encoded
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+        keys = keys[first]
+        rows = order[first]
+        del order, first
+
+        # Filas irregulares: al final, deduplicadas por cédula normalizada
+        irregular_index = {cedula: len(rows) + i for i, cedula in enumerate(irregular_first)}
+        rows = np.concatenate([rows, np.fromiter(irregular_first.values(), dtype=np.int64)])
+
+        name_buffer, name_offsets = gather_names(name_buffer, name_offsets, rows)
+        return cls(
+            keys, name_buffer, name_offsets, balance_cents[rows], irregular_index, file_rows=rows
+        )
+
+    def __len__(self) -> int:
+        return len(self.balance_cents)
+
+    def find(self, cedula: str) -> Optional[Account]:
+        """
+        Busca una cuenta por cédula normalizada.
+
+        Args:
+            cedula: Cédula normalizada (strip + upper)
+
+        Returns:
+            (cédula, nombre, balance) o None si no existe
+        """
+        key = encode_cedula(cedula)
+        if key is None:
+            row = self.irregular_index.get(cedula)
+        else:
+            row = int(self.keys.searchsorted(key))
+            if row == len(self.keys) or self.keys[row] != key:
+                row = None
+        if row is None:
+            return None
+        return cedula, self.name(row), int(self.balance_cents[row]) / 100
+
+    def name(self, row: int) -> str:
+        """Nombre de la fila, decodificado del buffer UTF-8."""
+        start, end = self.name_offsets[row], self.name_offsets[row + 1]
+        return self.name_buffer[start:end].tobytes().decode("utf-8")
+
+    def cedula(self, row: int) -> str:
+        """Cédula (normalizada) de la fila."""
+        if row < len(self.keys):
+            return decode_cedula(self.keys[row])
+        return self._irregular_cedulas[row]
+
+    def search_by_name(
+        self, name: str, limit: Optional[int] = None, offset: int = 0, prefix: bool = False
+    ) -> pd.DataFrame:
+        """
+        Filas cuyo nombre contiene el texto, sin distinguir mayúsculas ni acentos.
+
+        Usa el índice de nombres (src/name_index.py), construido en la
+        primera búsqueda sobre los nombres en el orden del archivo: el costo
+        por consulta depende de las coincidencias y no del total de cuentas,
+        y las páginas coinciden con las de DataFrameAccountStore.
+
+        Args:
+            name: Nombre o parte del nombre a buscar
+            limit: Resultados como máximo (None = todos)
+            offset: Resultados a saltar (paginación, en orden del archivo)
+            prefix: Solo nombres con alguna palabra que empiece con el texto
+
+        Returns:
+            DataFrame con los resultados
+        """
+        positions = self.name_index().search(name, prefix=prefix, limit=limit, offset=offset)
+        return self._rows_to_dataframe(self.file_order()[positions])
+
+    @property
+    def name_index_built(self) -> bool:
+        """Si ya se construyó el índice de nombres."""
+        return self._name_index is not None
+
+    def name_index(self) -> NameSearchIndex:
+        """
+        Índice de búsqueda por nombre (se construye en la primera búsqueda).
+
+        Indexa los nombres en el orden del archivo: sus posiciones se
+        traducen a filas con file_order().
+        """
+        if self._name_index is None:
+            with self._name_index_lock:
+                if self._name_index is None:
+                    names = np.array(self.names(), dtype=object)[self.file_order()]
+                    self._name_index = NameSearchIndex(names.tolist())
+        return self._name_index
+
+    def file_order(self) -> np.ndarray:
+        """Filas en el orden del archivo (la inversa de file_rows)."""
+        if self._file_order is None:
+            self._file_order = np.argsort(self.file_rows, kind="stable")
+        return self._file_order
+
+    def names(self) -> List[str]:
+        """Todos los nombres, decodificados del buffer de una sola vez."""
+        count = len(self)
+        if count == 0:
+            return []
+        # Buffer con un salto de línea después de cada nombre (y ninguno dentro)
+        separators = self.name_offsets[1:] + np.arange(count)
+        joined = np.full(len(self.name_buffer) + count, ord("\n"), dtype=np.uint8)
+        in_name = np.ones(len(joined), dtype=bool)
+        in_name[separators] = False
+        joined[in_name] = np.where(self.name_buffer == ord("\n"), ord(" "), self.name_buffer)
+        return joined[:-1].tobytes().decode("utf-8").split("\n")
+
+    def _rows_to_dataframe(self, rows: Sequence[int]) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "ID_Cedula": [self.cedula(row) for row in rows],
+                "Nombre": [self.name(row) for row in rows],
+                "Balance": self.balance_cents[np.asarray(rows, dtype=np.int64)] / 100,
+            },
+            columns=ACCOUNT_COLUMNS,
+        )
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Materializa todas las cuentas, en el orden del archivo (costoso con millones de filas)."""
+        return self._rows_to_dataframe(self.file_order())
+
+    def memory_bytes(self) -> int:
+        """Memoria de las columnas (y del índice de nombres, si se construyó), en bytes."""
+        total = sum(
+            array.nbytes
+            for array in (
+                self.keys, self.name_buffer, self.name_offsets, self.balance_cents, self.file_rows
+            )
+        )
+        if self._file_order is not None:
+            total += self._file_order.nbytes
+        total += sys.getsizeof(self.irregular_index) + sum(
+            sys.getsizeof(key) for key in self.irregular_index
+        )
+        if self._name_index is not None:
+            total += self._name_index.memory_bytes()
+        return total
+
+
+def encode_names(names: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Concatena nombres en un buffer UTF-8.
+
+    Args:
+        names: Nombres en orden de fila
+
+    Returns:
+        Tupla (buffer uint8, offsets int64 con len(names) + 1 entradas)
+    """
+    encoded: List[bytes] = [name.encode("utf-8") for name in names]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+    buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return buffer, offsets
+
+
+def gather_names(
+    buffer: np.ndarray, offsets: np.ndarray, rows: np.ndarray, block_rows: int = 1 << 16
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reordena nombres codificados con encode_names.
+
+    Trabaja por bloques de filas para que los arreglos temporales (largos,
+    índices de bytes) no crezcan con el total de nombres.
+
+    Args:
+        buffer: Buffer UTF-8 de origen
+        offsets: Offsets de origen (len = filas + 1)
+        rows: Filas de origen en el nuevo orden
+        block_rows: Filas procesadas por bloque
+
+    Returns:
+        Tupla (buffer uint8, offsets int64) en el orden de rows
+    """
+    blocks = [(block, min(block + block_rows, len(rows))) for block in range(0, len(rows), block_rows)]
+
+    new_offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    for block, block_end in blocks:
+        block_source = rows[block:block_end]
+        new_offsets[block + 1:block_end + 1] = offsets[block_source + 1] - offsets[block_source]
+    np.cumsum(new_offsets, out=new_offsets)
+
+    new_buffer = np.empty(int(new_offsets[-1]), dtype=np.uint8)
+    for block, block_end in blocks:
+        base, size = new_offsets[block], new_offsets[block_end] - new_offsets[block]
+        starts = new_offsets[block:block_end + 1] - base
+        # Byte j del bloque: offset de origen de su fila + posición dentro del nombre
+        shift = offsets[rows[block:block_end]] - starts[:-1]
+        index = np.repeat(shift, np.diff(starts)) + np.arange(size)
+        new_buffer[base:base + size] = buffer[index]
+    return new_buffer, new_offsets
+
+
+def _concatenate(parts: List[np.ndarray], dtype) -> np.ndarray:
+    """Une los bloques de una columna y vacía la lista (libera los bloques)."""
+    result = np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+    parts.clear()
+    return result
+
+
+def create_account_store(df: pd.DataFrame, backend: str):
+    """
+    Construye el almacén de cuentas del backend indicado.
+
+    Args:
+        df: DataFrame con las columnas ID_Cedula, Nombre y Balance
+        backend: "pandas" o "columnar"
+
+    Returns:
+        DataFrameAccountStore o ColumnarAccountStore
+
+    Raises:
+        ValueError: Si el backend no existe
+    """
+    if backend == "pandas":
+        return DataFrameAccountStore(df)
+    if backend == "columnar":
+        return ColumnarAccountStore.from_dataframe(df)
+    raise ValueError(
+        f"Backend de cuentas desconocido: '{backend}'. Opciones: {', '.join(ACCOUNT_STORE_BACKENDS)}"
+    )
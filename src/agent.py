@@ -4,18 +4,89 @@ Integra todos los componentes: router, CSV, knowledge base y LLM.
 """
 
 import logging
-from typing import Dict, Optional
-from langchain_openai import ChatOpenAI
-from langchain.chains import RetrievalQA
-from langchain_core.prompts import PromptTemplate
+import threading
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional
 
-from src.config import LLM_MODEL, LLM_TEMPERATURE
+from src.config import (
+    ACCOUNT_RELOAD_INTERVAL_SECONDS,
+    INTENT_CLASSIFIER_ENABLED,
+    LLM_MODEL,
+    LLM_TEMPERATURE,
+    SEMANTIC_CACHE_ENABLED,
+)
+from src.llm_client import get_chat_model, require_llm_backend
+from src.metrics import Metrics
 from src.router import QueryRouter, QueryType
-from src.csv_query import CSVQueryManager, format_balance_response
-from src.knowledge_base import KnowledgeBaseManager, format_knowledge_response
+from src.semantic_cache import SemanticCache
+from src.intent_classifier import EmbeddingIntentClassifier
+
+# Módulos pesados (langchain_openai, langchain_core.prompts, pandas, FAISS,
+# torch) se importan en el primer uso del componente que los necesita
+if TYPE_CHECKING:
+    from langchain.chains import RetrievalQA
+    from langchain_core.documents import Document
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from src.csv_query import CSVQueryManager
+    from src.knowledge_base import KnowledgeBaseManager
 
 logger = logging.getLogger(__name__)
 
+# Componentes que se inicializan en el primer uso
+LAZY_COMPONENTS = ("llm", "csv_manager", "kb_manager", "knowledge_chain")
+
+# Prompt de las consultas de conocimiento (chain RetrievalQA y streaming)
+KNOWLEDGE_PROMPT_TEMPLATE = """Eres un asistente bancario experto y amigable de BANCO HENRY.
+Usa la siguiente información para responder la pregunta del cliente de manera clara y profesional.
+
+Contexto de la base de conocimientos:
+{context}
+
+Pregunta del cliente: {question}
+
+Proporciona una respuesta detallada y útil basándote en el contexto. Si la información no está en el contexto, indícalo amablemente.
+
+Respuesta:"""
+
+
+class _KnowledgeBaseEmbeddings:
+    """
+    Embeddings de la base de conocimientos resueltos en el primer uso, para
+    que el router pueda recibirlos sin forzar la carga del modelo (misma
+    interfaz que langchain_core.embeddings.Embeddings).
+    """
+
+    def __init__(self, agent: "CustomerServiceAgent"):
+        self._agent = agent
+        # Último embedding de consulta por thread: el clasificador de
+        # intención y el caché semántico embeben el mismo texto
+        self._last = threading.local()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._agent.kb_manager.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self._cached(text)
+        if vector is None:
+            embeddings = self._agent.kb_manager.embeddings
+            with self._agent.metrics.time("embed"):
+                vector = embeddings.embed_query(text)
+            self._last.entry = (text, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        vector = self._cached(text)
+        if vector is None:
+            embeddings = self._agent.kb_manager.embeddings
+            with self._agent.metrics.time("embed"):
+                vector = await embeddings.aembed_query(text)
+            self._last.entry = (text, vector)
+        return vector
+
+    def _cached(self, text: str) -> Optional[List[float]]:
+        entry = getattr(self._last, "entry", None)
+        return entry[1] if entry is not None and entry[0] == text else None
+
 
 class CustomerServiceAgent:
     """Agente principal de atención al cliente."""
@@ -32,44 +103,164 @@ class CustomerServiceAgent:
         """
         logger.info("Inicializando CustomerServiceAgent...")
 
-        # Componentes principales
-        self.llm = ChatOpenAI(model=llm_model, temperature=temperature)
-        self.router = QueryRouter(llm_model=llm_model)
-        self.csv_manager = CSVQueryManager()
-        self.kb_manager = KnowledgeBaseManager()
+        require_llm_backend()
+
+        # Componentes principales. El LLM, el CSV, la base de conocimientos
+        # (modelo de embeddings + índice FAISS) y el chain se crean en el
+        # primer uso: una consulta de balance no paga la carga del modelo
+        self.llm_model = llm_model
+        self.temperature = temperature
+        self._components: Dict[str, object] = {}
+        self._component_locks = {name: threading.Lock() for name in LAZY_COMPONENTS}
+        self.init_times: Dict[str, float] = {}
+
+        # Latencia por etapa, tokens del LLM y errores
+        self.metrics = Metrics()
+
+        # El router y el caché semántico reutilizan el modelo de embeddings de la KB
+        self._query_embeddings = _KnowledgeBaseEmbeddings(self)
+        intent_classifier = (
+            EmbeddingIntentClassifier(self._query_embeddings)
+            if INTENT_CLASSIFIER_ENABLED
+            else None
+        )
+        self.router = QueryRouter(
+            llm_model=llm_model, intent_classifier=intent_classifier, metrics=self.metrics
+        )
 
-        # Chain para knowledge base
-        self._setup_knowledge_chain()
+        # Caché semántico de respuestas de knowledge base
+        self.response_cache: Optional[SemanticCache] = (
+            SemanticCache() if SEMANTIC_CACHE_ENABLED else None
+        )
 
-        # Estadísticas
+        # Estadísticas (protegidas por lock para uso concurrente)
+        self._stats_lock = threading.Lock()
         self.stats = {
             "balance_queries": 0,
             "knowledge_queries": 0,
             "general_queries": 0,
             "total_queries": 0,
+            "errors": 0,
         }
 
         logger.info("CustomerServiceAgent inicializado exitosamente")
 
-    def _setup_knowledge_chain(self) -> None:
-        """Configura el chain para consultas a la base de conocimientos."""
-        prompt_template = """Eres un asistente bancario experto y amigable de BANCO HENRY.
-Usa la siguiente información para responder la pregunta del cliente de manera clara y profesional.
+    def _get_component(self, name: str, factory: Callable[[], object]) -> object:
+        """
+        Retorna un componente, creándolo en el primer uso (thread-safe: si
+        varios threads lo piden a la vez, solo uno lo construye).
 
-Contexto de la base de conocimientos:
-{context}
+        Args:
+            name: Nombre del componente (uno de LAZY_COMPONENTS)
+            factory: Función que construye el componente
 
-Pregunta del cliente: {question}
+        Returns:
+            Componente inicializado
+        """
+        component = self._components.get(name)
+        if component is None:
+            with self._component_locks[name]:
+                component = self._components.get(name)
+                if component is None:
+                    start_time = time.perf_counter()
+                    component = factory()
+                    self.init_times[name] = time.perf_counter() - start_time
+                    logger.info(f"{name} inicializado en {self.init_times[name]:.2f}s")
+                    self._components[name] = component
+        return component
 
-Proporciona una respuesta detallada y útil basándote en el contexto. Si la información no está en el contexto, indícalo amablemente.
+    @property
+    def llm(self) -> "BaseChatModel":
+        """Cliente del LLM para respuestas (se crea en el primer uso)."""
+        return self._get_component("llm", self._create_llm)
 
-Respuesta:"""
+    @llm.setter
+    def llm(self, value: "BaseChatModel") -> None:
+        self._components["llm"] = value
+
+    @property
+    def csv_manager(self) -> "CSVQueryManager":
+        """Gestor de cuentas (carga el CSV en el primer uso)."""
+        return self._get_component("csv_manager", self._create_csv_manager)
+
+    @csv_manager.setter
+    def csv_manager(self, value: "CSVQueryManager") -> None:
+        self._components["csv_manager"] = value
+
+    @property
+    def kb_manager(self) -> "KnowledgeBaseManager":
+        """Base de conocimientos (carga el modelo y el índice en el primer uso)."""
+        return self._get_component("kb_manager", self._create_kb_manager)
+
+    @kb_manager.setter
+    def kb_manager(self, value: "KnowledgeBaseManager") -> None:
+        self._components["kb_manager"] = value
+
+    @property
+    def knowledge_chain(self) -> "RetrievalQA":
+        """Chain RetrievalQA (se construye en el primer uso)."""
+        return self._get_component("knowledge_chain", self._build_knowledge_chain)
+
+    @knowledge_chain.setter
+    def knowledge_chain(self, value: "RetrievalQA") -> None:
+        self._components["knowledge_chain"] = value
+
+    def _create_llm(self) -> "BaseChatModel":
+        """Obtiene el cliente del LLM (compartido por proceso)."""
+        return get_chat_model(self.llm_model, self.temperature)
+
+    def _create_csv_manager(self) -> "CSVQueryManager":
+        """Carga el CSV de cuentas y activa su recarga en caliente."""
+        from src.csv_query import CSVQueryManager
+
+        csv_manager = CSVQueryManager(metrics=self.metrics)
+        if ACCOUNT_RELOAD_INTERVAL_SECONDS > 0:
+            csv_manager.start_watching(ACCOUNT_RELOAD_INTERVAL_SECONDS)
+        return csv_manager
+
+    def _create_kb_manager(self) -> "KnowledgeBaseManager":
+        """Crea la base de conocimientos y se suscribe a sus cambios de índice."""
+        from src.knowledge_base import KnowledgeBaseManager
+
+        kb_manager = KnowledgeBaseManager()
+
+        # Al recargar o reconstruir el índice: nuevo retriever y caché vacío
+        kb_manager.add_index_listener(self._on_index_changed)
+        return kb_manager
+
+    def warmup(self) -> Dict[str, float]:
+        """
+        Inicializa todos los componentes de antemano (para servidores, donde
+        conviene pagar el arranque antes de recibir tráfico).
+
+        Returns:
+            Segundos que tomó inicializar cada componente
+        """
+        for name in LAZY_COMPONENTS:
+            getattr(self, name)
+        self.router.llm
+
+        intent_classifier = self.router.intent_classifier
+        if intent_classifier is not None:
+            start_time = time.perf_counter()
+            intent_classifier.fit()
+            self.init_times.setdefault(
+                "intent_classifier", time.perf_counter() - start_time
+            )
+
+        logger.info(f"Warmup completado: {self.init_times}")
+        return dict(self.init_times)
+
+    def _build_knowledge_chain(self) -> "RetrievalQA":
+        """Configura el chain para consultas a la base de conocimientos."""
+        from langchain.chains import RetrievalQA
+        from langchain_core.prompts import PromptTemplate
 
         PROMPT = PromptTemplate(
-            template=prompt_template, input_variables=["context", "question"]
+            template=KNOWLEDGE_PROMPT_TEMPLATE, input_variables=["context", "question"]
         )
 
-        self.knowledge_chain = RetrievalQA.from_chain_type(
+        return RetrievalQA.from_chain_type(
             llm=self.llm,
             chain_type="stuff",
             retriever=self.kb_manager.get_retriever(),
@@ -78,6 +269,13 @@ Respuesta:"""
             verbose=True,
         )
 
+    def _on_index_changed(self) -> None:
+        """Descarta el chain (se reconstruye con el nuevo retriever) e invalida el caché."""
+        with self._component_locks["knowledge_chain"]:
+            self._components.pop("knowledge_chain", None)
+        if self.response_cache is not None:
+            self.response_cache.clear()
+
     def process_query(self, query: str) -> Dict[str, any]:
         """
         Procesa una consulta del cliente y genera una respuesta.
@@ -89,41 +287,355 @@ Respuesta:"""
             Diccionario con la respuesta y metadatos
         """
         logger.info(f"Procesando consulta: '{query}'")
-        self.stats["total_queries"] += 1
+        self._increment_stat("total_queries")
+
+        with self.metrics.time("query"):
+            try:
+                # Clasificar la consulta
+                with self.metrics.time("route"):
+                    # Tabla de routing y cédula en una sola pasada
+                    rules = self.router.analyze_query(query)
+                    query_type = self.router.classify_query(query, rules)
+
+                # Procesar según el tipo
+                if query_type == QueryType.BALANCE:
+                    return self._handle_balance_query(query, rules.cedula)
+                elif query_type == QueryType.KNOWLEDGE:
+                    return self._handle_knowledge_query(query)
+                else:  # GENERAL
+                    return self._handle_general_query(query)
+
+            except Exception as e:
+                logger.error(f"Error procesando consulta: {e}", exc_info=True)
+                return self._error_response(e)
+
+    async def aprocess_query(self, query: str) -> Dict[str, any]:
+        """
+        Versión asíncrona de process_query.
+
+        Todas las llamadas al LLM usan ainvoke, de modo que un único event
+        loop puede mantener muchas conversaciones en curso sin un thread
+        por consulta.
+
+        Args:
+            query: Consulta del cliente
+
+        Returns:
+            Diccionario con la respuesta y metadatos
+        """
+        logger.info(f"Procesando consulta (async): '{query}'")
+        self._increment_stat("total_queries")
+
+        with self.metrics.time("query"):
+            try:
+                with self.metrics.time("route"):
+                    rules = self.router.analyze_query(query)
+                    query_type = await self.router.aclassify_query(query, rules)
+
+                if query_type == QueryType.BALANCE:
+                    return await self._ahandle_balance_query(query, rules.cedula)
+                elif query_type == QueryType.KNOWLEDGE:
+                    return await self._ahandle_knowledge_query(query)
+                else:  # GENERAL
+                    return await self._ahandle_general_query(query)
+
+            except Exception as e:
+                logger.error(f"Error procesando consulta: {e}", exc_info=True)
+                return self._error_response(e)
+
+    def stream_query(self, query: str) -> Iterator[Dict[str, any]]:
+        """
+        Procesa una consulta emitiendo la respuesta a medida que el LLM la genera.
+
+        Emite eventos {"type": "token", "content": str} con cada fragmento
+        del texto y, al final, un único evento {"type": "end", "result": dict}
+        con la respuesta completa y sus metadatos (query_type,
+        source_documents, ...), el mismo diccionario que retorna
+        process_query. Las respuestas que no genera el LLM (balance, caché,
+        errores) se emiten en un único token. Si la consulta falla, el
+        evento final lleva además "error": True; si el LLM falla después de
+        emitir texto, el mensaje de error no se agrega como token (el texto
+        emitido queda en result["partial_response"]).
+
+        Args:
+            query: Consulta del cliente
+
+        Yields:
+            Eventos de token y el evento final con el resultado
+        """
+        logger.info(f"Procesando consulta (streaming): '{query}'")
+        self._increment_stat("total_queries")
+        start_time = time.perf_counter()
 
         try:
-            # Clasificar la consulta
-            query_type = self.router.classify_query(query)
+            with self.metrics.time("route"):
+                rules = self.router.analyze_query(query)
+                query_type = self.router.classify_query(query, rules)
 
-            # Procesar según el tipo
-            if query_type == QueryType.BALANCE:
-                return self._handle_balance_query(query)
-            elif query_type == QueryType.KNOWLEDGE:
-                return self._handle_knowledge_query(query)
-            else:  # GENERAL
-                return self._handle_general_query(query)
+            if query_type == QueryType.KNOWLEDGE:
+                events = self._stream_knowledge_query(query)
+            elif query_type == QueryType.GENERAL:
+                events = self._stream_general_query(query)
+            else:  # BALANCE
+                events = self._complete_events(self._handle_balance_query(query, rules.cedula))
 
         except Exception as e:
             logger.error(f"Error procesando consulta: {e}", exc_info=True)
-            return {
-                "success": False,
-                "query_type": "error",
-                "response": f"Lo siento, ocurrió un error al procesar tu consulta: {str(e)}",
-                "error": str(e),
-            }
+            events = self._error_events(self._error_response(e), [])
+
+        try:
+            yield from events
+        finally:
+            self.metrics.observe("query", time.perf_counter() - start_time)
+
+    async def astream_query(self, query: str) -> AsyncIterator[Dict[str, any]]:
+        """
+        Versión asíncrona de stream_query (mismos eventos).
+
+        Args:
+            query: Consulta del cliente
+
+        Yields:
+            Eventos de token y el evento final con el resultado
+        """
+        logger.info(f"Procesando consulta (streaming async): '{query}'")
+        self._increment_stat("total_queries")
+        start_time = time.perf_counter()
+
+        try:
+            with self.metrics.time("route"):
+                rules = self.router.analyze_query(query)
+                query_type = await self.router.aclassify_query(query, rules)
+
+            if query_type == QueryType.KNOWLEDGE:
+                events = self._astream_knowledge_query(query)
+            elif query_type == QueryType.GENERAL:
+                events = self._astream_general_query(query)
+            else:  # BALANCE
+                events = self._acomplete_events(
+                    await self._ahandle_balance_query(query, rules.cedula)
+                )
+
+        except Exception as e:
+            logger.error(f"Error procesando consulta: {e}", exc_info=True)
+            events = self._aerror_events(self._error_response(e))
+
+        try:
+            async for event in events:
+                yield event
+        finally:
+            self.metrics.observe("query", time.perf_counter() - start_time)
+
+    def _complete_events(self, result: Dict[str, any]) -> Iterator[Dict[str, any]]:
+        """Emite una respuesta ya completa como un único token más el evento final."""
+        yield {"type": "token", "content": result["response"]}
+        yield {"type": "end", "result": result}
+
+    async def _acomplete_events(self, result: Dict[str, any]) -> AsyncIterator[Dict[str, any]]:
+        """Versión asíncrona de _complete_events."""
+        for event in self._complete_events(result):
+            yield event
+
+    def _error_events(
+        self, result: Dict[str, any], chunks: List[str]
+    ) -> Iterator[Dict[str, any]]:
+        """
+        Termina un stream que falló, con "error": True en el evento final.
+
+        Si todavía no se emitió texto, el mensaje de error va en un único
+        token (como las demás respuestas completas). Si ya se emitieron
+        fragmentos, no se agrega el mensaje como texto de la respuesta: el
+        evento final lleva el error y lo generado hasta el fallo en
+        "partial_response".
+
+        Args:
+            result: Respuesta de error
+            chunks: Fragmentos ya emitidos
+
+        Yields:
+            Eventos que cierran el stream
+        """
+        if chunks:
+            result = {**result, "partial_response": "".join(chunks)}
+        else:
+            yield {"type": "token", "content": result["response"]}
+        yield {"type": "end", "result": result, "error": True}
+
+    async def _aerror_events(self, result: Dict[str, any]) -> AsyncIterator[Dict[str, any]]:
+        """Versión asíncrona de _error_events (sin fragmentos emitidos)."""
+        for event in self._error_events(result, []):
+            yield event
+
+    def _stream_knowledge_query(self, query: str) -> Iterator[Dict[str, any]]:
+        """Versión en streaming de _handle_knowledge_query."""
+        logger.info("Procesando consulta de KNOWLEDGE BASE")
+        self._increment_stat("knowledge_queries")
+
+        chunks = []
+        try:
+            embedding = None
+            if self.response_cache is not None:
+                embedding = self._query_embeddings.embed_query(query)
+                cached = self.response_cache.get(embedding)
+                if cached is not None:
+                    yield from self._complete_events({**cached, "cached": True})
+                    return
+
+            # Mismo retriever y prompt que el chain, pero el LLM se consume
+            # en streaming en lugar de esperar la respuesta completa
+            documents = self._retrieve_documents(query, embedding)
+            for token in self._stream_llm(self._knowledge_prompt(query, documents)):
+                chunks.append(token)
+                yield {"type": "token", "content": token}
+        except Exception as e:
+            logger.error(f"Error en knowledge query: {e}")
+            yield from self._error_events(self._knowledge_error_response(e), chunks)
+            return
+
+        response = self._knowledge_response(
+            {"result": "".join(chunks), "source_documents": documents}
+        )
+        if embedding is not None:
+            self.response_cache.put(embedding, response)
+        yield {"type": "end", "result": response}
+
+    async def _astream_knowledge_query(self, query: str) -> AsyncIterator[Dict[str, any]]:
+        """Versión asíncrona de _stream_knowledge_query."""
+        logger.info("Procesando consulta de KNOWLEDGE BASE")
+        self._increment_stat("knowledge_queries")
+
+        chunks = []
+        try:
+            embedding = None
+            if self.response_cache is not None:
+                embedding = await self._query_embeddings.aembed_query(query)
+                cached = self.response_cache.get(embedding)
+                if cached is not None:
+                    async for event in self._acomplete_events({**cached, "cached": True}):
+                        yield event
+                    return
 
-    def _handle_balance_query(self, query: str) -> Dict[str, any]:
-        """Maneja consultas de balance."""
+            documents = await self._aretrieve_documents(query, embedding)
+            async for token in self._astream_llm(self._knowledge_prompt(query, documents)):
+                chunks.append(token)
+                yield {"type": "token", "content": token}
+        except Exception as e:
+            logger.error(f"Error en knowledge query: {e}")
+            for event in self._error_events(self._knowledge_error_response(e), chunks):
+                yield event
+            return
+
+        response = self._knowledge_response(
+            {"result": "".join(chunks), "source_documents": documents}
+        )
+        if embedding is not None:
+            self.response_cache.put(embedding, response)
+        yield {"type": "end", "result": response}
+
+    def _stream_general_query(self, query: str) -> Iterator[Dict[str, any]]:
+        """Versión en streaming de _handle_general_query."""
+        logger.info("Procesando consulta GENERAL")
+        self._increment_stat("general_queries")
+
+        chunks = []
+        try:
+            for token in self._stream_llm(self._general_prompt(query)):
+                chunks.append(token)
+                yield {"type": "token", "content": token}
+        except Exception as e:
+            logger.error(f"Error en general query: {e}")
+            yield from self._error_events(self._general_error_response(e), chunks)
+            return
+
+        yield {"type": "end", "result": self._general_response("".join(chunks))}
+
+    async def _astream_general_query(self, query: str) -> AsyncIterator[Dict[str, any]]:
+        """Versión asíncrona de _stream_general_query."""
+        logger.info("Procesando consulta GENERAL")
+        self._increment_stat("general_queries")
+
+        chunks = []
+        try:
+            async for token in self._astream_llm(self._general_prompt(query)):
+                chunks.append(token)
+                yield {"type": "token", "content": token}
+        except Exception as e:
+            logger.error(f"Error en general query: {e}")
+            for event in self._error_events(self._general_error_response(e), chunks):
+                yield event
+            return
+
+        yield {"type": "end", "result": self._general_response("".join(chunks))}
+
+    def _stream_llm(self, prompt: str) -> Iterator[str]:
+        """Emite los fragmentos no vacíos que genera el LLM y registra el tiempo al primero."""
+        start_time = time.perf_counter()
+        first_token = True
+        for chunk in self.llm.stream(prompt, config=self.metrics.llm_config()):
+            if not chunk.content:
+                continue
+            if first_token:
+                first_token = False
+                logger.info(f"Primer token en {time.perf_counter() - start_time:.2f}s")
+            yield chunk.content
+
+    async def _astream_llm(self, prompt: str) -> AsyncIterator[str]:
+        """Versión asíncrona de _stream_llm."""
+        start_time = time.perf_counter()
+        first_token = True
+        async for chunk in self.llm.astream(prompt, config=self.metrics.llm_config()):
+            if not chunk.content:
+                continue
+            if first_token:
+                first_token = False
+                logger.info(f"Primer token en {time.perf_counter() - start_time:.2f}s")
+            yield chunk.content
+
+    def _error_response(self, error: Exception) -> Dict[str, any]:
+        """Construye la respuesta para errores no controlados."""
+        self._record_error("error")
+        return {
+            "success": False,
+            "query_type": "error",
+            "response": f"Lo siento, ocurrió un error al procesar tu consulta: {str(error)}",
+            "error": str(error),
+        }
+
+    def _handle_balance_query(self, query: str, cedula: Optional[str]) -> Dict[str, any]:
+        """
+        Maneja consultas de balance.
+
+        Args:
+            query: Consulta del cliente
+            cedula: Cédula extraída por la tabla de routing (None si no tenía)
+        """
         logger.info("Procesando consulta de BALANCE")
-        self.stats["balance_queries"] += 1
+        self._increment_stat("balance_queries")
 
-        # Extraer cédula
-        cedula = self.router.extract_cedula(query)
+        with self.metrics.time("extract_cedula"):
+            if cedula:
+                logger.info(f"Cédula extraída: {cedula}")
+            else:
+                # Intentar obtener cédula del LLM
+                cedula = self._ask_llm_for_cedula(query)
 
-        if not cedula:
-            # Intentar obtener cédula del LLM
-            cedula = self._ask_llm_for_cedula(query)
+        return self._lookup_balance(cedula)
+
+    async def _ahandle_balance_query(self, query: str, cedula: Optional[str]) -> Dict[str, any]:
+        """Versión asíncrona de _handle_balance_query."""
+        logger.info("Procesando consulta de BALANCE")
+        self._increment_stat("balance_queries")
 
+        with self.metrics.time("extract_cedula"):
+            if cedula:
+                logger.info(f"Cédula extraída: {cedula}")
+            else:
+                cedula = await self._aask_llm_for_cedula(query)
+
+        return self._lookup_balance(cedula)
+
+    def _lookup_balance(self, cedula: Optional[str]) -> Dict[str, any]:
+        """Consulta el balance de una cédula ya extraída y arma la respuesta."""
         if not cedula:
             return {
                 "success": False,
@@ -133,7 +645,11 @@ Respuesta:"""
             }
 
         try:
-            balance_info = self.csv_manager.get_balance_by_cedula(cedula)
+            from src.csv_query import format_balance_response
+
+            csv_manager = self.csv_manager
+            with self.metrics.time("csv_lookup"):
+                balance_info = csv_manager.get_balance_by_cedula(cedula)
 
             return {
                 "success": balance_info["found"],
@@ -144,6 +660,7 @@ Respuesta:"""
             }
         except Exception as e:
             logger.error(f"Error consultando balance: {e}")
+            self._record_error("balance")
             return {
                 "success": False,
                 "query_type": "balance",
@@ -154,41 +671,168 @@ Respuesta:"""
     def _handle_knowledge_query(self, query: str) -> Dict[str, any]:
         """Maneja consultas a la base de conocimientos."""
         logger.info("Procesando consulta de KNOWLEDGE BASE")
-        self.stats["knowledge_queries"] += 1
+        self._increment_stat("knowledge_queries")
 
         try:
-            # Usar el chain de RetrievalQA
-            result = self.knowledge_chain.invoke({"query": query})
+            # Buscar primero una respuesta a una consulta similar
+            embedding = None
+            if self.response_cache is not None:
+                embedding = self._query_embeddings.embed_query(query)
+                cached = self.response_cache.get(embedding)
+                if cached is not None:
+                    return {**cached, "cached": True}
 
-            return {
-                "success": True,
-                "query_type": "knowledge",
-                "response": result["result"],
-                "source_documents": [
-                    {
-                        "content": doc.page_content,
-                        "source": doc.metadata.get("source", "Unknown"),
-                    }
-                    for doc in result.get("source_documents", [])
-                ],
-            }
+            if embedding is None:
+                # Usar el chain de RetrievalQA
+                result = self.knowledge_chain.invoke(
+                    {"query": query}, config=self.metrics.llm_config()
+                )
+            else:
+                # Fallo del caché: buscar con el embedding ya calculado y
+                # armar el mismo prompt que el chain
+                documents = self._retrieve_documents(query, embedding)
+                answer = self.llm.invoke(
+                    self._knowledge_prompt(query, documents), config=self.metrics.llm_config()
+                )
+                result = {"result": answer.content, "source_documents": documents}
+            response = self._knowledge_response(result)
+
+            if embedding is not None:
+                self.response_cache.put(embedding, response)
+            return response
         except Exception as e:
             logger.error(f"Error en knowledge query: {e}")
-            return {
-                "success": False,
-                "query_type": "knowledge",
-                "response": f"Error al buscar en la base de conocimientos: {str(e)}",
-                "error": str(e),
-            }
+            return self._knowledge_error_response(e)
+
+    async def _ahandle_knowledge_query(self, query: str) -> Dict[str, any]:
+        """Versión asíncrona de _handle_knowledge_query."""
+        logger.info("Procesando consulta de KNOWLEDGE BASE")
+        self._increment_stat("knowledge_queries")
+
+        try:
+            embedding = None
+            if self.response_cache is not None:
+                embedding = await self._query_embeddings.aembed_query(query)
+                cached = self.response_cache.get(embedding)
+                if cached is not None:
+                    return {**cached, "cached": True}
+
+            if embedding is None:
+                result = await self.knowledge_chain.ainvoke(
+                    {"query": query}, config=self.metrics.llm_config()
+                )
+            else:
+                documents = await self._aretrieve_documents(query, embedding)
+                answer = await self.llm.ainvoke(
+                    self._knowledge_prompt(query, documents), config=self.metrics.llm_config()
+                )
+                result = {"result": answer.content, "source_documents": documents}
+            response = self._knowledge_response(result)
+
+            if embedding is not None:
+                self.response_cache.put(embedding, response)
+            return response
+        except Exception as e:
+            logger.error(f"Error en knowledge query: {e}")
+            return self._knowledge_error_response(e)
+
+    def _retrieve_documents(
+        self, query: str, embedding: Optional[List[float]]
+    ) -> List["Document"]:
+        """
+        Recupera los documentos de contexto de una consulta de conocimiento.
+
+        Args:
+            query: Consulta del cliente
+            embedding: Embedding de la consulta si ya se calculó para el caché
+                semántico (se busca por vector sin volver a embeber el texto)
+
+        Returns:
+            Documentos más similares (los mismos que el retriever del chain)
+        """
+        if embedding is None:
+            return self.knowledge_chain.retriever.invoke(
+                query, config=self.metrics.llm_config()
+            )
+        kb_manager = self.kb_manager
+        with self.metrics.time("retrieve"):
+            return kb_manager.vectorstore.similarity_search_by_vector(embedding, k=kb_manager.k)
+
+    async def _aretrieve_documents(
+        self, query: str, embedding: Optional[List[float]]
+    ) -> List["Document"]:
+        """Versión asíncrona de _retrieve_documents."""
+        if embedding is None:
+            return await self.knowledge_chain.retriever.ainvoke(
+                query, config=self.metrics.llm_config()
+            )
+        kb_manager = self.kb_manager
+        with self.metrics.time("retrieve"):
+            return await kb_manager.vectorstore.asimilarity_search_by_vector(
+                embedding, k=kb_manager.k
+            )
+
+    def _knowledge_prompt(self, query: str, documents: List["Document"]) -> str:
+        """Arma el prompt del chain ("stuff": documentos separados por línea en blanco)."""
+        context = "\n\n".join(doc.page_content for doc in documents)
+        return KNOWLEDGE_PROMPT_TEMPLATE.format(context=context, question=query)
+
+    def _knowledge_response(self, result: Dict[str, any]) -> Dict[str, any]:
+        """Convierte la salida del chain RetrievalQA en la respuesta del agente."""
+        return {
+            "success": True,
+            "query_type": "knowledge",
+            "response": result["result"],
+            "source_documents": [
+                {
+                    "content": doc.page_content,
+                    "source": doc.metadata.get("source", "Unknown"),
+                }
+                for doc in result.get("source_documents", [])
+            ],
+        }
+
+    def _knowledge_error_response(self, error: Exception) -> Dict[str, any]:
+        """Construye la respuesta de error para consultas de conocimiento."""
+        self._record_error("knowledge")
+        return {
+            "success": False,
+            "query_type": "knowledge",
+            "response": f"Error al buscar en la base de conocimientos: {str(error)}",
+            "error": str(error),
+        }
 
     def _handle_general_query(self, query: str) -> Dict[str, any]:
         """Maneja consultas generales usando el LLM."""
         logger.info("Procesando consulta GENERAL")
-        self.stats["general_queries"] += 1
+        self._increment_stat("general_queries")
+
+        try:
+            response = self.llm.invoke(
+                self._general_prompt(query), config=self.metrics.llm_config()
+            )
+            return self._general_response(response.content)
+        except Exception as e:
+            logger.error(f"Error en general query: {e}")
+            return self._general_error_response(e)
+
+    async def _ahandle_general_query(self, query: str) -> Dict[str, any]:
+        """Versión asíncrona de _handle_general_query."""
+        logger.info("Procesando consulta GENERAL")
+        self._increment_stat("general_queries")
 
         try:
-            # Crear prompt contextualizado
-            prompt = f"""Eres un asistente bancario amigable y profesional de BANCO HENRY.
+            response = await self.llm.ainvoke(
+                self._general_prompt(query), config=self.metrics.llm_config()
+            )
+            return self._general_response(response.content)
+        except Exception as e:
+            logger.error(f"Error en general query: {e}")
+            return self._general_error_response(e)
+
+    def _general_prompt(self, query: str) -> str:
+        """Crea el prompt contextualizado para consultas generales."""
+        return f"""Eres un asistente bancario amigable y profesional de BANCO HENRY.
 
 El cliente te ha hecho la siguiente pregunta general: "{query}"
 
@@ -196,26 +840,51 @@ Responde de manera cortés y útil. Si la pregunta no está relacionada con el b
 
 Tu respuesta:"""
 
-            response = self.llm.invoke(prompt)
+    def _general_response(self, content: str) -> Dict[str, any]:
+        """Construye la respuesta para consultas generales."""
+        return {
+            "success": True,
+            "query_type": "general",
+            "response": content,
+        }
 
-            return {
-                "success": True,
-                "query_type": "general",
-                "response": response.content,
-            }
-        except Exception as e:
-            logger.error(f"Error en general query: {e}")
-            return {
-                "success": False,
-                "query_type": "general",
-                "response": f"Error al procesar la consulta: {str(e)}",
-                "error": str(e),
-            }
+    def _general_error_response(self, error: Exception) -> Dict[str, any]:
+        """Construye la respuesta de error para consultas generales."""
+        self._record_error("general")
+        return {
+            "success": False,
+            "query_type": "general",
+            "response": f"Error al procesar la consulta: {str(error)}",
+            "error": str(error),
+        }
 
     def _ask_llm_for_cedula(self, query: str) -> Optional[str]:
         """Intenta extraer cédula usando el LLM."""
         try:
-            prompt = f"""Extrae el número de cédula venezolana de la siguiente consulta.
+            response = self.llm.invoke(
+                self._cedula_prompt(query), config=self.metrics.llm_config()
+            )
+            return self._parse_llm_cedula(response.content)
+        except Exception as e:
+            logger.error(f"Error extrayendo cédula con LLM: {e}")
+
+        return None
+
+    async def _aask_llm_for_cedula(self, query: str) -> Optional[str]:
+        """Versión asíncrona de _ask_llm_for_cedula."""
+        try:
+            response = await self.llm.ainvoke(
+                self._cedula_prompt(query), config=self.metrics.llm_config()
+            )
+            return self._parse_llm_cedula(response.content)
+        except Exception as e:
+            logger.error(f"Error extrayendo cédula con LLM: {e}")
+
+        return None
+
+    def _cedula_prompt(self, query: str) -> str:
+        """Crea el prompt para extraer la cédula con el LLM."""
+        return f"""Extrae el número de cédula venezolana de la siguiente consulta.
 Si encuentras un número de cédula, responde ÚNICAMENTE con el número en formato "V-XXXXXXXX".
 Si no encuentras ninguna cédula, responde "NONE".
 
@@ -223,16 +892,25 @@ Consulta: "{query}"
 
 Cédula:"""
 
-            response = self.llm.invoke(prompt)
-            cedula = response.content.strip()
+    def _parse_llm_cedula(self, content: str) -> Optional[str]:
+        """Valida la cédula devuelta por el LLM."""
+        cedula = content.strip()
 
-            if cedula != "NONE" and cedula.startswith("V-"):
-                return cedula
-        except Exception as e:
-            logger.error(f"Error extrayendo cédula con LLM: {e}")
+        if cedula != "NONE" and cedula.startswith("V-"):
+            return cedula
 
         return None
 
+    def _increment_stat(self, key: str) -> None:
+        """Incrementa un contador de estadísticas de forma thread-safe."""
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def _record_error(self, query_type: str) -> None:
+        """Cuenta una consulta respondida con error (total y por tipo)."""
+        self._increment_stat("errors")
+        self.metrics.increment("errors", query_type=query_type)
+
     def get_statistics(self) -> Dict[str, any]:
         """
         Obtiene estadísticas de uso del sistema.
@@ -240,23 +918,112 @@ Cédula:"""
         Returns:
             Diccionario con estadísticas
         """
+        with self._stats_lock:
+            stats = dict(self.stats)
+
+        if self.response_cache is not None:
+            stats["knowledge_cache"] = self.response_cache.get_stats()
+        if self.router.cache is not None:
+            stats["routing_cache"] = self.router.get_cache_stats()
+        kb_manager = self._components.get("kb_manager")
+        if kb_manager is not None and hasattr(kb_manager.embeddings, "get_stats"):
+            stats["embedding_batching"] = kb_manager.embeddings.get_stats()
+        csv_manager = self._components.get("csv_manager")
+        if csv_manager is not None:
+            stats["accounts"] = csv_manager.get_stats()
+
+        stats["errors_by_type"] = self.metrics.get_counter_values("errors", "query_type")
+        stats["latency"] = self.metrics.get_latency_stats()
+        stats["llm"] = {
+            "calls": self.metrics.get_counter("llm_calls"),
+            "errors": self.metrics.get_counter("llm_errors"),
+            "prompt_tokens": self.metrics.get_counter("llm_tokens", kind="prompt"),
+            "completion_tokens": self.metrics.get_counter("llm_tokens", kind="completion"),
+        }
+
         return {
-            **self.stats,
+            **stats,
             "success_rate": (
-                (self.stats["total_queries"] - self.stats.get("errors", 0))
-                / self.stats["total_queries"]
+                (stats["total_queries"] - stats.get("errors", 0))
+                / stats["total_queries"]
                 * 100
-                if self.stats["total_queries"] > 0
+                if stats["total_queries"] > 0
                 else 0
             ),
         }
 
     def reset_statistics(self) -> None:
         """Reinicia las estadísticas."""
-        self.stats = {
-            "balance_queries": 0,
-            "knowledge_queries": 0,
-            "general_queries": 0,
-            "total_queries": 0,
-        }
+        with self._stats_lock:
+            self.stats = {
+                "balance_queries": 0,
+                "knowledge_queries": 0,
+                "general_queries": 0,
+                "total_queries": 0,
+                "errors": 0,
+            }
+        self.metrics.reset()
         logger.info("Estadísticas reiniciadas")
+
+    def get_prometheus_metrics(self, extra: Iterable[tuple] = ()) -> str:
+        """
+        Exporta las estadísticas en el formato de texto de Prometheus.
+
+        Incluye los histogramas de latencia por etapa, los contadores de
+        errores y tokens, las consultas por tipo y los aciertos de los cachés.
+
+        Args:
+            extra: Métricas adicionales como (nombre, tipo, descripción,
+                {etiquetas: valor}), ej. las del servidor HTTP
+
+        Returns:
+            Texto para el endpoint /metrics
+        """
+        with self._stats_lock:
+            stats = dict(self.stats)
+
+        queries = {
+            (("query_type", query_type),): stats[f"{query_type}_queries"]
+            for query_type in ("balance", "knowledge", "general")
+        }
+        families = [("queries_total", "counter", "Consultas procesadas por tipo", queries)]
+
+        caches = {}
+        if self.response_cache is not None:
+            caches["knowledge"] = self.response_cache.get_stats()
+        if self.router.cache is not None:
+            caches["routing"] = self.router.get_cache_stats()
+        if caches:
+            for name, description, key in (
+                ("cache_hits_total", "Aciertos de caché", "hits"),
+                ("cache_misses_total", "Fallos de caché", "misses"),
+            ):
+                values = {(("cache", cache),): cache_stats[key] for cache, cache_stats in caches.items()}
+                families.append((name, "counter", description, values))
+            families.append((
+                "cache_hit_ratio",
+                "gauge",
+                "Tasa de acierto de caché (0-1)",
+                {(("cache", cache),): cache_stats["hit_rate"] / 100 for cache, cache_stats in caches.items()},
+            ))
+
+        csv_manager = self._components.get("csv_manager")
+        if csv_manager is not None:
+            accounts = csv_manager.get_stats()
+            families += [
+                ("accounts_loaded", "gauge", "Cuentas en la versión publicada", {(): accounts["accounts"]}),
+                (
+                    "accounts_data_age_seconds",
+                    "gauge",
+                    "Antigüedad (mtime) del CSV de cuentas publicado",
+                    {(): accounts["data_age_seconds"]},
+                ),
+                (
+                    "accounts_staleness_seconds",
+                    "gauge",
+                    "Tiempo desde que cambió el CSV sin que se publique la versión nueva",
+                    {(): accounts["staleness_seconds"]},
+                ),
+            ]
+
+        return self.metrics.to_prometheus(families + list(extra))
@@ -0,0 +1,190 @@
+"""
+Servicio HTTP (ASGI) sobre el agente de atención al cliente.
+
+Endpoints:
+    POST /query            Consulta completa (JSON)
+    POST /query/stream     Consulta en streaming (NDJSON: eventos token/end)
+    GET  /balance/{cedula} Balance de una cédula, sin pasar por el LLM
+    GET  /stats            Estadísticas del agente y del servidor
+    GET  /metrics          Métricas en formato de texto de Prometheus
+
+Cada proceso worker crea un único agente compartido por todas sus requests.
+Uso:
+    uvicorn src.api:app --host 0.0.0.0 --port 8000 --workers 4
+"""
+
+import json
+import logging
+from contextlib import asynccontextmanager
+from pathlib import Path
+import sys
+from typing import Callable, Iterable
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from src.agent import CustomerServiceAgent
+from src.config import (
+    API_HOST,
+    API_MAX_IN_FLIGHT,
+    API_PORT,
+    API_RETRY_AFTER_SECONDS,
+    API_WARMUP,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRequest(BaseModel):
+    """Cuerpo de /query y /query/stream."""
+
+    query: str = Field(min_length=1, max_length=2000)
+
+
+class InFlightLimiter:
+    """Contadores de backpressure compartidos entre el middleware y /stats."""
+
+    def __init__(self, max_in_flight: int = API_MAX_IN_FLIGHT):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.rejected = 0
+
+    def get_stats(self) -> dict:
+        """Estadísticas de backpressure."""
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "rejected": self.rejected,
+        }
+
+
+class InFlightLimitMiddleware:
+    """
+    Middleware ASGI de backpressure: como máximo max_in_flight requests en
+    curso (una respuesta en streaming cuenta hasta que termina). Las demás
+    reciben 503 con Retry-After en lugar de encolarse sin límite.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter: InFlightLimiter,
+        exempt_paths: Iterable[str] = ("/stats", "/metrics"),
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.exempt_paths = set(exempt_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        # Un único event loop por worker: los contadores no necesitan lock
+        limiter = self.limiter
+        if limiter.in_flight >= limiter.max_in_flight:
+            limiter.rejected += 1
+            response = JSONResponse(
+                {"detail": "Servidor ocupado, reintenta en unos segundos"},
+                status_code=503,
+                headers={"Retry-After": str(API_RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+
+        limiter.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.in_flight -= 1
+
+
+def create_app(
+    agent_factory: Callable[[], CustomerServiceAgent] = CustomerServiceAgent,
+    max_in_flight: int = API_MAX_IN_FLIGHT,
+    warmup: bool = API_WARMUP,
+) -> FastAPI:
+    """
+    Crea la aplicación ASGI.
+
+    Args:
+        agent_factory: Función que crea el agente (uno por proceso worker)
+        max_in_flight: Requests en curso como máximo antes de responder 503
+        warmup: Inicializar todos los componentes antes de aceptar tráfico
+
+    Returns:
+        Aplicación FastAPI
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        agent = agent_factory()
+        if warmup:
+            init_times = await run_in_threadpool(agent.warmup)
+            logger.info(f"Agente listo: {init_times}")
+        app.state.agent = agent
+        yield
+
+    app = FastAPI(title="BANCO HENRY - Atención al Cliente", lifespan=lifespan)
+    limiter = InFlightLimiter(max_in_flight)
+    app.add_middleware(InFlightLimitMiddleware, limiter=limiter)
+
+    @app.post("/query")
+    async def query(body: QueryRequest, request: Request) -> dict:
+        return await request.app.state.agent.aprocess_query(body.query)
+
+    @app.post("/query/stream")
+    async def query_stream(body: QueryRequest, request: Request) -> StreamingResponse:
+        agent = request.app.state.agent
+
+        async def events():
+            async for event in agent.astream_query(body.query):
+                yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
+    @app.get("/balance/{cedula}")
+    def balance(cedula: str, request: Request) -> dict:
+        # Endpoint síncrono: FastAPI lo ejecuta en el threadpool (la primera
+        # consulta puede cargar el CSV)
+        try:
+            balance_info = request.app.state.agent.csv_manager.get_balance_by_cedula(cedula)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not balance_info["found"]:
+            raise HTTPException(status_code=404, detail=balance_info["message"])
+        return balance_info
+
+    @app.get("/stats")
+    def stats(request: Request) -> dict:
+        return {
+            **request.app.state.agent.get_statistics(),
+            "server": limiter.get_stats(),
+        }
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics(request: Request) -> PlainTextResponse:
+        server = limiter.get_stats()
+        text = request.app.state.agent.get_prometheus_metrics(
+            extra=[
+                ("http_in_flight", "gauge", "Requests en curso", {(): server["in_flight"]}),
+                ("http_rejected_total", "counter", "Requests rechazadas con 503", {(): server["rejected"]}),
+            ]
+        )
+        return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("src.api:app", host=API_HOST, port=API_PORT)
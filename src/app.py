@@ -48,14 +48,6 @@ st.markdown(
         margin: 1rem 0;
     }
     
-    .response-box {
-        background-color: #e8f4f8;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 5px solid #1f77b4;
-        margin: 1rem 0;
-    }
-    
     .stat-card {
         background-color: #f8f9fa;
         padding: 1rem;
@@ -168,40 +160,74 @@ def get_query_type_emoji(query_type: str) -> str:
     return emoji_map.get(query_type, "💬")
 
 
-def display_response(result: dict):
-    """Muestra la respuesta del sistema."""
-    emoji = get_query_type_emoji(result.get("query_type", "general"))
-    query_type = result.get("query_type", "general").upper()
+def display_response_details(result: dict):
+    """Muestra los datos de balance o las fuentes de una respuesta exitosa."""
+    # Información adicional para balance
+    if result.get("query_type") == "balance" and "data" in result:
+        data = result["data"]
+        if data.get("found"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Titular", data["nombre"])
+            with col2:
+                st.metric("Cédula", data["cedula"])
+            with col3:
+                st.metric("Balance", f"${data['balance']:,.2f}")
 
-    st.markdown(f"### {emoji} Respuesta ({query_type})")
+    # Documentos fuente para knowledge
+    if result.get("query_type") == "knowledge" and "source_documents" in result:
+        with st.expander("📄 Ver fuentes de información"):
+            for i, doc in enumerate(result["source_documents"], 1):
+                st.markdown(f"**Fuente {i}:** {Path(doc['source']).name}")
+                st.text(doc["content"][:200] + "...")
+                st.markdown("---")
 
-    if result.get("success", False):
-        st.markdown('<div class="response-box">', unsafe_allow_html=True)
-        st.markdown(result["response"])
-        st.markdown("</div>", unsafe_allow_html=True)
-
-        # Información adicional para balance
-        if result.get("query_type") == "balance" and "data" in result:
-            data = result["data"]
-            if data.get("found"):
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Titular", data["nombre"])
-                with col2:
-                    st.metric("Cédula", data["cedula"])
-                with col3:
-                    st.metric("Balance", f"${data['balance']:,.2f}")
-
-        # Documentos fuente para knowledge
-        if result.get("query_type") == "knowledge" and "source_documents" in result:
-            with st.expander("📄 Ver fuentes de información"):
-                for i, doc in enumerate(result["source_documents"], 1):
-                    st.markdown(f"**Fuente {i}:** {Path(doc['source']).name}")
-                    st.text(doc["content"][:200] + "...")
-                    st.markdown("---")
-    else:
+
+def stream_response(query: str) -> dict:
+    """
+    Muestra la respuesta a medida que el LLM la genera (st.write_stream) y
+    luego el tipo de consulta y sus detalles. Los errores van en st.error:
+    si no se llegó a generar texto, en lugar de la respuesta; si no, debajo
+    de lo generado hasta el fallo.
+
+    Args:
+        query: Consulta del cliente
+
+    Returns:
+        Resultado completo (el mismo diccionario que process_query)
+    """
+    result = {}
+    failed = False
+
+    def tokens():
+        nonlocal failed
+        # Se retiene el último token hasta ver el siguiente evento: en un
+        # error sin texto generado, el único token es el mensaje de error
+        held = None
+        for event in st.session_state.agent.stream_query(query):
+            if event["type"] == "token":
+                if held is not None:
+                    yield held
+                held = event["content"]
+            else:
+                result.update(event["result"])
+                failed = event.get("error", False)
+        if held is not None and not (failed and "partial_response" not in result):
+            yield held
+
+    st.markdown("### 💬 Respuesta")
+    st.write_stream(tokens())
+    if "partial_response" in result:
+        st.error(f"Respuesta interrumpida: {result['response']}")
+    elif failed:
         st.error(result["response"])
 
+    query_type = result.get("query_type", "general")
+    st.caption(f"{get_query_type_emoji(query_type)} Tipo: {query_type.upper()}")
+    if result.get("success", False):
+        display_response_details(result)
+    return result
+
 
 def main():
     """Función principal de la aplicación."""
@@ -242,14 +268,11 @@ def main():
 
     # Procesar consulta
     if submit_button and query:
-        with st.spinner("🤔 Procesando tu consulta..."):
-            result = st.session_state.agent.process_query(query)
-
-            # Agregar a historial
-            st.session_state.history.insert(0, {"query": query, "result": result})
+        # Mostrar la respuesta a medida que se genera
+        result = stream_response(query)
 
-            # Mostrar respuesta
-            display_response(result)
+        # Agregar a historial
+        st.session_state.history.insert(0, {"query": query, "result": result})
 
     # Limpiar historial
     if clear_button:
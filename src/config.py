@@ -15,23 +15,146 @@ DATA_DIR = PROJECT_ROOT / "data"
 KNOWLEDGE_BASE_DIR = PROJECT_ROOT / "knowledge_base"
 INDEX_DIR = PROJECT_ROOT / "solution" / "index"
 
-# Configuración de OpenAI
+# Configuración de OpenAI (se valida al crear el primer cliente, no al importar:
+# `--help`, una consulta de balance o el backend "fake" no necesitan la API key)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY no encontrada en las variables de entorno")
+
+
+def require_openai_api_key() -> str:
+    """
+    Retorna la API key de OpenAI.
+
+    Raises:
+        ValueError: Si OPENAI_API_KEY no está configurada
+    """
+    if not OPENAI_API_KEY:
+        raise ValueError("OPENAI_API_KEY no encontrada en las variables de entorno")
+    return OPENAI_API_KEY
 
 # Configuración del modelo
 LLM_MODEL = "gpt-4-0125-preview"
 LLM_TEMPERATURE = 0.7
 
+# Backend del LLM: "openai" (API real) o "fake" (stub local determinista,
+# sin red ni API key, para benchmarks offline)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+
+# Stub local ("fake"): misma respuesta y latencia para el mismo prompt
+FAKE_LLM_LATENCY_MS = 300.0  # Mediana del tiempo al primer token
+FAKE_LLM_LATENCY_SIGMA = 0.3  # Dispersión (lognormal) del tiempo al primer token
+FAKE_LLM_TOKENS_PER_SECOND = 50.0  # Velocidad de generación
+FAKE_LLM_RESPONSE_TOKENS = 60  # Palabras por respuesta
+FAKE_LLM_SEED = 0
+
+# Cliente HTTP compartido para el LLM (pool keep-alive de todo el proceso)
+LLM_MAX_CONNECTIONS = 100  # Conexiones simultáneas como máximo
+LLM_MAX_KEEPALIVE_CONNECTIONS = 20  # Conexiones ociosas que se mantienen abiertas
+LLM_KEEPALIVE_EXPIRY_SECONDS = 30.0
+LLM_TIMEOUT_SECONDS = 60.0  # Lectura/escritura de cada request
+LLM_CONNECT_TIMEOUT_SECONDS = 5.0
+LLM_MAX_RETRIES = 2  # Reintentos con backoff ante errores transitorios
+
 # Configuración de embeddings
 EMBEDDINGS_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 
+# Chunking de documentos antes de indexar (tamaños en caracteres)
+CHUNKING_ENABLED = True
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+
+# Pipeline de embeddings al construir el índice
+EMBEDDING_BATCH_SIZE = 64  # Chunks por lote
+EMBEDDING_WORKERS = 1  # Procesos (1 = en el proceso actual)
+
+# Micro-batching de embeddings de consultas concurrentes (async)
+EMBEDDING_MICRO_BATCH_ENABLED = True
+EMBEDDING_MICRO_BATCH_MAX_SIZE = 32  # Consultas por lote como máximo
+EMBEDDING_MICRO_BATCH_MAX_WAIT_MS = 2.0  # Espera para completar un lote
+
+# Tipo de índice FAISS: "flat" (exacto), "ivf_flat", "hnsw" o "ivf_pq"
+FAISS_INDEX_TYPE = "flat"
+FAISS_IVF_NLIST = 1024  # Listas invertidas (IVF)
+FAISS_IVF_NPROBE = 16  # Listas visitadas por búsqueda (IVF)
+FAISS_HNSW_M = 32  # Vecinos por nodo (HNSW)
+FAISS_HNSW_EF_CONSTRUCTION = 64
+FAISS_HNSW_EF_SEARCH = 64  # Candidatos explorados por búsqueda (HNSW)
+FAISS_PQ_M = 48  # Subvectores por código (PQ); debe dividir la dimensión
+FAISS_PQ_NBITS = 8  # Bits por subvector (PQ)
+FAISS_TRAIN_SIZE = 100_000  # Vectores usados como máximo para entrenar
+
+# Cargar el índice con memory-mapping (solo lectura): los procesos worker
+# comparten vectores y documentos vía el caché de páginas del sistema operativo
+FAISS_MMAP_ENABLED = False
+
+# Al cargar el índice, re-embeber solo los documentos agregados/modificados
+# desde la última indexación (según el manifiesto de hashes). Desactivado por
+# defecto: con varios procesos worker cada uno hashearía el corpus y podría
+# reescribir el mismo índice a la vez. Las actualizaciones se hacen con
+# `python solution/indexer.py --incremental`; activarlo solo con un proceso
+KB_REFRESH_ON_LOAD = False
+
 # Configuración del retriever
 RETRIEVER_K = 3  # Número de documentos a recuperar
 
+# Caché semántico de respuestas de la base de conocimientos
+SEMANTIC_CACHE_ENABLED = True
+SEMANTIC_CACHE_THRESHOLD = 0.92  # Similaridad coseno mínima para un hit
+SEMANTIC_CACHE_MAX_SIZE = 1000  # Entradas máximas (desalojo LRU)
+SEMANTIC_CACHE_TTL_SECONDS = 3600  # Expiración de cada entrada
+
+# Caché de decisiones de routing del LLM
+ROUTING_CACHE_ENABLED = True
+ROUTING_CACHE_MAX_SIZE = 1024  # Entradas máximas (desalojo LRU)
+ROUTING_CACHE_PATH = None  # Ruta JSON para persistir el caché (None = solo memoria)
+ROUTING_CACHE_SAVE_DELAY_SECONDS = 5.0  # Espera para agrupar escrituras a disco (0 = en cada put)
+
+# Clasificador de intención local (embeddings) antes del fallback al LLM.
+# Desactivado hasta medir su precisión contra el LLM con
+# benchmarks/bench_intent_classifier.py: el modelo de embeddings es de
+# inglés y, activado, cualquier consulta que las reglas no cubren ("Hola")
+# carga el modelo y el índice de la base de conocimientos
+INTENT_CLASSIFIER_ENABLED = False
+INTENT_SIMILARITY_THRESHOLD = 0.6  # Similaridad mínima con el ejemplo más cercano
+INTENT_MIN_MARGIN = 0.05  # Margen mínimo sobre la segunda categoría
+
 # Archivo de datos
 CSV_FILE = DATA_DIR / "saldos.csv"
 
+# Almacén en memoria de las cuentas: "pandas" (DataFrame + índice hash) o
+# "columnar" (cédulas int64 ordenadas, nombres en un buffer UTF-8, balances
+# en centavos; mucha menos memoria por cuenta con millones de registros)
+ACCOUNT_STORE_BACKEND = "pandas"
+
+# Con el backend columnar: abrir el snapshot binario del CSV (directorio
+# `<csv>.snapshot`, memory-mapping) si corresponde a la versión actual del
+# archivo; si no, leer el CSV y escribir el snapshot para el próximo arranque
+ACCOUNT_SNAPSHOT_ENABLED = True
+
+# Con el backend columnar: leer el CSV por bloques de estas filas y
+# convertir cada bloque a columnas compactas (0 = leerlo completo con
+# pandas). La memoria de la carga no crece con el tamaño del archivo
+ACCOUNT_CSV_CHUNK_ROWS = 250_000
+
+# Recarga en caliente de las cuentas: cada cuánto revisar el tamaño/mtime del
+# CSV (0 = sin recarga). Al cambiar, el almacén nuevo se construye en segundo
+# plano y reemplaza al anterior sin bloquear las consultas en curso
+ACCOUNT_RELOAD_INTERVAL_SECONDS = 5.0
+ACCOUNT_RELOAD_SETTLE_SECONDS = 1.0  # Esperar a que el CSV lleve este tiempo sin cambios
+
+# Servicio HTTP (src/api.py)
+API_HOST = "0.0.0.0"
+API_PORT = 8000
+API_MAX_IN_FLIGHT = 64  # Requests en curso por worker; el resto recibe 503
+API_RETRY_AFTER_SECONDS = 1  # Header Retry-After de las respuestas 503
+API_WARMUP = True  # Inicializar todos los componentes antes de aceptar tráfico
+
+# Métricas por etapa (histogramas de latencia, estilo Prometheus)
+METRICS_PREFIX = "customer_service"  # Prefijo de los nombres en /metrics
+# Límites superiores (segundos) de los buckets de los histogramas
+METRICS_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
 # Logging
 LOG_LEVEL = "INFO"
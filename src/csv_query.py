@@ -5,32 +5,176 @@ Maneja la búsqueda de información de cuentas bancarias.
 
 import pandas as pd
 import logging
+import os
+import threading
+import time
 from pathlib import Path
-from typing import Optional, Dict
-from src.config import CSV_FILE
+from typing import Dict, Optional, Tuple, Union
+from src.account_snapshot import load_snapshot, source_stat, write_snapshot
+from src.account_store import ColumnarAccountStore, DataFrameAccountStore, create_account_store
+from src.config import (
+    ACCOUNT_CSV_CHUNK_ROWS,
+    ACCOUNT_RELOAD_INTERVAL_SECONDS,
+    ACCOUNT_RELOAD_SETTLE_SECONDS,
+    ACCOUNT_SNAPSHOT_ENABLED,
+    ACCOUNT_STORE_BACKEND,
+    CSV_FILE,
+)
 
 logger = logging.getLogger(__name__)
 
+# Tipos explícitos: las cédulas y nombres nunca se infieren como números
+CSV_DTYPES = {"ID_Cedula": str, "Nombre": str, "Balance": float}
+
+AccountStore = Union[DataFrameAccountStore, ColumnarAccountStore]
+
+
+def rss_bytes() -> Optional[int]:
+    """RSS actual del proceso en bytes (None fuera de Linux)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class PeakMemoryMonitor:
+    """
+    Pico de RSS del proceso durante un bloque, muestreado por un thread.
+
+    El pico de toda la vida del proceso (VmHWM, ru_maxrss) no sirve para una
+    recarga en un worker que ya lleva tiempo corriendo; el muestreo puede
+    perder picos más cortos que el intervalo.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        """
+        Args:
+            interval: Segundos entre muestras
+        """
+        self.interval = interval
+        self.start: Optional[int] = None
+        self.peak: Optional[int] = None
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "PeakMemoryMonitor":
+        self.start = self.peak = rss_bytes()
+        if self.start is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._done.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._update()
+
+    def _sample(self) -> None:
+        while not self._done.wait(self.interval):
+            self._update()
+
+    def _update(self) -> None:
+        current = rss_bytes()
+        if current is not None and current > self.peak:
+            self.peak = current
+
+    def describe(self) -> str:
+        """Resumen para el log ("" si no se pudo medir)."""
+        if self.peak is None:
+            return ""
+        mib = 1024 * 1024
+        return f", pico de memoria {self.peak / mib:.1f} MiB (+{(self.peak - self.start) / mib:.1f} MiB)"
+
 
 class CSVQueryManager:
     """Gestor de consultas a archivos CSV."""
 
-    def __init__(self, csv_path: Path = CSV_FILE):
+    def __init__(
+        self,
+        csv_path: Path = CSV_FILE,
+        backend: str = ACCOUNT_STORE_BACKEND,
+        snapshot: bool = ACCOUNT_SNAPSHOT_ENABLED,
+        metrics=None,
+        chunk_rows: int = ACCOUNT_CSV_CHUNK_ROWS,
+    ):
         """
         Inicializa el gestor de consultas CSV.
 
         Args:
             csv_path: Ruta al archivo CSV con los datos de cuentas
+            backend: Almacén en memoria: "pandas" (DataFrame) o "columnar"
+                (compacto, para millones de cuentas)
+            snapshot: Con el backend columnar, abrir el snapshot binario del
+                CSV (memory-mapping) si está vigente, o escribirlo tras leer
+                el CSV
+            metrics: Métricas (src.metrics.Metrics) donde registrar la
+                duración de las recargas
+            chunk_rows: Con el backend columnar, leer el CSV por bloques de
+                estas filas (0 = leerlo completo)
         """
         self.csv_path = csv_path
-        self.df: Optional[pd.DataFrame] = None
+        self.backend = backend
+        self.snapshot = snapshot and backend == "columnar"
+        self.metrics = metrics
+        self.chunk_rows = chunk_rows if backend == "columnar" else 0
+
+        # Versión publicada: los lectores solo leen self.store (una asignación
+        # la reemplaza completa, sin locks en el camino de las consultas)
+        self.store: Optional[AccountStore] = None
+        self.loaded_from = "csv"
+        self.source: Optional[dict] = None  # Tamaño/mtime del CSV cargado
+        self.loaded_at: Optional[float] = None
+
+        # Recarga en caliente
+        self._reload_lock = threading.Lock()  # Una recarga a la vez
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self.reloads = 0
+        self.reload_failures = 0
+        self.last_reload_seconds: Optional[float] = None
+        self.last_reload_error: Optional[str] = None
+
         self._load_data()
 
+    @property
+    def df(self) -> pd.DataFrame:
+        """Cuentas como DataFrame (con el backend columnar se materializa en cada acceso)."""
+        return self.store.to_dataframe()
+
     def _load_data(self) -> None:
-        """Carga el archivo CSV en memoria."""
+        """Carga el archivo CSV en memoria y construye el índice de cédulas."""
+        self._publish(*self._read_store())
+
+    def _read_store(self) -> Tuple[AccountStore, str, dict]:
+        """
+        Construye el almacén de la versión actual del CSV, sin publicarlo.
+
+        Returns:
+            (almacén, origen "csv" o "snapshot", tamaño/mtime del CSV leído)
+        """
         try:
-            self.df = pd.read_csv(self.csv_path)
-            logger.info(f"CSV cargado exitosamente: {len(self.df)} registros")
+            # El stat se toma antes de leer: si el CSV cambia durante la
+            # lectura, la próxima revisión lo detecta y vuelve a cargar
+            source = source_stat(self.csv_path)
+            if self.snapshot:
+                store = self._load_snapshot()
+                if store is not None:
+                    return store, "snapshot", source
+
+            start_time = time.perf_counter()
+            with PeakMemoryMonitor() as memory:
+                store = self._read_csv()
+            mode = f", por bloques de {self.chunk_rows} filas" if self.chunk_rows > 0 else ""
+            logger.info(
+                f"CSV cargado exitosamente: {len(store)} registros ({self.backend}{mode}) "
+                f"en {time.perf_counter() - start_time:.2f}s{memory.describe()}"
+            )
+
+            if self.snapshot:
+                self._write_snapshot(store, source)
+            return store, "csv", source
         except FileNotFoundError:
             logger.error(f"Archivo CSV no encontrado: {self.csv_path}")
             raise
@@ -38,6 +182,181 @@ class CSVQueryManager:
             logger.error(f"Error al cargar CSV: {e}")
             raise
 
+    def _read_csv(self) -> AccountStore:
+        """Lee el CSV completo o, con chunk_rows, por bloques sin retener los DataFrames."""
+        if self.chunk_rows > 0:
+            with pd.read_csv(
+                self.csv_path,
+                dtype=CSV_DTYPES,
+                usecols=list(CSV_DTYPES),
+                chunksize=self.chunk_rows,
+            ) as chunks:
+                return ColumnarAccountStore.from_chunks(chunks)
+
+        df = pd.read_csv(self.csv_path, dtype=CSV_DTYPES)
+        return create_account_store(df, self.backend)
+
+    def _publish(self, store: AccountStore, loaded_from: str, source: dict) -> None:
+        """Reemplaza la versión publicada de las cuentas."""
+        self.store = store
+        self.loaded_from = loaded_from
+        self.source = source
+        self.loaded_at = time.time()
+
+    def _load_snapshot(self) -> Optional[ColumnarAccountStore]:
+        """Abre el snapshot binario del CSV si está vigente."""
+        start_time = time.perf_counter()
+        store = load_snapshot(self.csv_path)
+        if store is not None:
+            logger.info(
+                f"Snapshot de cuentas abierto: {len(store)} registros "
+                f"en {time.perf_counter() - start_time:.3f}s"
+            )
+        return store
+
+    def _write_snapshot(self, store: ColumnarAccountStore, source: dict) -> None:
+        """Escribe el snapshot del CSV recién leído (un fallo no impide operar)."""
+        try:
+            write_snapshot(store, self.csv_path, source=source)
+        except OSError as e:
+            logger.warning(f"No se pudo escribir el snapshot de cuentas: {e}")
+
+    def _current_source(self) -> Optional[dict]:
+        """Tamaño/mtime actuales del CSV (None si no se puede leer)."""
+        try:
+            return source_stat(self.csv_path)
+        except OSError:
+            return None
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Vuelve a cargar las cuentas si el CSV cambió.
+
+        El almacén nuevo (con su índice) se construye completo en el thread
+        que llama y se publica con una sola asignación: las consultas en
+        curso terminan con la versión anterior y nunca esperan a la recarga.
+        Si la carga falla, se sigue sirviendo la versión anterior.
+
+        Args:
+            force: Recargar aunque el tamaño y el mtime del CSV no cambiaran
+
+        Returns:
+            True si se publicó una versión nueva
+
+        Raises:
+            Exception: El error de la carga (la versión anterior sigue activa)
+        """
+        with self._reload_lock:
+            if not force and self._current_source() == self.source:
+                return False
+
+            start_time = time.perf_counter()
+            try:
+                store, loaded_from, source = self._read_store()
+                # Si ya se buscaba por nombre, el índice nuevo se construye
+                # aquí y no en la primera búsqueda tras publicar
+                if self.store.name_index_built:
+                    store.name_index()
+            except Exception as e:
+                self.reload_failures += 1
+                self.last_reload_error = str(e)
+                if self.metrics is not None:
+                    self.metrics.increment("account_reload_errors")
+                raise
+
+            self._publish(store, loaded_from, source)
+            elapsed = time.perf_counter() - start_time
+            self.reloads += 1
+            self.last_reload_seconds = elapsed
+            self.last_reload_error = None
+            if self.metrics is not None:
+                self.metrics.observe("account_reload", elapsed)
+
+        logger.info(f"Cuentas recargadas en {elapsed:.3f}s: {len(store)} registros ({loaded_from})")
+        return True
+
+    def start_watching(
+        self,
+        interval: float = ACCOUNT_RELOAD_INTERVAL_SECONDS,
+        settle: float = ACCOUNT_RELOAD_SETTLE_SECONDS,
+    ) -> None:
+        """
+        Inicia un thread en segundo plano que recarga las cuentas al cambiar el CSV.
+
+        Revisa el tamaño y el mtime del CSV cada `interval` segundos. Para no
+        leer un archivo a medio escribir, espera a que lleve `settle`
+        segundos sin cambios (lo más seguro es que quien lo actualiza
+        escriba un archivo temporal y lo renombre). Un CSV que no se pudo
+        cargar no se reintenta hasta que vuelva a cambiar.
+
+        Args:
+            interval: Segundos entre revisiones
+            settle: Segundos sin cambios antes de recargar
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(
+            target=self._watch,
+            args=(interval, settle),
+            name="account-reloader",
+            daemon=True,
+        )
+        self._watcher.start()
+        logger.info(f"Recarga de cuentas activa: revisando {self.csv_path} cada {interval}s")
+
+    def stop_watching(self) -> None:
+        """Detiene el thread de recarga (espera a que termine una recarga en curso)."""
+        watcher = self._watcher
+        if watcher is None:
+            return
+        self._stop_watching.set()
+        watcher.join()
+        self._watcher = None
+
+    def _watch(self, interval: float, settle: float) -> None:
+        """Bucle del thread de recarga."""
+        failed_source = None
+        while not self._stop_watching.wait(interval):
+            current = self._current_source()
+            if current is None or current == self.source or current == failed_source:
+                continue
+            if time.time() - current["mtime_ns"] / 1e9 < settle:
+                continue
+
+            try:
+                self.reload()
+            except Exception as e:
+                failed_source = current
+                logger.error(f"Recarga de cuentas fallida, se mantiene la versión anterior: {e}")
+
+    def get_stats(self) -> Dict[str, any]:
+        """
+        Estadísticas de la versión cargada y de las recargas.
+
+        `staleness_seconds` es el tiempo desde que cambió el CSV sin que la
+        versión nueva se esté sirviendo todavía (0 si está al día).
+
+        Returns:
+            Diccionario con estadísticas
+        """
+        now = time.time()
+        current = self._current_source()
+        pending = current is not None and current != self.source
+        return {
+            "accounts": len(self.store),
+            "backend": self.backend,
+            "loaded_from": self.loaded_from,
+            "data_age_seconds": now - self.source["mtime_ns"] / 1e9,
+            "staleness_seconds": max(0.0, now - current["mtime_ns"] / 1e9) if pending else 0.0,
+            "watching": self._watcher is not None and self._watcher.is_alive(),
+            "reloads": self.reloads,
+            "reload_failures": self.reload_failures,
+            "last_reload_seconds": self.last_reload_seconds,
+            "last_reload_error": self.last_reload_error,
+        }
+
     def get_balance_by_cedula(self, cedula_id: str) -> Dict[str, any]:
         """
         Obtiene el balance de una cuenta por ID de cédula.
@@ -57,10 +376,11 @@ class CSVQueryManager:
         if not cedula_id:
             raise ValueError("ID de cédula no puede estar vacío")
 
-        # Buscar en el DataFrame
-        result = self.df[self.df["ID_Cedula"] == cedula_id]
+        # Buscar en el índice de cédulas (una sola lectura de self.store: una
+        # recarga concurrente no mezcla versiones)
+        account = self.store.find(cedula_id)
 
-        if result.empty:
+        if account is None:
             logger.warning(f"Cédula no encontrada: {cedula_id}")
             return {
                 "found": False,
@@ -68,13 +388,13 @@ class CSVQueryManager:
             }
 
         # Extraer datos
-        row = result.iloc[0]
+        cedula, nombre, balance = account
         balance_info = {
             "found": True,
-            "cedula": row["ID_Cedula"],
-            "nombre": row["Nombre"],
-            "balance": float(row["Balance"]),
-            "message": f"El balance de la cuenta de {row['Nombre']} (Cédula: {row['ID_Cedula']}) es: ${row['Balance']:.2f}",
+            "cedula": cedula,
+            "nombre": nombre,
+            "balance": balance,
+            "message": f"El balance de la cuenta de {nombre} (Cédula: {cedula}) es: ${balance:.2f}",
         }
 
         logger.info(f"Balance consultado exitosamente para {cedula_id}")
@@ -87,22 +407,30 @@ class CSVQueryManager:
         Returns:
             DataFrame con todas las cuentas
         """
-        return self.df.copy()
+        return self.store.to_dataframe().copy()
 
-    def search_by_name(self, name: str) -> pd.DataFrame:
+    def search_by_name(
+        self,
+        name: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        prefix: bool = False,
+    ) -> pd.DataFrame:
         """
-        Busca cuentas por nombre (búsqueda parcial).
+        Busca cuentas por nombre (búsqueda parcial, sin distinguir mayúsculas
+        ni acentos).
 
         Args:
             name: Nombre o parte del nombre a buscar
+            limit: Resultados como máximo (None = todos)
+            offset: Resultados a saltar, para paginar (en orden del archivo
+                con ambos backends)
+            prefix: Solo nombres con alguna palabra que empiece con el texto
 
         Returns:
             DataFrame con los resultados
         """
-        name_lower = name.lower()
-        results = self.df[
-            self.df["Nombre"].str.lower().str.contains(name_lower, na=False)
-        ]
+        results = self.store.search_by_name(name, limit=limit, offset=offset, prefix=prefix)
         logger.info(f"Búsqueda por nombre '{name}': {len(results)} resultados")
         return results
 
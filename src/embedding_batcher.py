@@ -0,0 +1,138 @@
+"""
+Micro-batching de embeddings de consultas.
+Con muchas consultas concurrentes en un mismo event loop (servidor ASGI),
+cada aembed_query se encola y un único worker las embebe juntas con una
+llamada a embed_documents: el modelo procesa un lote en lugar de N llamadas
+de un texto, y el event loop no ocupa un thread por consulta.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from src.config import EMBEDDING_MICRO_BATCH_MAX_SIZE, EMBEDDING_MICRO_BATCH_MAX_WAIT_MS
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatchingEmbeddings(Embeddings):
+    """
+    Envoltorio de embeddings que agrupa las llamadas asíncronas concurrentes.
+
+    Las llamadas síncronas pasan directo al modelo. Supone que
+    embed_query(texto) == embed_documents([texto])[0], como en los modelos
+    de sentence-transformers.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_batch_size: int = EMBEDDING_MICRO_BATCH_MAX_SIZE,
+        max_wait_ms: float = EMBEDDING_MICRO_BATCH_MAX_WAIT_MS,
+    ):
+        """
+        Inicializa el envoltorio.
+
+        Args:
+            embeddings: Modelo de embeddings subyacente
+            max_batch_size: Textos por lote como máximo
+            max_wait_ms: Espera máxima para completar un lote (0 = solo
+                agrupa lo que ya está en cola)
+        """
+        self.embeddings = embeddings
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        # Cola y worker del event loop en uso (se recrean si cambia el loop)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.embeddings.embed_documents, texts
+        )
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """
+        Embebe una consulta junto con las demás que estén en cola.
+
+        Args:
+            text: Texto de la consulta
+
+        Returns:
+            Vector de la consulta
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Worker: toma lotes de la cola y los embebe en un thread aparte."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            if self.max_wait_ms > 0 and self._queue.qsize() < self.max_batch_size - 1:
+                await asyncio.sleep(self.max_wait_ms / 1000)
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            texts = [text for text, _ in batch]
+            try:
+                vectors = await loop.run_in_executor(
+                    None, self.embeddings.embed_documents, texts
+                )
+            except Exception as e:
+                logger.error(f"Error embebiendo lote de {len(texts)} consultas: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self._record_batch(len(batch))
+            for (_, future), vector in zip(batch, vectors):
+                # La consulta pudo cancelarse (cliente desconectado) mientras esperaba
+                if not future.done():
+                    future.set_result(vector)
+
+    def _record_batch(self, size: int) -> None:
+        with self._stats_lock:
+            self.requests += size
+            self.batches += 1
+            self.max_batch_seen = max(self.max_batch_seen, size)
+
+    def get_stats(self) -> dict:
+        """
+        Obtiene estadísticas del agrupamiento.
+
+        Returns:
+            Diccionario con consultas, lotes y tamaño medio/máximo de lote
+        """
+        with self._stats_lock:
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+                "max_batch_size": self.max_batch_seen,
+            }
+
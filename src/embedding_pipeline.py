@@ -0,0 +1,120 @@
+"""
+Pipeline de embeddings para construir índices.
+Embebe documentos en lotes de tamaño fijo, opcionalmente repartidos en un
+pool de procesos, y entrega los vectores en streaming para insertarlos en el
+índice sin acumular todo el corpus en memoria.
+"""
+
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Embeddings del proceso worker (inicializados una vez por proceso)
+_worker_embeddings = None
+
+
+class EmbeddingBatch(NamedTuple):
+    """Lote de chunks a embeber."""
+
+    texts: List[str]
+    metadatas: List[Dict]
+    ids: List[str]
+
+
+def _init_worker(embeddings_factory: Callable[[], object], torch_threads: int) -> None:
+    """Inicializa un proceso worker: limita threads de torch y carga el modelo."""
+    global _worker_embeddings
+
+    try:
+        import torch
+
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+    _worker_embeddings = embeddings_factory()
+
+
+def _embed_in_worker(texts: List[str]) -> List[List[float]]:
+    return _worker_embeddings.embed_documents(texts)
+
+
+def batched(items: Iterable, batch_size: int) -> Iterator[list]:
+    """Agrupa un iterable en listas de tamaño batch_size (la última puede ser menor)."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def embed_batches(
+    batches: Iterable[EmbeddingBatch],
+    embeddings,
+    workers: int = 1,
+    embeddings_factory: Optional[Callable[[], object]] = None,
+    max_pending: Optional[int] = None,
+) -> Iterator[Tuple[EmbeddingBatch, List[List[float]]]]:
+    """
+    Embebe lotes y los entrega en orden a medida que terminan.
+
+    Con workers > 1 los lotes se reparten en un pool de procesos (cada uno con
+    su propia copia del modelo). Como máximo max_pending lotes quedan en vuelo,
+    de modo que la memoria pico no depende del tamaño del corpus.
+
+    Args:
+        batches: Lotes a embeber (puede ser un generador)
+        embeddings: Embeddings a usar en el proceso actual (workers <= 1)
+        workers: Número de procesos
+        embeddings_factory: Callable serializable que crea los embeddings en
+            cada worker (por defecto se serializa la instancia `embeddings`)
+        max_pending: Lotes en vuelo como máximo (por defecto 2 por worker)
+
+    Yields:
+        Tuplas (lote, vectores)
+    """
+    if workers <= 1:
+        for batch in batches:
+            yield batch, embeddings.embed_documents(batch.texts)
+        return
+
+    factory = embeddings_factory or _InstanceFactory(embeddings)
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+    max_pending = max_pending or 2 * workers
+
+    # spawn evita heredar el estado de torch del proceso padre
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(factory, torch_threads),
+    ) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append((batch, pool.submit(_embed_in_worker, batch.texts)))
+            if len(pending) >= max_pending:
+                done_batch, future = pending.popleft()
+                yield done_batch, future.result()
+
+        while pending:
+            done_batch, future = pending.popleft()
+            yield done_batch, future.result()
+
+
+class _InstanceFactory:
+    """Factory serializable que retorna una instancia de embeddings ya creada."""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    def __call__(self):
+        return self.embeddings
@@ -0,0 +1,155 @@
+"""
+LLM local determinista para benchmarks y pruebas sin red.
+
+Implementa la interfaz de chat de LangChain (invoke/ainvoke/stream/astream),
+de modo que el router, el agente y el chain RetrievalQA lo usan igual que a
+ChatOpenAI. Para un mismo prompt siempre genera la misma respuesta con la
+misma latencia: tiempo al primer token con distribución lognormal alrededor
+de una mediana, y luego tokens a velocidad constante.
+"""
+
+import asyncio
+import random
+import re
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.config import (
+    FAKE_LLM_LATENCY_MS,
+    FAKE_LLM_LATENCY_SIGMA,
+    FAKE_LLM_RESPONSE_TOKENS,
+    FAKE_LLM_SEED,
+    FAKE_LLM_TOKENS_PER_SECOND,
+)
+
+# Vocabulario de las respuestas generadas
+VOCABULARY = (
+    "cuenta ahorros tarjeta crédito transferencia banco cliente requisitos "
+    "cédula saldo depósito agencia atención horario servicio solicitud "
+    "documento trámite línea banca comisión plazo tasa interés"
+).split()
+
+CEDULA_PATTERN = re.compile(r"\bV-?\d{6,9}\b", re.IGNORECASE)
+
+# Instrucción final del prompt de clasificación del router
+ROUTING_MARKER = '"balance", "knowledge" o "general"'
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Modelo de chat falso con latencia y velocidad de tokens configurables.
+
+    Responde en el formato que esperan los prompts del sistema: a la
+    extracción de cédula con la cédula del prompt (o "NONE") y a la
+    clasificación con "general"; al resto, con texto del vocabulario.
+    """
+
+    model_name: str = "fake"
+    latency_ms: float = FAKE_LLM_LATENCY_MS
+    latency_sigma: float = FAKE_LLM_LATENCY_SIGMA
+    tokens_per_second: float = FAKE_LLM_TOKENS_PER_SECOND
+    response_tokens: int = FAKE_LLM_RESPONSE_TOKENS
+    seed: int = FAKE_LLM_SEED
+    responses: Optional[List[str]] = None  # Respuestas fijas (en orden, cíclicas)
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-local"
+
+    def _plan(self, messages: List[BaseMessage]) -> tuple:
+        """Retorna (demora al primer token, tokens, uso de tokens) para un prompt."""
+        prompt = "\n".join(str(message.content) for message in messages)
+        rng = random.Random(f"{self.seed}:{prompt}")
+        delay = (
+            rng.lognormvariate(0.0, self.latency_sigma) * self.latency_ms / 1000
+            if self.latency_ms > 0
+            else 0.0
+        )
+
+        if self.responses:
+            text = self.responses[self.calls % len(self.responses)]
+            self.calls += 1
+        else:
+            text = self._respond(prompt, rng)
+        tokens = re.findall(r"\S+\s*", text) or [text]
+        prompt_tokens = len(prompt.split())
+        usage = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens),
+        }
+        return delay, tokens, usage
+
+    def _respond(self, prompt: str, rng: random.Random) -> str:
+        """Genera la respuesta determinista para un prompt."""
+        if prompt.rstrip().endswith("Cédula:"):
+            match = CEDULA_PATTERN.search(prompt)
+            return match.group(0).upper() if match else "NONE"
+        if ROUTING_MARKER in prompt:
+            # Al LLM solo llegan las consultas que las reglas no clasificaron
+            return "general"
+        return " ".join(rng.choice(VOCABULARY) for _ in range(self.response_tokens))
+
+    def _token_delay(self) -> float:
+        return 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _result(self, tokens: List[str], usage: dict) -> ChatResult:
+        message = AIMessage(content="".join(tokens), usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunk(self, token: str, usage: Optional[dict]) -> ChatGenerationChunk:
+        # El uso de tokens va en el último fragmento, como en OpenAI con stream_usage
+        return ChatGenerationChunk(message=AIMessageChunk(content=token, usage_metadata=usage))
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay, tokens, usage = self._plan(messages)
+        time.sleep(delay + len(tokens) * self._token_delay())
+        return self._result(tokens, usage)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay, tokens, usage = self._plan(messages)
+        await asyncio.sleep(delay + len(tokens) * self._token_delay())
+        return self._result(tokens, usage)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        delay, tokens, usage = self._plan(messages)
+        time.sleep(delay)
+        for i, token in enumerate(tokens):
+            time.sleep(self._token_delay())
+            yield self._chunk(token, usage if i == len(tokens) - 1 else None)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        delay, tokens, usage = self._plan(messages)
+        await asyncio.sleep(delay)
+        for i, token in enumerate(tokens):
+            await asyncio.sleep(self._token_delay())
+            yield self._chunk(token, usage if i == len(tokens) - 1 else None)
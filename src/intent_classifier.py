@@ -0,0 +1,173 @@
+"""
+Clasificador de intención local basado en embeddings.
+Resuelve en milisegundos las consultas que las reglas no cubren, usando el
+mismo modelo de embeddings que la base de conocimientos, y solo deja al LLM
+los casos de baja confianza.
+"""
+
+import logging
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from src.config import INTENT_MIN_MARGIN, INTENT_SIMILARITY_THRESHOLD
+from src.router import QueryType
+
+logger = logging.getLogger(__name__)
+
+
+# Ejemplos etiquetados (semilla): los mismos del prompt de routing más algunas
+# variantes frecuentes. Se excluyen las consultas ambiguas ("¿Qué servicios
+# ofrecen?" es general en la ayuda de la UI pero "knowledge" según el prompt):
+# esas las decide el LLM
+INTENT_EXAMPLES: Dict[QueryType, List[str]] = {
+    QueryType.BALANCE: [
+        "¿Cuál es mi balance?",
+        "¿Cuánto dinero tengo en mi cuenta?",
+        "Balance de la cédula V-12345678",
+        "Consultar saldo",
+        "Quiero saber cuánta plata tengo",
+        "Estado de mi cuenta",
+    ],
+    QueryType.KNOWLEDGE: [
+        "¿Cómo abrir una cuenta?",
+        "¿Cómo solicitar una tarjeta de crédito?",
+        "¿Cómo hacer una transferencia?",
+        "¿Qué requisitos necesito para abrir una cuenta?",
+        "Información sobre cuentas de ahorro",
+        "¿Qué documentos necesito para pedir una tarjeta?",
+        "¿Cómo envío dinero a otro banco?",
+    ],
+    QueryType.GENERAL: [
+        "¿Qué hora es?",
+        "¿Cuál es el sentido de la vida?",
+        "Hola",
+        "Gracias",
+        "Adiós",
+        "Buenos días",
+    ],
+}
+
+
+class IntentPrediction(NamedTuple):
+    """Predicción del clasificador local."""
+
+    query_type: QueryType
+    confidence: float  # Similaridad coseno con el ejemplo más cercano
+    margin: float  # Diferencia con la mejor similaridad de otra categoría
+
+
+class EmbeddingIntentClassifier:
+    """Clasificador kNN (vecino más cercano por categoría) sobre embeddings."""
+
+    def __init__(
+        self,
+        embeddings,
+        examples: Dict[QueryType, List[str]] = INTENT_EXAMPLES,
+        threshold: float = INTENT_SIMILARITY_THRESHOLD,
+        min_margin: float = INTENT_MIN_MARGIN,
+    ):
+        """
+        Inicializa el clasificador.
+
+        Args:
+            embeddings: Modelo de embeddings de LangChain (embed_query/embed_documents)
+            examples: Consultas de ejemplo por tipo de consulta
+            threshold: Similaridad mínima para aceptar la predicción
+            min_margin: Margen mínimo sobre la segunda categoría
+        """
+        self.embeddings = embeddings
+        self.examples = examples
+        self.threshold = threshold
+        self.min_margin = min_margin
+
+        self._labels: List[QueryType] = list(examples.keys())
+        self._example_vectors: Optional[np.ndarray] = None
+        self._example_labels: Optional[np.ndarray] = None
+        self._fit_lock = threading.Lock()
+
+    def fit(self) -> None:
+        """Calcula los embeddings de los ejemplos (una sola vez)."""
+        with self._fit_lock:
+            if self._example_vectors is not None:
+                return
+
+            texts, labels = [], []
+            for label_index, label in enumerate(self._labels):
+                texts.extend(self.examples[label])
+                labels.extend([label_index] * len(self.examples[label]))
+
+            vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+            self._example_labels = np.asarray(labels)
+            self._example_vectors = self._normalize(vectors)
+            logger.info(f"Clasificador de intención entrenado con {len(texts)} ejemplos")
+
+    def predict(self, query: str) -> IntentPrediction:
+        """
+        Predice el tipo de consulta y la confianza de la predicción.
+
+        Args:
+            query: Consulta del usuario
+
+        Returns:
+            IntentPrediction
+        """
+        return self._predict_vector(self.embeddings.embed_query(query))
+
+    async def apredict(self, query: str) -> IntentPrediction:
+        """Versión asíncrona de predict."""
+        return self._predict_vector(await self.embeddings.aembed_query(query))
+
+    def classify(self, query: str) -> QueryType | None:
+        """
+        Clasifica una consulta si la confianza es suficiente.
+
+        Args:
+            query: Consulta del usuario
+
+        Returns:
+            QueryType, o None si la consulta debe escalarse al LLM
+        """
+        return self._accept(self.predict(query))
+
+    async def aclassify(self, query: str) -> QueryType | None:
+        """Versión asíncrona de classify."""
+        return self._accept(await self.apredict(query))
+
+    def _predict_vector(self, embedding: List[float]) -> IntentPrediction:
+        self.fit()
+
+        query_vector = self._normalize(np.asarray(embedding, dtype=np.float32))
+        similarities = self._example_vectors @ query_vector
+
+        # Mejor similaridad de cada categoría
+        scores = np.full(len(self._labels), -1.0, dtype=np.float32)
+        np.maximum.at(scores, self._example_labels, similarities)
+
+        order = np.argsort(scores)[::-1]
+        best, second = float(scores[order[0]]), float(scores[order[1]])
+        return IntentPrediction(
+            query_type=self._labels[order[0]],
+            confidence=best,
+            margin=best - second,
+        )
+
+    def _accept(self, prediction: IntentPrediction) -> QueryType | None:
+        if prediction.confidence < self.threshold or prediction.margin < self.min_margin:
+            logger.info(
+                f"Clasificación local con baja confianza ({prediction.confidence:.3f}, "
+                f"margen {prediction.margin:.3f}): se escala al LLM"
+            )
+            return None
+
+        logger.info(
+            f"Clasificación local: {prediction.query_type.value} "
+            f"(confianza {prediction.confidence:.3f})"
+        )
+        return prediction.query_type
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1)
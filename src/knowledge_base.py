@@ -3,17 +3,213 @@ Módulo de Base de Conocimientos (Knowledge Base).
 Implementa RAG (Retrieval-Augmented Generation) usando FAISS y embeddings.
 """
 
+import functools
+import hashlib
+import json
 import logging
+import os
+import shutil
+import time
+import uuid
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores.faiss import FAISS
 from langchain_community.embeddings.huggingface import HuggingFaceEmbeddings
-from langchain_community.document_loaders.directory import DirectoryLoader
+from langchain_community.document_loaders import TextLoader
 from langchain_core.documents import Document
-from src.config import EMBEDDINGS_MODEL_NAME, KNOWLEDGE_BASE_DIR, INDEX_DIR, RETRIEVER_K
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from src.config import (
+    CHUNK_OVERLAP,
+    CHUNK_SIZE,
+    CHUNKING_ENABLED,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_MICRO_BATCH_ENABLED,
+    EMBEDDING_WORKERS,
+    EMBEDDINGS_MODEL_NAME,
+    FAISS_HNSW_EF_CONSTRUCTION,
+    FAISS_HNSW_EF_SEARCH,
+    FAISS_HNSW_M,
+    FAISS_INDEX_TYPE,
+    FAISS_IVF_NLIST,
+    FAISS_IVF_NPROBE,
+    FAISS_MMAP_ENABLED,
+    FAISS_PQ_M,
+    FAISS_PQ_NBITS,
+    FAISS_TRAIN_SIZE,
+    INDEX_DIR,
+    KB_REFRESH_ON_LOAD,
+    KNOWLEDGE_BASE_DIR,
+    RETRIEVER_K,
+)
+from src.embedding_batcher import MicroBatchingEmbeddings
+from src.embedding_pipeline import EmbeddingBatch, batched, embed_batches
+from src.mmap_docstore import (
+    FAISS_INDEX_FILENAME,
+    MmapDocstore,
+    has_mmap_docstore,
+    load_mmap_vectorstore,
+    write_mmap_docstore,
+)
 
 logger = logging.getLogger(__name__)
 
+# Manifiesto de hashes por archivo, guardado junto al índice FAISS. También
+# apunta a la generación vigente: cada guardado escribe los archivos del
+# índice en un subdirectorio gen-<id> nuevo y luego reemplaza el manifiesto
+# con os.replace, de modo que un lector nunca combina archivos de dos
+# versiones (los índices sin "generation" se leen de la raíz)
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Separadores en orden de preferencia: secciones, párrafos, líneas y fin de
+# oración en español antes de recurrir a cortar por palabras
+SPANISH_SEPARATORS = ["\n## ", "\n\n", "\n", ". ", "? ", "! ", "; ", ", ", " ", ""]
+
+
+def build_text_splitter(
+    chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP
+) -> RecursiveCharacterTextSplitter:
+    """
+    Crea el splitter de chunks, respetando límites de oración en español.
+
+    Args:
+        chunk_size: Tamaño máximo de cada chunk (caracteres)
+        chunk_overlap: Solapamiento entre chunks consecutivos (caracteres)
+
+    Returns:
+        Splitter configurado
+    """
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=SPANISH_SEPARATORS,
+        keep_separator="end",  # La puntuación queda con su oración
+        add_start_index=True,
+        strip_whitespace=True,
+    )
+
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+
+
+def min_training_vectors(
+    index_type: str, nlist: int = FAISS_IVF_NLIST, pq_nbits: int = FAISS_PQ_NBITS
+) -> int:
+    """Vectores de entrenamiento necesarios para construir un tipo de índice."""
+    if index_type == "ivf_flat":
+        return nlist
+    if index_type == "ivf_pq":
+        return max(nlist, 2**pq_nbits)
+    return 0
+
+
+def build_faiss_index(
+    index_type: str,
+    training_vectors: np.ndarray,
+    nlist: int = FAISS_IVF_NLIST,
+    hnsw_m: int = FAISS_HNSW_M,
+    ef_construction: int = FAISS_HNSW_EF_CONSTRUCTION,
+    pq_m: int = FAISS_PQ_M,
+    pq_nbits: int = FAISS_PQ_NBITS,
+) -> faiss.Index:
+    """
+    Crea un índice FAISS vacío (L2) del tipo pedido, entrenado si hace falta.
+
+    Los índices IVF necesitan al menos nlist vectores de entrenamiento (y PQ
+    al menos 2**pq_nbits); con menos se usa un índice exacto, que para
+    corpus tan chicos además es más rápido.
+
+    Args:
+        index_type: "flat", "ivf_flat", "hnsw" o "ivf_pq"
+        training_vectors: Muestra de vectores (n, dimensión) para entrenar
+        nlist: Listas invertidas (IVF)
+        hnsw_m: Vecinos por nodo (HNSW)
+        ef_construction: Candidatos explorados al insertar (HNSW)
+        pq_m: Subvectores por código (PQ)
+        pq_nbits: Bits por subvector (PQ)
+
+    Returns:
+        Índice listo para agregar vectores
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(
+            f"Tipo de índice FAISS desconocido: {index_type} (opciones: {INDEX_TYPES})"
+        )
+
+    training_vectors = np.ascontiguousarray(training_vectors, dtype=np.float32)
+    n_train, dimension = training_vectors.shape
+
+    required = min_training_vectors(index_type, nlist, pq_nbits)
+    if n_train < required:
+        logger.warning(
+            f"{n_train} vectores no alcanzan para entrenar {index_type} "
+            f"(mínimo {required}): se usa un índice exacto"
+        )
+        index_type = "flat"
+
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dimension)
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, hnsw_m)
+        index.hnsw.efConstruction = ef_construction
+        return index
+
+    quantizer = faiss.IndexFlatL2(dimension)
+    if index_type == "ivf_flat":
+        index = faiss.IndexIVFFlat(quantizer, dimension, nlist)
+    else:
+        if dimension % pq_m != 0:
+            raise ValueError(
+                f"FAISS_PQ_M={pq_m} debe dividir la dimensión de los embeddings ({dimension})"
+            )
+        index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m, pq_nbits)
+
+    start_time = time.perf_counter()
+    index.train(training_vectors)
+    logger.info(
+        f"Índice {index_type} entrenado con {n_train} vectores en "
+        f"{time.perf_counter() - start_time:.2f}s"
+    )
+    return index
+
+
+def set_search_params(
+    index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None
+) -> None:
+    """
+    Ajusta los parámetros de búsqueda de un índice aproximado: nprobe para
+    IVF y efSearch para HNSW (más alto = mejor recall, más latencia). En
+    índices exactos no hace nada.
+    """
+    if nprobe is not None and isinstance(index, faiss.IndexIVF):
+        index.nprobe = nprobe
+    if ef_search is not None and isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+
+
+def current_index_dir(index_path: Path) -> Path:
+    """
+    Directorio con los archivos del índice vigente en index_path.
+
+    Args:
+        index_path: Directorio del índice (el del manifiesto)
+
+    Returns:
+        Subdirectorio de la generación a la que apunta el manifiesto, o
+        index_path para índices guardados sin generaciones
+    """
+    index_path = Path(index_path)
+    try:
+        with open(index_path / MANIFEST_FILENAME, "r", encoding="utf-8") as f:
+            generation = json.load(f).get("generation")
+    except (OSError, ValueError):
+        generation = None
+    return index_path / generation if generation else index_path
+
 
 class KnowledgeBaseManager:
     """Gestor de la base de conocimientos vectorial."""
@@ -24,6 +220,16 @@ class KnowledgeBaseManager:
         knowledge_base_path: Path = KNOWLEDGE_BASE_DIR,
         embeddings_model: str = EMBEDDINGS_MODEL_NAME,
         k: int = RETRIEVER_K,
+        embeddings=None,
+        auto_load: bool = True,
+        chunk_size: Optional[int] = CHUNK_SIZE if CHUNKING_ENABLED else None,
+        chunk_overlap: int = CHUNK_OVERLAP,
+        embedding_batch_size: int = EMBEDDING_BATCH_SIZE,
+        embedding_workers: int = EMBEDDING_WORKERS,
+        index_type: str = FAISS_INDEX_TYPE,
+        nprobe: int = FAISS_IVF_NPROBE,
+        ef_search: int = FAISS_HNSW_EF_SEARCH,
+        mmap: bool = FAISS_MMAP_ENABLED,
     ):
         """
         Inicializa el gestor de base de conocimientos.
@@ -33,31 +239,92 @@ class KnowledgeBaseManager:
             knowledge_base_path: Ruta a los documentos de conocimiento
             embeddings_model: Nombre del modelo de embeddings
             k: Número de documentos a recuperar
+            embeddings: Instancia de embeddings ya creada (si no, se carga embeddings_model)
+            auto_load: Si es False no se carga ni crea el índice al inicializar
+            chunk_size: Tamaño de chunk en caracteres (None = un vector por archivo)
+            chunk_overlap: Solapamiento entre chunks en caracteres
+            embedding_batch_size: Chunks por lote al construir el índice
+            embedding_workers: Procesos para embeber al construir el índice
+            index_type: Tipo de índice FAISS ("flat", "ivf_flat", "hnsw", "ivf_pq")
+            nprobe: Listas visitadas por búsqueda en índices IVF
+            ef_search: Candidatos explorados por búsqueda en índices HNSW
+            mmap: Cargar el índice y los documentos con memory-mapping
         """
-        self.index_path = index_path
-        self.knowledge_base_path = knowledge_base_path
+        if index_type not in INDEX_TYPES:
+            raise ValueError(
+                f"Tipo de índice FAISS desconocido: {index_type} (opciones: {INDEX_TYPES})"
+            )
+
+        self.index_path = Path(index_path)
+        self.knowledge_base_path = Path(knowledge_base_path)
         self.embeddings_model_name = embeddings_model
         self.k = k
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_workers = embedding_workers
+        self.index_type = index_type
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.mmap = mmap
+        self._splitter = (
+            build_text_splitter(chunk_size, chunk_overlap) if chunk_size else None
+        )
 
         # Inicializar embeddings
-        logger.info(f"Cargando modelo de embeddings: {embeddings_model}")
-        self.embeddings = HuggingFaceEmbeddings(model_name=embeddings_model)
+        self._embeddings_factory = None
+        if embeddings is not None:
+            self.embeddings = embeddings
+        else:
+            # Factory serializable para cargar el modelo en procesos worker
+            self._embeddings_factory = functools.partial(
+                HuggingFaceEmbeddings, model_name=embeddings_model
+            )
+            logger.info(f"Cargando modelo de embeddings: {embeddings_model}")
+            self.embeddings = HuggingFaceEmbeddings(model_name=embeddings_model)
+            if EMBEDDING_MICRO_BATCH_ENABLED:
+                # Las consultas async concurrentes se embeben en lotes
+                self.embeddings = MicroBatchingEmbeddings(self.embeddings)
+
+        # Callbacks a notificar cuando el índice cambia
+        self._index_listeners: List[Callable[[], None]] = []
 
         # Cargar o crear índice
         self.vectorstore: Optional[FAISS] = None
-        self._load_or_create_index()
+        if auto_load:
+            self._load_or_create_index()
+
+    def add_index_listener(self, callback: Callable[[], None]) -> None:
+        """
+        Registra un callback que se invoca cada vez que el índice se recarga
+        o se reconstruye (p. ej. para invalidar cachés dependientes).
+
+        Args:
+            callback: Función sin argumentos
+        """
+        self._index_listeners.append(callback)
+
+    def _notify_index_changed(self) -> None:
+        """Notifica a los listeners registrados que el índice cambió."""
+        for callback in self._index_listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error notificando cambio de índice: {e}")
 
     def _load_or_create_index(self) -> None:
         """Carga el índice FAISS existente o crea uno nuevo."""
         try:
-            if self.index_path.exists():
+            if self._has_index():
                 logger.info(f"Cargando índice existente desde: {self.index_path}")
-                self.vectorstore = FAISS.load_local(
-                    str(self.index_path),
-                    self.embeddings,
-                    allow_dangerous_deserialization=True,
-                )
+                self.vectorstore = self._read_vectorstore()
                 logger.info("Índice cargado exitosamente")
+
+                # Aplicar cambios en los documentos desde la última indexación
+                if KB_REFRESH_ON_LOAD and self.manifest_path.exists():
+                    self.update_index(notify=False)
+
+                self._notify_index_changed()
             else:
                 logger.warning(f"Índice no encontrado en {self.index_path}")
                 logger.info("Creando nuevo índice desde documentos...")
@@ -66,33 +333,392 @@ class KnowledgeBaseManager:
             logger.error(f"Error al cargar índice: {e}")
             raise
 
+    @property
+    def manifest_path(self) -> Path:
+        """Ruta del manifiesto de hashes del índice."""
+        return self.index_path / MANIFEST_FILENAME
+
     def create_index(self) -> None:
         """Crea un nuevo índice FAISS desde los documentos de conocimiento."""
         try:
             # Cargar documentos
             logger.info(f"Cargando documentos desde: {self.knowledge_base_path}")
-            loader = DirectoryLoader(str(self.knowledge_base_path), glob="**/*.txt")
-            docs = loader.load()
-            logger.info(f"Documentos cargados: {len(docs)}")
+            hashes = self._hash_knowledge_files()
 
-            if not docs:
+            if not hashes:
                 raise ValueError(
                     f"No se encontraron documentos en {self.knowledge_base_path}"
                 )
 
-            # Crear vectorstore
+            # Crear vectorstore (se reemplaza el actual solo al terminar)
             logger.info("Creando vectorstore FAISS...")
-            self.vectorstore = FAISS.from_documents(docs, self.embeddings)
-
-            # Guardar índice
-            self.index_path.mkdir(parents=True, exist_ok=True)
-            self.vectorstore.save_local(str(self.index_path))
-            logger.info(f"Índice guardado en: {self.index_path}")
+            vectorstore, files = self._embed_files(sorted(hashes), None)
+            if vectorstore is None:
+                raise ValueError(
+                    f"No se encontraron documentos en {self.knowledge_base_path}"
+                )
+            self.vectorstore = vectorstore
+            self._apply_search_params()
+
+            # Guardar índice y manifiesto
+            self._save_index(
+                {
+                    name: {"sha256": hashes[name], "ids": files[name]}
+                    for name in sorted(hashes)
+                }
+            )
+            self._notify_index_changed()
 
         except Exception as e:
             logger.error(f"Error al crear índice: {e}")
             raise
 
+    def update_index(self, notify: bool = True) -> Dict[str, List[str]]:
+        """
+        Actualiza el índice de forma incremental.
+
+        Compara los hashes de contenido de cada archivo con el manifiesto
+        guardado junto al índice y solo re-embebe los archivos agregados o
+        modificados; los vectores de archivos modificados o eliminados se
+        quitan del índice. Si no hay manifiesto (índice creado con una
+        versión anterior) o cambió el modelo de embeddings, reconstruye el
+        índice completo.
+
+        Args:
+            notify: Si notificar a los listeners cuando hay cambios
+
+        Returns:
+            Diccionario con las listas de archivos "added", "changed" y "deleted"
+        """
+        manifest = self._read_manifest()
+        if (
+            manifest is None
+            or manifest.get("version") != MANIFEST_VERSION
+            or manifest.get("embeddings_model") != self.embeddings_model_name
+            or manifest.get("chunking") != self._chunking_config()
+            or manifest.get("index") != self._index_config()
+            or not self._has_index()
+        ):
+            logger.info("Manifiesto ausente o incompatible: reconstrucción completa")
+            self.create_index()
+            return {"added": sorted(self._hash_knowledge_files()), "changed": [], "deleted": []}
+
+        if self.vectorstore is None:
+            self.vectorstore = self._read_vectorstore()
+
+        indexed_files = manifest["files"]
+        current_hashes = self._hash_knowledge_files()
+
+        added = sorted(set(current_hashes) - set(indexed_files))
+        deleted = sorted(set(indexed_files) - set(current_hashes))
+        changed = sorted(
+            name
+            for name in set(current_hashes) & set(indexed_files)
+            if current_hashes[name] != indexed_files[name]["sha256"]
+        )
+        summary = {"added": added, "changed": changed, "deleted": deleted}
+
+        if not (added or changed or deleted):
+            logger.info("Índice al día: sin cambios en la base de conocimientos")
+            return summary
+
+        logger.info(
+            f"Actualización incremental: {len(added)} nuevos, "
+            f"{len(changed)} modificados, {len(deleted)} eliminados"
+        )
+
+        if len(added) + len(changed) == 0 and len(deleted) == len(indexed_files):
+            raise ValueError(
+                f"No se encontraron documentos en {self.knowledge_base_path}"
+            )
+
+        # El índice mapeado es de solo lectura: modificar una copia en memoria
+        if isinstance(self.vectorstore.docstore, MmapDocstore):
+            self.vectorstore = self._read_vectorstore(writable=True)
+
+        # Quitar vectores de archivos modificados o eliminados
+        stale_ids = [
+            doc_id for name in changed + deleted for doc_id in indexed_files[name]["ids"]
+        ]
+        if stale_ids:
+            if isinstance(self.vectorstore.index, faiss.IndexHNSW):
+                # HNSW no admite borrar vectores: se reconstruye el grafo
+                logger.info("El índice HNSW no admite borrados: reconstrucción completa")
+                self.create_index()
+                return summary
+            self.vectorstore.delete(stale_ids)
+
+        # Embeber solo los archivos nuevos o modificados
+        self.vectorstore, files = self._embed_files(added + changed, self.vectorstore)
+
+        for name in deleted:
+            del indexed_files[name]
+        for name in added + changed:
+            indexed_files[name] = {"sha256": current_hashes[name], "ids": files[name]}
+
+        self._save_index(indexed_files)
+        if notify:
+            self._notify_index_changed()
+        return summary
+
+    def _hash_knowledge_files(self) -> Dict[str, str]:
+        """Calcula el SHA-256 de cada documento (clave: ruta relativa)."""
+        hashes = {}
+        for path in sorted(self.knowledge_base_path.glob("**/*.txt")):
+            relative = path.relative_to(self.knowledge_base_path).as_posix()
+            hashes[relative] = hashlib.sha256(path.read_bytes()).hexdigest()
+        return hashes
+
+    def _chunking_config(self) -> Optional[Dict[str, int]]:
+        """Configuración de chunks registrada en el manifiesto."""
+        if self._splitter is None:
+            return None
+        return {"size": self.chunk_size, "overlap": self.chunk_overlap}
+
+    def _index_config(self) -> Dict:
+        """Configuración del índice FAISS registrada en el manifiesto."""
+        config = {"type": self.index_type}
+        if self.index_type in ("ivf_flat", "ivf_pq"):
+            config["nlist"] = FAISS_IVF_NLIST
+        if self.index_type == "ivf_pq":
+            config["pq_m"] = FAISS_PQ_M
+            config["pq_nbits"] = FAISS_PQ_NBITS
+        if self.index_type == "hnsw":
+            config["m"] = FAISS_HNSW_M
+            config["ef_construction"] = FAISS_HNSW_EF_CONSTRUCTION
+        return config
+
+    def _apply_search_params(self) -> None:
+        """Aplica nprobe/efSearch al índice cargado (no se guardan en disco)."""
+        set_search_params(self.vectorstore.index, nprobe=self.nprobe, ef_search=self.ef_search)
+
+    def set_search_params(
+        self, nprobe: Optional[int] = None, ef_search: Optional[int] = None
+    ) -> None:
+        """
+        Cambia el balance recall/latencia de las búsquedas sin reconstruir.
+
+        Args:
+            nprobe: Listas visitadas por búsqueda (índices IVF)
+            ef_search: Candidatos explorados por búsqueda (índices HNSW)
+        """
+        if nprobe is not None:
+            self.nprobe = nprobe
+        if ef_search is not None:
+            self.ef_search = ef_search
+        if self.vectorstore is not None:
+            self._apply_search_params()
+
+    def _new_vectorstore(self, training_vectors: List[List[float]]) -> FAISS:
+        """Crea un vectorstore vacío con el tipo de índice configurado."""
+        index = build_faiss_index(self.index_type, np.asarray(training_vectors))
+        return FAISS(self.embeddings, index, InMemoryDocstore(), {})
+
+    def _iter_chunks(
+        self, relative_paths: List[str], files: Dict[str, List[str]]
+    ) -> Iterator[Tuple[Document, str]]:
+        """
+        Carga documentos archivo por archivo, los divide en chunks y les
+        asigna IDs estables derivados de su archivo. Cada chunk conserva la
+        metadata "source" de su documento de origen.
+
+        Args:
+            relative_paths: Archivos a cargar (rutas relativas a la KB)
+            files: Diccionario que se completa con los IDs de cada archivo
+
+        Yields:
+            Tuplas (chunk, id)
+        """
+        for relative in relative_paths:
+            path = self.knowledge_base_path / relative
+            file_docs = TextLoader(str(path), encoding="utf-8").load()
+            if self._splitter is not None:
+                file_docs = self._splitter.split_documents(file_docs)
+                for i, doc in enumerate(file_docs):
+                    doc.metadata["chunk"] = i
+
+            files[relative] = []
+            for i, doc in enumerate(file_docs):
+                doc_id = f"{relative}#{i}"
+                files[relative].append(doc_id)
+                yield doc, doc_id
+
+    def _embed_files(
+        self, relative_paths: List[str], vectorstore: Optional[FAISS]
+    ) -> Tuple[Optional[FAISS], Dict[str, List[str]]]:
+        """
+        Embebe los archivos en lotes y los inserta en el vectorstore a medida
+        que cada lote termina (la memoria pico no crece con el corpus).
+
+        Args:
+            relative_paths: Archivos a embeber
+            vectorstore: Vectorstore donde insertar (None = crear uno nuevo)
+
+        Returns:
+            Tupla (vectorstore, IDs por archivo)
+        """
+        files: Dict[str, List[str]] = {}
+        batches = (
+            EmbeddingBatch(
+                texts=[doc.page_content for doc, _ in chunk_batch],
+                metadatas=[doc.metadata for doc, _ in chunk_batch],
+                ids=[doc_id for _, doc_id in chunk_batch],
+            )
+            for chunk_batch in batched(
+                self._iter_chunks(relative_paths, files), self.embedding_batch_size
+            )
+        )
+
+        start_time = time.perf_counter()
+        embedded = 0
+
+        # Los índices IVF se entrenan antes de insertar: se acumulan lotes
+        # hasta tener la muestra de entrenamiento (o hasta agotar el corpus)
+        train_size = FAISS_TRAIN_SIZE if min_training_vectors(self.index_type) else 1
+        pending: List[Tuple[EmbeddingBatch, List[List[float]]]] = []
+        pending_size = 0
+
+        def flush() -> None:
+            nonlocal vectorstore
+            if vectorstore is None:
+                vectorstore = self._new_vectorstore(
+                    [vector for _, vectors in pending for vector in vectors]
+                )
+            for batch, vectors in pending:
+                vectorstore.add_embeddings(
+                    list(zip(batch.texts, vectors)), batch.metadatas, ids=batch.ids
+                )
+            pending.clear()
+
+        for batch, vectors in embed_batches(
+            batches,
+            self.embeddings,
+            workers=self.embedding_workers,
+            embeddings_factory=self._embeddings_factory,
+        ):
+            embedded += len(batch.ids)
+            pending.append((batch, vectors))
+            pending_size += len(batch.ids)
+            if vectorstore is not None or pending_size >= train_size:
+                flush()
+        if pending:
+            flush()
+
+        elapsed = time.perf_counter() - start_time
+        if embedded:
+            logger.info(
+                f"Embebidos {embedded} chunks de {len(files)} documentos en "
+                f"{elapsed:.2f}s ({embedded / elapsed:.1f} docs/s, "
+                f"{self.embedding_workers} worker(s), lotes de {self.embedding_batch_size})"
+            )
+        return vectorstore, files
+
+    def _read_manifest(self) -> Optional[Dict]:
+        """Lee el manifiesto del índice, o None si no existe o es inválido."""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Manifiesto inválido en {self.manifest_path}: {e}")
+            return None
+
+    def _index_dir(self) -> Path:
+        """Directorio con los archivos del índice vigente (ver current_index_dir)."""
+        return current_index_dir(self.index_path)
+
+    def _has_index(self) -> bool:
+        """Si hay un índice guardado en index_path."""
+        return (self._index_dir() / FAISS_INDEX_FILENAME).exists()
+
+    def _read_vectorstore(self, writable: bool = False) -> FAISS:
+        """
+        Lee el índice guardado, con memory-mapping si está habilitado.
+
+        Args:
+            writable: Forzar la carga completa en memoria (para modificarlo)
+
+        Returns:
+            Vectorstore con los parámetros de búsqueda aplicados
+        """
+        index_dir = self._index_dir()
+        try:
+            vectorstore = self._read_vectorstore_from(index_dir, writable)
+        except Exception:
+            # Otro proceso publicó una generación nueva (y borró la que se
+            # estaba abriendo) entre la lectura del manifiesto y la carga
+            if self._index_dir() == index_dir:
+                raise
+            logger.warning("Generación del índice reemplazada durante la carga: se reintenta")
+            vectorstore = self._read_vectorstore_from(self._index_dir(), writable)
+        set_search_params(vectorstore.index, nprobe=self.nprobe, ef_search=self.ef_search)
+        return vectorstore
+
+    def _read_vectorstore_from(self, index_dir: Path, writable: bool) -> FAISS:
+        """Carga el vectorstore de un directorio de generación."""
+        if self.mmap and not writable and has_mmap_docstore(index_dir):
+            return load_mmap_vectorstore(index_dir, self.embeddings)
+        if self.mmap and not writable:
+            logger.warning(f"Índice sin docstore mapeable en {index_dir}: se carga en memoria")
+        return FAISS.load_local(
+            str(index_dir),
+            self.embeddings,
+            allow_dangerous_deserialization=True,
+        )
+
+    def _save_index(self, files: Dict[str, Dict]) -> None:
+        """
+        Guarda el índice FAISS (pickle y formato mapeable) y su manifiesto.
+
+        Los archivos se escriben en un subdirectorio de generación nuevo y
+        el manifiesto (que apunta a la generación) se reemplaza con
+        os.replace: un lector ve la generación anterior completa o la nueva
+        completa, nunca un index.faiss de una con el docstore de otra. Los
+        procesos que tienen mapeada una generación borrada siguen leyendo
+        los archivos ya abiertos.
+        """
+        self.index_path.mkdir(parents=True, exist_ok=True)
+        previous = self._read_manifest()
+
+        generation = f"gen-{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+        staging = self.index_path / f".{generation}"
+        try:
+            self.vectorstore.save_local(str(staging))
+            write_mmap_docstore(self.vectorstore, staging)
+            os.replace(staging, self.index_path / generation)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "generation": generation,
+            "embeddings_model": self.embeddings_model_name,
+            "chunking": self._chunking_config(),
+            "index": self._index_config(),
+            "files": files,
+        }
+        manifest_tmp = self.index_path / f".{MANIFEST_FILENAME}.{generation}"
+        with open(manifest_tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(manifest_tmp, self.manifest_path)
+
+        # Se conserva también la generación anterior: un lector que leyó el
+        # manifiesto justo antes del reemplazo puede estar abriéndola
+        self._remove_old_generations(keep={generation, (previous or {}).get("generation")})
+
+        # Descartar la copia privada en memoria en favor del índice mapeado
+        if self.mmap:
+            self.vectorstore = self._read_vectorstore()
+        logger.info(f"Índice guardado en: {self.index_path / generation}")
+
+    def _remove_old_generations(self, keep: set) -> None:
+        """Borra los directorios de generación que no están en keep."""
+        for entry in self.index_path.iterdir():
+            if entry.is_dir() and entry.name.startswith("gen-") and entry.name not in keep:
+                shutil.rmtree(entry, ignore_errors=True)
+
     def search(self, query: str, k: Optional[int] = None) -> List[Document]:
         """
         Busca documentos relevantes en la base de conocimientos.
@@ -0,0 +1,98 @@
+"""
+Callbacks de LangChain que alimentan las métricas del agente.
+
+Se pasan en el config de cada invoke/stream (router, chain y LLM), de modo
+que el cliente LLM compartido entre componentes no queda atado a un agente.
+"""
+
+import time
+from typing import Any, Dict, Set, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from src.metrics import Metrics
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Registra latencia, tiempo al primer token, tokens y errores del LLM y del retriever."""
+
+    # Los handlers síncronos de LangChain corren en un thread aparte cuando la
+    # llamada es asíncrona; este solo toma tiempos y suma contadores
+    run_inline = True
+
+    def __init__(self, metrics: Metrics):
+        self.metrics = metrics
+        self._starts: Dict[UUID, float] = {}
+        self._first_token_seen: Set[UUID] = set()
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._starts[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized: Any, prompts: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._starts[run_id] = time.perf_counter()
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        start_time = self._starts.get(run_id)
+        if start_time is None or not token or run_id in self._first_token_seen:
+            return
+        self._first_token_seen.add(run_id)
+        self.metrics.observe("llm_first_token", time.perf_counter() - start_time)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "llm_generate")
+        self.metrics.increment("llm_calls")
+        prompt_tokens, completion_tokens = token_usage(response)
+        if prompt_tokens:
+            self.metrics.increment("llm_tokens", prompt_tokens, kind="prompt")
+        if completion_tokens:
+            self.metrics.increment("llm_tokens", completion_tokens, kind="completion")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "llm_generate")
+        self.metrics.increment("llm_errors")
+
+    def on_retriever_start(self, serialized: Any, query: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._starts[run_id] = time.perf_counter()
+
+    def on_retriever_end(self, documents: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "retrieve")
+
+    def on_retriever_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "retrieve")
+        self.metrics.increment("retriever_errors")
+
+    def _finish(self, run_id: UUID, stage: str) -> None:
+        start_time = self._starts.pop(run_id, None)
+        self._first_token_seen.discard(run_id)
+        if start_time is not None:
+            self.metrics.observe(stage, time.perf_counter() - start_time)
+
+
+def token_usage(response: LLMResult) -> Tuple[int, int]:
+    """
+    Extrae los tokens de prompt y de respuesta de una llamada al LLM.
+
+    Usa usage_metadata de los mensajes (modelos de chat, también en
+    streaming) y, si no está, el token_usage de llm_output (OpenAI).
+
+    Args:
+        response: Resultado de la llamada
+
+    Returns:
+        Tupla (tokens de prompt, tokens de respuesta); (0, 0) si el modelo
+        no informa el uso
+    """
+    prompt_tokens = completion_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+    if prompt_tokens or completion_tokens:
+        return prompt_tokens, completion_tokens
+
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    return usage.get("prompt_tokens", 0) or 0, usage.get("completion_tokens", 0) or 0
@@ -0,0 +1,171 @@
+"""
+Fábrica de clientes LLM compartidos por todo el proceso.
+El router, el agente y los chains usan la misma instancia de ChatOpenAI por
+(modelo, temperatura) y un único pool de conexiones HTTP keep-alive, de modo
+que bajo carga no se paga un handshake TLS ni se crea un cliente por consulta.
+El backend se elige con LLM_BACKEND: "openai" o "fake" (stub local
+determinista de src/fake_llm.py, para benchmarks sin red).
+"""
+
+import logging
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from src.config import (
+    LLM_BACKEND,
+    LLM_CONNECT_TIMEOUT_SECONDS,
+    LLM_KEEPALIVE_EXPIRY_SECONDS,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_MAX_RETRIES,
+    LLM_MODEL,
+    LLM_TEMPERATURE,
+    LLM_TIMEOUT_SECONDS,
+    require_openai_api_key,
+)
+
+# httpx y langchain_openai se importan al crear el primer cliente
+if TYPE_CHECKING:
+    import httpx
+    from langchain_core.language_models.chat_models import BaseChatModel
+
+logger = logging.getLogger(__name__)
+
+# Backends soportados
+LLM_BACKENDS = ("openai", "fake")
+
+_lock = threading.RLock()  # Reentrante: la fábrica crea los clientes HTTP con el lock tomado
+_http_client: Optional["httpx.Client"] = None
+_async_http_client: Optional["httpx.AsyncClient"] = None
+_chat_models: Dict[Tuple, "BaseChatModel"] = {}
+
+
+def _pool_limits() -> "httpx.Limits":
+    import httpx
+
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+def _timeout() -> "httpx.Timeout":
+    import httpx
+
+    return httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS)
+
+
+def get_http_client() -> "httpx.Client":
+    """Cliente HTTP síncrono compartido (thread-safe, conexiones keep-alive)."""
+    global _http_client
+    if _http_client is None:
+        import httpx
+
+        with _lock:
+            if _http_client is None:
+                _http_client = httpx.Client(limits=_pool_limits(), timeout=_timeout())
+    return _http_client
+
+
+def get_async_http_client() -> "httpx.AsyncClient":
+    """
+    Cliente HTTP asíncrono compartido. Sus conexiones quedan ligadas al
+    event loop donde se usan por primera vez: pensado para un único loop por
+    proceso (el del servidor).
+    """
+    global _async_http_client
+    if _async_http_client is None:
+        import httpx
+
+        with _lock:
+            if _async_http_client is None:
+                _async_http_client = httpx.AsyncClient(
+                    limits=_pool_limits(), timeout=_timeout()
+                )
+    return _async_http_client
+
+
+def require_llm_backend() -> str:
+    """
+    Valida el backend configurado y sus credenciales.
+
+    Returns:
+        Nombre del backend
+
+    Raises:
+        ValueError: Si el backend es desconocido o falta la API key de OpenAI
+    """
+    if LLM_BACKEND not in LLM_BACKENDS:
+        raise ValueError(
+            f"Backend LLM desconocido: {LLM_BACKEND} (opciones: {LLM_BACKENDS})"
+        )
+    if LLM_BACKEND == "openai":
+        require_openai_api_key()
+    return LLM_BACKEND
+
+
+def get_chat_model(
+    model: str = LLM_MODEL, temperature: float = LLM_TEMPERATURE, **kwargs
+) -> "BaseChatModel":
+    """
+    Retorna el modelo de chat compartido para un modelo y temperatura.
+
+    Args:
+        model: Modelo de LLM
+        temperature: Temperatura
+        **kwargs: Parámetros adicionales del backend (forman parte de la clave)
+
+    Returns:
+        Instancia compartida (ChatOpenAI sobre el pool HTTP del proceso, o
+        el stub local con el backend "fake")
+    """
+    backend = require_llm_backend()
+    key = (backend, model, temperature, tuple(sorted(kwargs.items())))
+    chat_model = _chat_models.get(key)
+    if chat_model is None:
+        factory = _create_fake_model if backend == "fake" else _create_openai_model
+        with _lock:
+            chat_model = _chat_models.get(key)
+            if chat_model is None:
+                chat_model = factory(model, temperature, **kwargs)
+                _chat_models[key] = chat_model
+                logger.info(
+                    f"Cliente LLM creado: {model} (backend={backend}, temperature={temperature})"
+                )
+    return chat_model
+
+
+def _create_openai_model(model: str, temperature: float, **kwargs) -> "BaseChatModel":
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        max_retries=LLM_MAX_RETRIES,
+        timeout=_timeout(),
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        # Uso de tokens también en streaming (métricas de tokens)
+        stream_usage=True,
+        **kwargs,
+    )
+
+
+def _create_fake_model(model: str, temperature: float, **kwargs) -> "BaseChatModel":
+    # La temperatura no aplica: el stub es determinista
+    from src.fake_llm import FakeChatModel
+
+    return FakeChatModel(model_name=model, **kwargs)
+
+
+def reset_clients() -> None:
+    """Descarta los clientes compartidos y cierra el pool síncrono (tests, recargas)."""
+    global _http_client, _async_http_client
+    with _lock:
+        _chat_models.clear()
+        if _http_client is not None:
+            _http_client.close()
+        # El cliente async se cierra con aclose() desde su loop; se descarta
+        _http_client = None
+        _async_http_client = None
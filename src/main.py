@@ -4,13 +4,20 @@ Aplicación principal con interfaz de línea de comandos (CLI).
 
 import logging
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 # Agregar el directorio raíz al path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.agent import CustomerServiceAgent
-from src.config import LOG_LEVEL
+from src.config import LOG_LEVEL, PROJECT_ROOT
+
+# El agente (langchain, pandas, FAISS, torch) se importa recién en el modo
+# que lo necesita: `--help` y los errores de argumentos responden al instante
+if TYPE_CHECKING:
+    from src.agent import CustomerServiceAgent
 
 # Configurar logging
 logging.basicConfig(
@@ -75,7 +82,7 @@ def print_help():
     print(help_text)
 
 
-def print_stats(agent: CustomerServiceAgent):
+def print_stats(agent: "CustomerServiceAgent"):
     """Imprime estadísticas del sistema."""
     stats = agent.get_statistics()
 
@@ -91,7 +98,56 @@ Desglose por tipo:
   💬 Consultas generales:         {stats['general_queries']}
 
 Tasa de éxito: {stats['success_rate']:.1f}%
+"""
+
+    if "knowledge_cache" in stats:
+        cache = stats["knowledge_cache"]
+        stats_text += f"""
+Caché semántico (knowledge):
+  ✅ Hits: {cache['hits']}  ❌ Misses: {cache['misses']}  📈 Tasa de acierto: {cache['hit_rate']:.1f}%
+"""
+
+    if "routing_cache" in stats:
+        cache = stats["routing_cache"]
+        stats_text += f"""
+Caché de routing (LLM):
+  ✅ Hits: {cache['hits']}  ❌ Misses: {cache['misses']}  📈 Tasa de acierto: {cache['hit_rate']:.1f}%
+"""
+
+    if "accounts" in stats:
+        accounts = stats["accounts"]
+        stats_text += f"""
+Cuentas:
+  🗂️  Cargadas: {accounts['accounts']} ({accounts['backend']}, desde {accounts['loaded_from']})
+  🔄 Recargas: {accounts['reloads']}  ⚠️  Fallidas: {accounts['reload_failures']}  ⏳ Desactualizado: {accounts['staleness_seconds']:.0f}s
+"""
+
+    if stats["errors"]:
+        by_type = ", ".join(f"{kind}: {count:.0f}" for kind, count in stats["errors_by_type"].items())
+        stats_text += f"""
+Errores: {stats['errors']} ({by_type})
+"""
+
+    llm = stats["llm"]
+    if llm["calls"]:
+        stats_text += f"""
+LLM:
+  📞 Llamadas: {llm['calls']:.0f}  ⚠️  Errores: {llm['errors']:.0f}
+  🔤 Tokens: {llm['prompt_tokens']:.0f} de prompt, {llm['completion_tokens']:.0f} de respuesta
+"""
+
+    if stats["latency"]:
+        stats_text += f"""
+Latencia por etapa (ms):
+  {'Etapa':<16} {'n':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'máx':>9}
+"""
+        for stage, latency in stats["latency"].items():
+            stats_text += (
+                f"  {stage:<16} {latency['count']:>6} {latency['p50_ms']:>9.1f} "
+                f"{latency['p95_ms']:>9.1f} {latency['p99_ms']:>9.1f} {latency['max_ms']:>9.1f}\n"
+            )
 
+    stats_text += """
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """
     print(stats_text)
@@ -104,12 +160,13 @@ def clear_screen():
     os.system("cls" if os.name == "nt" else "clear")
 
 
+QUERY_TYPE_EMOJIS = {"balance": "💰", "knowledge": "📚", "general": "💬", "error": "❌"}
+
+
 def format_response(result: dict) -> str:
     """Formatea la respuesta para mejor visualización."""
-    emoji_map = {"balance": "💰", "knowledge": "📚", "general": "💬", "error": "❌"}
-
     query_type = result.get("query_type", "general")
-    emoji = emoji_map.get(query_type, "💬")
+    emoji = QUERY_TYPE_EMOJIS.get(query_type, "💬")
 
     output = f"\n{emoji} Tipo de consulta: {query_type.upper()}\n"
     output += "━" * 60 + "\n\n"
@@ -119,6 +176,36 @@ def format_response(result: dict) -> str:
     return output
 
 
+def print_streamed_response(agent: "CustomerServiceAgent", query: str) -> dict:
+    """
+    Procesa una consulta en streaming: imprime cada fragmento de la respuesta
+    apenas lo genera el LLM y, al final, el tipo de consulta.
+
+    Args:
+        agent: Agente que procesa la consulta
+        query: Consulta del cliente
+
+    Returns:
+        Resultado completo (el mismo diccionario que process_query)
+    """
+    print("\n" + "━" * 60 + "\n")
+    result = {}
+    for event in agent.stream_query(query):
+        if event["type"] == "token":
+            print(event["content"], end="", flush=True)
+        else:
+            result = event["result"]
+
+    # El LLM falló después de emitir parte de la respuesta
+    if "partial_response" in result:
+        print(f"\n\n⚠️  Respuesta interrumpida: {result['response']}")
+
+    query_type = result.get("query_type", "general")
+    print("\n\n" + "━" * 60)
+    print(f"{QUERY_TYPE_EMOJIS.get(query_type, '💬')} Tipo de consulta: {query_type.upper()}\n")
+    return result
+
+
 def interactive_mode():
     """Modo interactivo de la aplicación."""
     clear_screen()
@@ -128,6 +215,8 @@ def interactive_mode():
     print("⏳ Esto puede tardar unos segundos...\n")
 
     try:
+        from src.agent import CustomerServiceAgent
+
         agent = CustomerServiceAgent()
         print("✅ Sistema inicializado correctamente!\n")
         print_help()
@@ -162,12 +251,8 @@ def interactive_mode():
                         print("💡 Usa /help para ver los comandos disponibles")
                         continue
 
-                # Procesar consulta
-                print("\n🤔 Procesando tu consulta...\n")
-                result = agent.process_query(user_input)
-
-                # Mostrar respuesta
-                print(format_response(result))
+                # Procesar consulta mostrando la respuesta a medida que se genera
+                print_streamed_response(agent, user_input)
 
             except KeyboardInterrupt:
                 print("\n\n👋 Saliendo del sistema...")
@@ -183,31 +268,126 @@ def interactive_mode():
         sys.exit(1)
 
 
-def batch_mode(queries: list):
+def batch_mode(queries: list, workers: int = 1):
     """
     Modo batch para procesar múltiples consultas.
 
+    Con workers > 1 las consultas se reparten en un pool de threads de tamaño
+    acotado; los resultados se imprimen y retornan en el orden de entrada.
+
     Args:
         queries: Lista de consultas a procesar
+        workers: Número máximo de consultas procesadas en paralelo
     """
+    if workers < 1:
+        raise ValueError("El número de workers debe ser al menos 1")
+
     print("🔄 Modo batch activado")
-    print(f"📝 Procesando {len(queries)} consultas...\n")
+    print(f"📝 Procesando {len(queries)} consultas con {workers} worker(s)...\n")
+
+    from src.agent import CustomerServiceAgent
 
     agent = CustomerServiceAgent()
     results = []
 
-    for i, query in enumerate(queries, 1):
-        print(f"[{i}/{len(queries)}] Procesando: {query}")
-        result = agent.process_query(query)
-        results.append({"query": query, "result": result})
-        print(format_response(result))
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # map() preserva el orden de entrada aunque las consultas terminen desordenadas
+        for i, (query, result) in enumerate(
+            zip(queries, executor.map(agent.process_query, queries)), 1
+        ):
+            print(f"[{i}/{len(queries)}] Procesada: {query}")
+            results.append({"query": query, "result": result})
+            print(format_response(result))
+    elapsed_time = time.perf_counter() - start_time
 
     print("\n✅ Procesamiento batch completado")
+    if elapsed_time > 0:
+        print(
+            f"⏱️  {len(queries)} consultas en {elapsed_time:.2f}s "
+            f"({len(queries) / elapsed_time:.2f} consultas/s)"
+        )
     print_stats(agent)
 
     return results
 
 
+# Script ejecutado en un proceso aparte con `python -X importtime`: arranca el
+# agente completo (incluidos los imports diferidos) y reporta los tiempos
+_STARTUP_PROFILE_SCRIPT = """
+import json, logging, sys, time
+sys.path.insert(0, {root!r})
+logging.disable(logging.CRITICAL)
+start_time = time.perf_counter()
+from src.agent import CustomerServiceAgent
+import_time = time.perf_counter() - start_time
+start_time = time.perf_counter()
+agent = CustomerServiceAgent()
+init_time = time.perf_counter() - start_time
+error = None
+try:
+    agent.warmup()
+except Exception as e:
+    error = str(e)
+print(json.dumps({{"import": import_time, "agent": init_time,
+                  "components": agent.init_times, "error": error}}))
+"""
+
+
+def profile_startup(top: int = 15) -> None:
+    """
+    Imprime el desglose del arranque: tiempo de import por paquete (salida
+    de `python -X importtime` agregada por paquete raíz) y tiempo de
+    inicialización de cada componente del agente.
+
+    Args:
+        top: Número de paquetes a mostrar
+    """
+    import json
+    import subprocess
+    from collections import defaultdict
+
+    print("⏱️  Perfilando el arranque (proceso aparte con -X importtime)...\n")
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            _STARTUP_PROFILE_SCRIPT.format(root=str(PROJECT_ROOT)),
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    # Líneas "import time: <self us> | <cumulative us> | <módulo>"
+    self_times = defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, module = line[len("import time:") :].split("|")
+        self_times[module.strip().split(".")[0]] += int(self_us)
+
+    if result.returncode != 0 or not result.stdout.strip():
+        print(f"❌ Error al perfilar el arranque:\n{result.stderr[-2000:]}")
+        sys.exit(1)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+
+    total_imports = sum(self_times.values()) / 1000
+    print(f"📦 Imports por paquete (top {top}, self time agregado):")
+    for package, self_us in sorted(self_times.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {package:<32} {self_us / 1000:>9.1f} ms")
+    print(f"  {'TOTAL':<32} {total_imports:>9.1f} ms\n")
+
+    print("🚀 Inicialización:")
+    print(f"  {'import src.agent':<32} {timings['import'] * 1000:>9.1f} ms")
+    print(f"  {'CustomerServiceAgent()':<32} {timings['agent'] * 1000:>9.1f} ms")
+    for name, seconds in timings["components"].items():
+        print(f"  {name:<32} {seconds * 1000:>9.1f} ms")
+    if timings["error"]:
+        print(f"\n⚠️  Warmup incompleto: {timings['error']}")
+
+
 def main():
     """Función principal."""
     import argparse
@@ -219,21 +399,41 @@ def main():
     parser.add_argument(
         "--batch", "-b", type=str, help="Archivo con consultas (una por línea)"
     )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help="Consultas procesadas en paralelo en modo batch (default: 1)",
+    )
     parser.add_argument(
         "--verbose", "-v", action="store_true", help="Modo verbose (más logs)"
     )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Muestra el tiempo de import por paquete y de inicialización, y sale",
+    )
 
     args = parser.parse_args()
 
+    if args.workers < 1:
+        parser.error("--workers debe ser al menos 1")
+
     # Ajustar nivel de logging
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
+    if args.profile_startup:
+        profile_startup()
+        return
+
     # Modo consulta única
     if args.query:
+        from src.agent import CustomerServiceAgent
+
         agent = CustomerServiceAgent()
-        result = agent.process_query(args.query)
-        print(format_response(result))
+        print_streamed_response(agent, args.query)
         return
 
     # Modo batch
@@ -241,7 +441,7 @@ def main():
         try:
             with open(args.batch, "r", encoding="utf-8") as f:
                 queries = [line.strip() for line in f if line.strip()]
-            batch_mode(queries)
+            batch_mode(queries, workers=args.workers)
         except FileNotFoundError:
             print(f"❌ Archivo no encontrado: {args.batch}")
             sys.exit(1)
@@ -0,0 +1,295 @@
+"""
+Métricas del agente: latencia por etapa, tokens del LLM y errores.
+
+Los histogramas usan buckets fijos en lugar de guardar cada muestra: memoria
+constante, percentiles aproximados por interpolación dentro del bucket y
+exportables tal cual en el formato de texto de Prometheus.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.config import METRICS_LATENCY_BUCKETS, METRICS_PREFIX
+
+# Etapas del pipeline con histograma de latencia
+STAGES = (
+    "route",
+    "extract_cedula",
+    "csv_lookup",
+    "embed",
+    "retrieve",
+    "llm_generate",
+    "llm_first_token",
+    "query",
+    "account_reload",
+)
+
+# Descripción de los contadores (líneas HELP de Prometheus)
+COUNTER_HELP = {
+    "account_reload_errors": "Recargas de cuentas que fallaron",
+    "errors": "Consultas respondidas con error, por tipo",
+    "llm_calls": "Llamadas al LLM completadas",
+    "llm_errors": "Llamadas al LLM que fallaron",
+    "llm_tokens": "Tokens del LLM (prompt / completion)",
+    "retriever_errors": "Búsquedas en la base de conocimientos que fallaron",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class LatencyHistogram:
+    """Histograma de latencias (segundos) con buckets acumulables."""
+
+    def __init__(self, buckets: Sequence[float] = METRICS_LATENCY_BUCKETS):
+        """
+        Inicializa el histograma.
+
+        Args:
+            buckets: Límites superiores de los buckets, en segundos
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # El último es +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Registra una muestra."""
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estima un percentil interpolando linealmente dentro del bucket.
+
+        Args:
+            q: Percentil entre 0 y 1
+
+        Returns:
+            Latencia estimada en segundos (0 si no hay muestras)
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                estimate = lower + (upper - lower) * (rank - cumulative) / count
+                return min(estimate, self.max)
+            cumulative += count
+        return self.max
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Resume el histograma.
+
+        Returns:
+            Diccionario con count, media, p50, p95, p99 y máximo (en ms)
+        """
+        return {
+            "count": self.count,
+            "mean_ms": self.sum / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.quantile(0.50) * 1000,
+            "p95_ms": self.quantile(0.95) * 1000,
+            "p99_ms": self.quantile(0.99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class Metrics:
+    """Registro thread-safe de latencias por etapa y contadores con etiquetas."""
+
+    def __init__(
+        self,
+        buckets: Sequence[float] = METRICS_LATENCY_BUCKETS,
+        prefix: str = METRICS_PREFIX,
+    ):
+        """
+        Inicializa el registro.
+
+        Args:
+            buckets: Límites superiores de los buckets de latencia, en segundos
+            prefix: Prefijo de los nombres en el formato de Prometheus
+        """
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._llm_config: Optional[dict] = None
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """
+        Registra la duración de una etapa.
+
+        Args:
+            stage: Nombre de la etapa (ver STAGES)
+            seconds: Duración en segundos
+        """
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """Mide la duración del bloque (también si termina con una excepción)."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start_time)
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        """
+        Incrementa un contador.
+
+        Args:
+            name: Nombre del contador (ver COUNTER_HELP)
+            amount: Cantidad a sumar
+            **labels: Etiquetas del contador (ej: query_type="balance")
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            values = self._counters.setdefault(name, {})
+            values[key] = values.get(key, 0) + amount
+
+    def get_counter(self, name: str, **labels: str) -> float:
+        """
+        Obtiene el valor de un contador, sumando las etiquetas no indicadas.
+
+        Args:
+            name: Nombre del contador
+            **labels: Etiquetas que deben coincidir
+
+        Returns:
+            Valor acumulado (0 si nunca se incrementó)
+        """
+        wanted = set(labels.items())
+        with self._lock:
+            values = self._counters.get(name, {})
+            return sum(value for key, value in values.items() if wanted <= set(key))
+
+    def get_counter_values(self, name: str, label: str) -> Dict[str, float]:
+        """
+        Desglosa un contador por una de sus etiquetas.
+
+        Args:
+            name: Nombre del contador
+            label: Etiqueta por la que agrupar
+
+        Returns:
+            Diccionario valor de la etiqueta -> total
+        """
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for key, value in self._counters.get(name, {}).items():
+                label_value = dict(key).get(label, "")
+                totals[label_value] = totals.get(label_value, 0) + value
+        return totals
+
+    def get_latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Resume los histogramas de latencia.
+
+        Returns:
+            Diccionario etapa -> count, media, p50, p95, p99 y máximo (ms),
+            en el orden de STAGES
+        """
+        with self._lock:
+            return {
+                stage: self._histograms[stage].get_stats()
+                for stage in sorted(self._histograms, key=_stage_order)
+            }
+
+    def llm_config(self) -> dict:
+        """
+        Config de LangChain que registra las llamadas al LLM y al retriever
+        (latencia, tiempo al primer token, tokens y errores). Se crea en el
+        primer uso: el handler importa langchain_core.
+        """
+        if self._llm_config is None:
+            from src.llm_callbacks import MetricsCallbackHandler
+
+            self._llm_config = {"callbacks": [MetricsCallbackHandler(self)]}
+        return self._llm_config
+
+    def reset(self) -> None:
+        """Descarta todas las muestras y contadores."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def to_prometheus(
+        self, extra: Iterable[Tuple[str, str, str, Dict[Labels, float]]] = ()
+    ) -> str:
+        """
+        Exporta las métricas en el formato de texto de Prometheus (0.0.4).
+
+        Args:
+            extra: Métricas adicionales como (nombre, tipo, descripción,
+                {etiquetas: valor}), ej. gauges calculados por el llamador
+
+        Returns:
+            Texto con una familia de métricas por nombre
+        """
+        lines: List[str] = []
+        with self._lock:
+            histograms = {stage: self._histograms[stage] for stage in self._histograms}
+            counters = {name: dict(values) for name, values in self._counters.items()}
+
+        if histograms:
+            name = f"{self.prefix}_stage_latency_seconds"
+            lines += [
+                f"# HELP {name} Latencia por etapa del pipeline",
+                f"# TYPE {name} histogram",
+            ]
+            for stage in sorted(histograms, key=_stage_order):
+                histogram = histograms[stage]
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum!r}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+
+        families = [
+            (f"{self.prefix}_{counter}_total", "counter", COUNTER_HELP.get(counter, counter), values)
+            for counter, values in sorted(counters.items())
+        ]
+        families += [(f"{self.prefix}_{name}", *rest) for name, *rest in extra]
+        for name, metric_type, description, values in families:
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} {metric_type}"]
+            for labels, value in sorted(values.items()):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _stage_order(stage: str) -> Tuple[int, str]:
+    """Orden de presentación: primero las etapas conocidas, en orden del pipeline."""
+    return (STAGES.index(stage) if stage in STAGES else len(STAGES), stage)
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,143 @@
+"""
+Docstore apto para memory-mapping.
+Guarda los documentos del índice FAISS en un archivo binario con offsets
+(en lugar de un pickle), de modo que varios procesos pueden abrirlo con mmap
+y compartir las páginas a través del caché del sistema operativo: cargar el
+índice no copia ni deserializa los documentos.
+"""
+
+import json
+import logging
+import mmap
+from pathlib import Path
+from typing import Dict, List, Union
+
+import faiss
+import numpy as np
+from langchain_community.docstore.base import Docstore
+from langchain_community.vectorstores.faiss import FAISS
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# Archivos guardados junto a index.faiss
+DOCSTORE_DATA_FILENAME = "docstore.bin"  # Documentos JSON concatenados (UTF-8)
+DOCSTORE_OFFSETS_FILENAME = "docstore.offsets.npy"  # Offsets int64 por fila del índice
+DOCSTORE_IDS_FILENAME = "docstore.ids.json"  # ID de cada fila del índice
+FAISS_INDEX_FILENAME = "index.faiss"
+
+# Memory-mapping del índice (IO_FLAG_MMAP_IFC mapea también los índices planos)
+MMAP_READ_FLAGS = (
+    faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | faiss.IO_FLAG_READ_ONLY
+)
+
+
+class MmapDocstore(Docstore):
+    """Docstore de solo lectura respaldado por un archivo mapeado en memoria."""
+
+    def __init__(self, path: Path):
+        """
+        Abre el docstore guardado en un directorio de índice.
+
+        Args:
+            path: Directorio con los archivos del docstore
+        """
+        path = Path(path)
+        with open(path / DOCSTORE_IDS_FILENAME, "r", encoding="utf-8") as f:
+            self.ids: List[str] = json.load(f)
+        self._positions: Dict[str, int] = {
+            doc_id: position for position, doc_id in enumerate(self.ids)
+        }
+        self._offsets = np.load(path / DOCSTORE_OFFSETS_FILENAME, mmap_mode="r")
+
+        with open(path / DOCSTORE_DATA_FILENAME, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def search(self, search: str) -> Union[str, Document]:
+        """
+        Busca un documento por ID.
+
+        Args:
+            search: ID del documento
+
+        Returns:
+            Documento, o un mensaje si no existe (mismo contrato que InMemoryDocstore)
+        """
+        position = self._positions.get(search)
+        if position is None:
+            return f"ID {search} not found."
+
+        start, end = self._offsets[position], self._offsets[position + 1]
+        record = json.loads(self._data[start:end].decode("utf-8"))
+        return Document(
+            id=search, page_content=record["page_content"], metadata=record["metadata"]
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def write_mmap_docstore(vectorstore: FAISS, path: Path) -> None:
+    """
+    Escribe los documentos de un vectorstore en formato mapeable, en el orden
+    de las filas del índice FAISS.
+
+    Args:
+        vectorstore: Vectorstore en memoria
+        path: Directorio del índice
+    """
+    path = Path(path)
+    ids = [
+        vectorstore.index_to_docstore_id[position]
+        for position in range(len(vectorstore.index_to_docstore_id))
+    ]
+
+    offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+    with open(path / DOCSTORE_DATA_FILENAME, "wb") as f:
+        for position, doc_id in enumerate(ids):
+            doc = vectorstore.docstore.search(doc_id)
+            record = json.dumps(
+                {"page_content": doc.page_content, "metadata": doc.metadata},
+                ensure_ascii=False,
+            ).encode("utf-8")
+            f.write(record)
+            offsets[position + 1] = offsets[position] + len(record)
+
+    np.save(path / DOCSTORE_OFFSETS_FILENAME, offsets)
+    with open(path / DOCSTORE_IDS_FILENAME, "w", encoding="utf-8") as f:
+        json.dump(ids, f, ensure_ascii=False)
+
+
+def has_mmap_docstore(path: Path) -> bool:
+    """Indica si un directorio de índice incluye el docstore mapeable."""
+    path = Path(path)
+    return all(
+        (path / filename).exists()
+        for filename in (DOCSTORE_DATA_FILENAME, DOCSTORE_OFFSETS_FILENAME, DOCSTORE_IDS_FILENAME)
+    )
+
+
+def load_mmap_vectorstore(path: Path, embeddings) -> FAISS:
+    """
+    Abre un índice FAISS y su docstore con memory-mapping (solo lectura).
+
+    Los vectores y los documentos quedan en el caché de páginas del sistema
+    operativo y se comparten entre procesos; para modificar el índice hay que
+    cargarlo en memoria con FAISS.load_local.
+
+    Args:
+        path: Directorio del índice
+        embeddings: Embeddings para vectorizar las consultas
+
+    Returns:
+        Vectorstore de solo lectura
+    """
+    path = Path(path)
+    index = faiss.read_index(str(path / FAISS_INDEX_FILENAME), MMAP_READ_FLAGS)
+    docstore = MmapDocstore(path)
+    if index.ntotal != len(docstore):
+        raise ValueError(
+            f"Docstore desincronizado en {path}: {len(docstore)} documentos "
+            f"para {index.ntotal} vectores"
+        )
+    return FAISS(embeddings, index, docstore, dict(enumerate(docstore.ids)))
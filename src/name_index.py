@@ -0,0 +1,267 @@
+"""
+Índice de búsqueda de cuentas por nombre (subcadena y prefijo de palabra).
+
+Los nombres se normalizan una sola vez al construir el índice (minúsculas,
+sin acentos, espacios simples) y se separan en palabras. El índice tiene
+dos niveles:
+
+- Vocabulario: las palabras distintas, ordenadas (un prefijo es un rango
+  contiguo, con búsqueda binaria) y con un índice invertido de trigramas
+  (trigrama -> palabras que lo contienen) para las subcadenas.
+- Postings: palabra -> filas que la contienen, ordenadas, y fila -> sus
+  palabras en orden, ambos en arreglos CSR.
+
+Una consulta de una palabra se resuelve en el vocabulario (decenas de miles
+de palabras aunque haya millones de nombres) y une las filas de las palabras
+que coinciden. Con varias palabras se intersectan las filas de cada una y se
+exige que aparezcan consecutivas y en orden. Los resultados salen en orden
+de fila, con límite y offset para paginar.
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Marcas diacríticas combinantes que deja la descomposición NFKD ("é" -> "e" + ◌́)
+_COMBINING_MARKS = re.compile(r"[\u0300-\u036f]")
+_SPACES = re.compile(r"[^\S\n]+")
+
+# Largo de los n-gramas del vocabulario
+NGRAM = 3
+
+# Token que separa las filas al partir todos los nombres juntos
+_ROW_MARKER = "\x01"
+
+
+def fold_text(text: str) -> str:
+    """
+    Normaliza texto para búsqueda: minúsculas, sin acentos y con los espacios
+    (salvo saltos de línea) reducidos a uno.
+
+    Args:
+        text: Texto a normalizar (puede tener varias líneas)
+
+    Returns:
+        Texto normalizado ("José  PÉREZ" -> "jose perez")
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return _SPACES.sub(" ", _COMBINING_MARKS.sub("", decomposed))
+
+
+class NameSearchIndex:
+    """Índice de nombres normalizados para búsquedas por subcadena y prefijo."""
+
+    def __init__(self, names: Sequence[str]):
+        """
+        Construye el índice.
+
+        Args:
+            names: Nombre de cada fila, en orden de fila
+        """
+        self.size = len(names)
+
+        # Un único split sobre todos los nombres (millones de listas pequeñas
+        # cuestan más en el recolector de basura que el split en sí): un
+        # token marcador separa las filas
+        joined = f" {_ROW_MARKER} ".join(name.replace(_ROW_MARKER, " ") for name in names)
+        raw_ids, raw_words = pd.factorize(np.array(joined.lower().split(), dtype=object))
+        del joined
+        is_marker = np.isin(raw_ids, np.flatnonzero(raw_words == _ROW_MARKER))
+        rows = np.cumsum(is_marker, dtype=np.int64)[~is_marker].astype(np.int32)
+        raw_ids = raw_ids[~is_marker]
+        del is_marker
+
+        # Las palabras distintas son pocas: se normalizan una vez cada una
+        folded = ["".join(fold_text(word).split()) for word in raw_words]
+        folded_ids, vocabulary = pd.factorize(np.array(folded, dtype=object), sort=True)
+        word_ids = folded_ids[raw_ids]
+        keep = np.array([word != "" for word in folded], dtype=bool)[raw_ids]
+        word_ids, rows = word_ids[keep], rows[keep]
+        del raw_ids, keep, folded, folded_ids
+        self.vocabulary: List[str] = list(vocabulary)
+
+        # Fila -> palabras en orden, para verificar frases
+        self._row_words = word_ids.astype(np.int32)
+        self._row_offsets = np.zeros(self.size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=self.size), out=self._row_offsets[1:])
+
+        # Palabra -> filas ascendentes (una vez aunque se repita en el nombre)
+        order = np.argsort(word_ids, kind="stable")
+        word_ids, rows = word_ids[order], rows[order]
+        del order
+        unique = np.ones(len(rows), dtype=bool)
+        unique[1:] = (word_ids[1:] != word_ids[:-1]) | (rows[1:] != rows[:-1])
+        word_ids, self._posting_rows = word_ids[unique], rows[unique]
+        self._posting_offsets = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(word_ids, minlength=len(self.vocabulary)), out=self._posting_offsets[1:])
+
+        # Trigramas del vocabulario -> ids de palabra (ascendentes)
+        grams: Dict[str, List[int]] = {}
+        for word_id, word in enumerate(self.vocabulary):
+            for gram in {word[i:i + NGRAM] for i in range(len(word) - NGRAM + 1)}:
+                grams.setdefault(gram, []).append(word_id)
+        self._ngrams = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in grams.items()}
+
+        # Vocabulario concatenado, para las subcadenas más cortas que un trigrama
+        self._vocabulary_text = "\n".join(self.vocabulary) + "\n"
+        self._vocabulary_starts = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        np.cumsum([len(word) + 1 for word in self.vocabulary], out=self._vocabulary_starts[1:])
+
+    def __len__(self) -> int:
+        return self.size
+
+    def search(
+        self,
+        query: str,
+        prefix: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> np.ndarray:
+        """
+        Busca filas cuyo nombre normalizado contiene la consulta normalizada.
+
+        Args:
+            query: Texto a buscar (sin distinguir mayúsculas ni acentos)
+            prefix: Exigir que la consulta empiece al inicio de una palabra
+                del nombre ("gonz" encuentra "Ana González", "onz" no)
+            limit: Filas como máximo (None = todas)
+            offset: Filas coincidentes a saltar antes de la primera (paginación)
+
+        Returns:
+            Filas coincidentes en orden ascendente (int64)
+        """
+        tokens = fold_text(query).split()
+        if not tokens:
+            return np.arange(self.size, dtype=np.int64)[offset:_end(offset, limit)]
+
+        if len(tokens) == 1:
+            words = self._prefix_words(tokens[0]) if prefix else self._words_containing(tokens[0])
+            return self._rows_for(words)[offset:_end(offset, limit)].astype(np.int64)
+
+        # Frase: palabras consecutivas del nombre donde la primera termina
+        # con el primer token (o es igual, con prefix: la consulta empieza
+        # al inicio de esa palabra y sigue otra después), las intermedias
+        # son iguales y la última empieza con el último token
+        first = tokens[0]
+        if prefix:
+            first_words = self._exact_words(first)
+        else:
+            first_words = np.asarray(
+                [word_id for word_id in self._words_containing(first) if self.vocabulary[word_id].endswith(first)],
+                dtype=np.int64,
+            )
+        constraints = [first_words]
+        constraints += [self._exact_words(token) for token in tokens[1:-1]]
+        constraints.append(self._prefix_words(tokens[-1]))
+
+        # Filas con todas las palabras (de la condición más selectiva a la
+        # menos), y luego se exige que estén consecutivas y en orden
+        candidates = None
+        for words in sorted(constraints, key=self._posting_count):
+            rows = self._rows_for(words)
+            candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+            if len(candidates) == 0:
+                return np.zeros(0, dtype=np.int64)
+        return self._phrase_rows(candidates, constraints)[offset:_end(offset, limit)]
+
+    def _phrase_rows(self, candidates: np.ndarray, constraints: List[np.ndarray]) -> np.ndarray:
+        """Filas candidatas con una palabra de cada condición, consecutivas y en orden."""
+        starts = self._row_offsets[candidates]
+        ends = self._row_offsets[candidates + 1]
+        lengths = ends - starts
+        block_starts = np.cumsum(lengths) - lengths
+
+        # Posición de cada palabra de las filas candidatas en _row_words
+        positions = np.repeat(starts - block_starts, lengths) + np.arange(int(lengths.sum()))
+        row_ends = np.repeat(ends, lengths)
+        matches = np.ones(len(positions), dtype=bool)
+        for i, words in enumerate(constraints):
+            shifted = positions + i
+            inside = matches & (shifted < row_ends)
+            matches[:] = False
+            matches[inside] = np.isin(self._row_words[shifted[inside]], words)
+        return np.unique(np.repeat(candidates, lengths)[matches]).astype(np.int64)
+
+    def _posting_count(self, word_ids: np.ndarray) -> int:
+        """Total de postings de las palabras (cota de sus filas, sin materializarlas)."""
+        offsets = self._posting_offsets
+        return int((offsets[word_ids + 1] - offsets[word_ids]).sum())
+
+    def _exact_words(self, token: str) -> np.ndarray:
+        """Id de la palabra igual al token (vacío si no está en el vocabulario)."""
+        position = bisect_left(self.vocabulary, token)
+        if position < len(self.vocabulary) and self.vocabulary[position] == token:
+            return np.array([position], dtype=np.int64)
+        return np.zeros(0, dtype=np.int64)
+
+    def _prefix_words(self, token: str) -> np.ndarray:
+        """Ids de las palabras que empiezan con el token (un rango del vocabulario ordenado)."""
+        start = bisect_left(self.vocabulary, token)
+        end = bisect_left(self.vocabulary, token + "\U0010ffff", lo=start)
+        return np.arange(start, end, dtype=np.int64)
+
+    def _words_containing(self, token: str) -> np.ndarray:
+        """Ids de las palabras que contienen el token."""
+        if len(token) < NGRAM:
+            # Token corto: búsqueda literal sobre el vocabulario concatenado
+            ids = []
+            position = self._vocabulary_text.find(token)
+            while position != -1:
+                word_id = int(self._vocabulary_starts.searchsorted(position, side="right")) - 1
+                ids.append(word_id)
+                position = self._vocabulary_text.find(token, int(self._vocabulary_starts[word_id + 1]))
+            return np.asarray(ids, dtype=np.int64)
+
+        postings = []
+        for i in range(len(token) - NGRAM + 1):
+            ids = self._ngrams.get(token[i:i + NGRAM])
+            if ids is None:
+                return np.zeros(0, dtype=np.int64)
+            postings.append(ids)
+        postings.sort(key=len)
+        candidates = postings[0]
+        for ids in postings[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+
+        # Un trigrama exacto no necesita verificación; más largos, sí
+        if len(token) == NGRAM:
+            return candidates.astype(np.int64)
+        return np.asarray(
+            [word_id for word_id in candidates if token in self.vocabulary[word_id]], dtype=np.int64
+        )
+
+    def _rows_for(self, word_ids: Sequence[int]) -> np.ndarray:
+        """Filas (ascendentes, sin repetir) que contienen alguna de las palabras."""
+        offsets = self._posting_offsets
+        if len(word_ids) == 1:
+            word_id = word_ids[0]
+            return self._posting_rows[offsets[word_id]:offsets[word_id + 1]]
+
+        slices = [self._posting_rows[offsets[word_id]:offsets[word_id + 1]] for word_id in word_ids]
+        total = sum(len(rows) for rows in slices)
+        if total == 0:
+            return np.zeros(0, dtype=np.int32)
+        if total > self.size // 32:
+            # Muchas filas: marcar en una máscara es más barato que ordenar
+            mask = np.zeros(self.size, dtype=bool)
+            for rows in slices:
+                mask[rows] = True
+            return np.flatnonzero(mask).astype(np.int32)
+        return np.unique(np.concatenate(slices))
+
+    def memory_bytes(self) -> int:
+        """Memoria aproximada del índice, en bytes."""
+        total = self._row_words.nbytes + self._row_offsets.nbytes
+        total += self._posting_rows.nbytes + self._posting_offsets.nbytes
+        total += sum(len(word) + 49 for word in self.vocabulary) + 8 * len(self.vocabulary)
+        total += sum(ids.nbytes + 100 for ids in self._ngrams.values())
+        total += len(self._vocabulary_text) + self._vocabulary_starts.nbytes
+        return total
+
+
+def _end(offset: int, limit: Optional[int]) -> Optional[int]:
+    return None if limit is None else offset + limit
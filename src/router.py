@@ -5,11 +5,21 @@ Determina qué tipo de herramienta usar para responder cada consulta.
 
 import logging
 import re
+import threading
 from enum import Enum
-from typing import Dict
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import PromptTemplate
-from src.config import LLM_MODEL, LLM_TEMPERATURE
+from typing import TYPE_CHECKING, Dict, NamedTuple, Optional
+from src.config import (
+    LLM_MODEL,
+    LLM_TEMPERATURE,
+    ROUTING_CACHE_ENABLED,
+)
+from src.llm_client import get_chat_model
+from src.routing_cache import RoutingCache, normalize_query
+
+if TYPE_CHECKING:
+    from langchain_core.prompts import PromptTemplate
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from src.metrics import Metrics
 
 logger = logging.getLogger(__name__)
 
@@ -22,24 +32,116 @@ class QueryType(Enum):
     GENERAL = "general"  # Pregunta general para el LLM
 
 
+class RuleMatch(NamedTuple):
+    """Resultado de aplicar la tabla de routing a una consulta."""
+
+    query_type: Optional[QueryType]
+    cedula: Optional[str]
+
+
+# Patrones de la tabla de routing (se evalúan sobre la consulta en minúsculas)
+BALANCE_PATTERNS = [
+    r"balance",
+    r"saldo",
+    r"cuanto.*dinero",
+    r"cuanto.*tengo",
+    r"estado.*cuenta",
+    r"consultar.*cuenta",
+    r"cedula.*v-\d+",
+    r"cédula.*v-\d+",
+]
+
+KNOWLEDGE_PATTERNS = [
+    r"como.*abrir.*cuenta",
+    r"como.*solicitar.*tarjeta",
+    r"como.*transferir",
+    r"como.*hacer.*transferencia",
+    r"requisitos.*para",
+    r"informacion.*sobre",
+    r"información.*sobre",
+    r"que.*necesito.*para",
+    r"pasos.*para",
+    r"procedimiento",
+    r"tarjeta.*credito",
+    r"tarjeta.*crédito",
+    r"cuenta.*ahorro",
+]
+
+
+# Tabla de routing precompilada: una alternación por categoría, evaluadas en
+# orden de prioridad. En CPython, varias búsquedas sobre alternaciones
+# compiladas resultan más rápidas que una única regex con lookaheads por
+# categoría, y conservan la prioridad entre categorías.
+_BALANCE_REGEX = re.compile("|".join(BALANCE_PATTERNS))
+_KNOWLEDGE_REGEX = re.compile("|".join(KNOWLEDGE_PATTERNS))
+_CEDULA_V_REGEX = re.compile(r"v-(\d{7,8})")
+_CEDULA_WORD_REGEX = re.compile(r"c[eé]dula\s*(\d{7,8})")
+
+
 class QueryRouter:
     """Router inteligente para clasificar y enrutar consultas."""
 
-    def __init__(self, llm_model: str = LLM_MODEL, temperature: float = 0.0):
+    def __init__(
+        self,
+        llm_model: str = LLM_MODEL,
+        temperature: float = 0.0,
+        intent_classifier=None,
+        metrics: Optional["Metrics"] = None,
+    ):
         """
         Inicializa el router de consultas.
 
         Args:
             llm_model: Modelo de LLM a usar
             temperature: Temperatura para el LLM (0 para determinista)
+            intent_classifier: Clasificador local opcional (EmbeddingIntentClassifier)
+                que se consulta antes de recurrir al LLM
+            metrics: Registro de métricas al que reportar las llamadas al LLM
         """
-        self.llm = ChatOpenAI(model=llm_model, temperature=temperature)
-        self._setup_routing_prompt()
+        # El cliente del LLM (y el import de langchain_openai) se crea recién
+        # cuando una consulta no se resuelve por reglas, caché ni clasificador
+        self.llm_model = llm_model
+        self.temperature = temperature
+        self._llm: Optional["BaseChatModel"] = None
+        self._llm_lock = threading.Lock()
+        self.intent_classifier = intent_classifier
+        self.metrics = metrics
+        self.cache: Optional[RoutingCache] = (
+            RoutingCache() if ROUTING_CACHE_ENABLED else None
+        )
+        self._routing_prompt: Optional["PromptTemplate"] = None
         logger.info("QueryRouter inicializado")
 
-    def _setup_routing_prompt(self) -> None:
+    @property
+    def llm(self) -> "BaseChatModel":
+        """Cliente del LLM de clasificación (se crea en el primer uso)."""
+        if self._llm is None:
+            with self._llm_lock:
+                if self._llm is None:
+                    self._llm = get_chat_model(self.llm_model, self.temperature)
+        return self._llm
+
+    @llm.setter
+    def llm(self, value: "BaseChatModel") -> None:
+        self._llm = value
+
+    @property
+    def routing_prompt(self) -> "PromptTemplate":
+        """
+        Prompt de clasificación. Se crea en el primer uso: importar
+        langchain_core.prompts arrastra langchain_core.language_models (y con
+        él transformers, si está instalado). Construirlo dos veces en threads
+        concurrentes es inofensivo.
+        """
+        if self._routing_prompt is None:
+            self._routing_prompt = self._build_routing_prompt()
+        return self._routing_prompt
+
+    def _build_routing_prompt(self) -> "PromptTemplate":
         """Configura el prompt para clasificación de consultas."""
-        self.routing_prompt = PromptTemplate(
+        from langchain_core.prompts import PromptTemplate
+
+        return PromptTemplate(
             input_variables=["query"],
             template="""Eres un asistente bancario que clasifica consultas de clientes.
 
@@ -73,38 +175,41 @@ Responde ÚNICAMENTE con una palabra: "balance", "knowledge" o "general"
 Tu respuesta:""",
         )
 
-    def classify_query(self, query: str) -> QueryType:
+    def classify_query(self, query: str, rules: Optional[RuleMatch] = None) -> QueryType:
         """
         Clasifica una consulta en uno de los tipos definidos.
 
         Args:
             query: Consulta del usuario
+            rules: Resultado de analyze_query para la consulta, si ya se
+                calculó (evita recorrer la tabla de routing otra vez)
 
         Returns:
             Tipo de consulta (QueryType)
         """
         # Primero intentar clasificación basada en reglas (más rápido)
-        rule_based = self._rule_based_classification(query)
+        rule_based = rules.query_type if rules else self._rule_based_classification(query)
         if rule_based:
             logger.info(f"Clasificación basada en reglas: {rule_based.value}")
             return rule_based
 
-        # Si no hay match en reglas, usar LLM
+        # Luego consultar el caché de clasificaciones previas del LLM
+        cached = self._get_cached_classification(query)
+        if cached:
+            return cached
+
+        # Luego el clasificador local por embeddings (si la confianza alcanza)
+        local = self._local_classification(query)
+        if local:
+            return local
+
+        # Si no hay match en reglas, caché ni clasificador local, usar LLM
         logger.info("Usando LLM para clasificación")
         try:
             formatted_prompt = self.routing_prompt.format(query=query)
-            response = self.llm.invoke(formatted_prompt)
-            classification = response.content.strip().lower()
-
-            # Mapear respuesta a QueryType
-            if "balance" in classification:
-                query_type = QueryType.BALANCE
-            elif "knowledge" in classification:
-                query_type = QueryType.KNOWLEDGE
-            else:
-                query_type = QueryType.GENERAL
-
-            logger.info(f"Consulta clasificada como: {query_type.value}")
+            response = self.llm.invoke(formatted_prompt, config=self._llm_config())
+            query_type = self._parse_llm_classification(response.content)
+            self._cache_classification(query, query_type)
             return query_type
 
         except Exception as e:
@@ -112,60 +217,139 @@ Tu respuesta:""",
             # Default a GENERAL en caso de error
             return QueryType.GENERAL
 
-    def _rule_based_classification(self, query: str) -> QueryType | None:
+    async def aclassify_query(self, query: str, rules: Optional[RuleMatch] = None) -> QueryType:
         """
-        Clasificación basada en reglas simples (más rápida).
+        Versión asíncrona de classify_query.
 
         Args:
             query: Consulta del usuario
+            rules: Resultado de analyze_query para la consulta, si ya se calculó
 
         Returns:
-            QueryType si se puede clasificar, None si no
+            Tipo de consulta (QueryType)
+        """
+        rule_based = rules.query_type if rules else self._rule_based_classification(query)
+        if rule_based:
+            logger.info(f"Clasificación basada en reglas: {rule_based.value}")
+            return rule_based
+
+        cached = self._get_cached_classification(query)
+        if cached:
+            return cached
+
+        local = await self._alocal_classification(query)
+        if local:
+            return local
+
+        logger.info("Usando LLM para clasificación (async)")
+        try:
+            formatted_prompt = self.routing_prompt.format(query=query)
+            response = await self.llm.ainvoke(formatted_prompt, config=self._llm_config())
+            query_type = self._parse_llm_classification(response.content)
+            self._cache_classification(query, query_type)
+            return query_type
+
+        except Exception as e:
+            logger.error(f"Error en clasificación: {e}")
+            return QueryType.GENERAL
+
+    def _llm_config(self) -> Optional[dict]:
+        """Config de las llamadas al LLM (callbacks de métricas, si hay registro)."""
+        return self.metrics.llm_config() if self.metrics is not None else None
+
+    def _local_classification(self, query: str) -> QueryType | None:
+        """Clasifica con el clasificador local; None si no hay o no está seguro."""
+        if self.intent_classifier is None:
+            return None
+
+        try:
+            return self.intent_classifier.classify(query)
+        except Exception as e:
+            logger.error(f"Error en clasificador local: {e}")
+            return None
+
+    async def _alocal_classification(self, query: str) -> QueryType | None:
+        """Versión asíncrona de _local_classification."""
+        if self.intent_classifier is None:
+            return None
+
+        try:
+            return await self.intent_classifier.aclassify(query)
+        except Exception as e:
+            logger.error(f"Error en clasificador local: {e}")
+            return None
+
+    def _get_cached_classification(self, query: str) -> QueryType | None:
+        """Busca en el caché una clasificación previa del LLM."""
+        if self.cache is None:
+            return None
+
+        value = self.cache.get(normalize_query(query))
+        if value is None:
+            return None
+
+        logger.info(f"Clasificación desde caché: {value}")
+        return QueryType(value)
+
+    def _cache_classification(self, query: str, query_type: QueryType) -> None:
+        """Guarda en el caché la clasificación obtenida del LLM."""
+        if self.cache is not None:
+            self.cache.put(normalize_query(query), query_type.value)
+
+    def _parse_llm_classification(self, content: str) -> QueryType:
+        """
+        Mapea la respuesta del LLM a un QueryType.
+
+        Args:
+            content: Texto devuelto por el LLM
+
+        Returns:
+            Tipo de consulta (QueryType)
+        """
+        classification = content.strip().lower()
+
+        if "balance" in classification:
+            query_type = QueryType.BALANCE
+        elif "knowledge" in classification:
+            query_type = QueryType.KNOWLEDGE
+        else:
+            query_type = QueryType.GENERAL
+
+        logger.info(f"Consulta clasificada como: {query_type.value}")
+        return query_type
+
+    def analyze_query(self, query: str) -> RuleMatch:
+        """
+        Clasifica la consulta y extrae la cédula con la tabla precompilada.
+
+        La consulta se pasa a minúsculas y se busca "V-XXXXXXXX" una sola vez
+        para ambas tareas. El agente la usa antes de classify_query y pasa
+        la cédula al manejo de consultas de balance.
+
+        Args:
+            query: Consulta del usuario
+
+        Returns:
+            RuleMatch con el tipo de consulta (o None) y la cédula (o None)
         """
         query_lower = query.lower()
+        cedula_v = _CEDULA_V_REGEX.search(query_lower)
+        return RuleMatch(
+            query_type=self._classify_lowered(query_lower, cedula_v),
+            cedula=self._extract_lowered(query_lower, cedula_v),
+        )
 
-        # Patrones para BALANCE
-        balance_keywords = [
-            r"balance",
-            r"saldo",
-            r"cuanto.*dinero",
-            r"cuanto.*tengo",
-            r"estado.*cuenta",
-            r"consultar.*cuenta",
-            r"cedula.*v-\d+",
-            r"cédula.*v-\d+",
-        ]
-
-        for pattern in balance_keywords:
-            if re.search(pattern, query_lower):
-                return QueryType.BALANCE
-
-        # Patrones para KNOWLEDGE
-        knowledge_keywords = [
-            r"como.*abrir.*cuenta",
-            r"como.*solicitar.*tarjeta",
-            r"como.*transferir",
-            r"como.*hacer.*transferencia",
-            r"requisitos.*para",
-            r"informacion.*sobre",
-            r"información.*sobre",
-            r"que.*necesito.*para",
-            r"pasos.*para",
-            r"procedimiento",
-            r"tarjeta.*credito",
-            r"tarjeta.*crédito",
-            r"cuenta.*ahorro",
-        ]
-
-        for pattern in knowledge_keywords:
-            if re.search(pattern, query_lower):
-                return QueryType.KNOWLEDGE
-
-        # Si contiene cédula venezolana, es balance
-        if re.search(r"v-\d{7,8}", query_lower):
-            return QueryType.BALANCE
+    def _rule_based_classification(self, query: str) -> QueryType | None:
+        """
+        Clasificación basada en reglas simples (más rápida).
 
-        return None
+        Args:
+            query: Consulta del usuario
+
+        Returns:
+            QueryType si se puede clasificar, None si no
+        """
+        return self._classify_lowered(query.lower())
 
     def extract_cedula(self, query: str) -> str | None:
         """
@@ -177,28 +361,49 @@ Tu respuesta:""",
         Returns:
             Número de cédula en formato "V-XXXXXXXX" o None
         """
-        # Buscar patrón de cédula venezolana
-        patterns = [
-            r"(V-\d{7,8})",
-            r"v-(\d{7,8})",
-            r"cedula\s*(\d{7,8})",
-            r"cédula\s*(\d{7,8})",
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, query, re.IGNORECASE)
-            if match:
-                cedula = match.group(1) if match.lastindex == 1 else match.group(0)
-                # Normalizar formato
-                cedula = cedula.upper()
-                if not cedula.startswith("V-"):
-                    cedula = f"V-{cedula.replace('V-', '').replace('v-', '')}"
-                logger.info(f"Cédula extraída: {cedula}")
-                return cedula
-
-        logger.warning("No se pudo extraer cédula de la consulta")
+        cedula = self._extract_lowered(query.lower())
+
+        if cedula:
+            logger.info(f"Cédula extraída: {cedula}")
+        else:
+            logger.warning("No se pudo extraer cédula de la consulta")
+        return cedula
+
+    def _classify_lowered(
+        self, query_lower: str, cedula_v: Optional[re.Match] = None
+    ) -> QueryType | None:
+        """Clasifica una consulta ya pasada a minúsculas según la tabla de routing."""
+        # Prioridad: palabras clave de balance > knowledge > cédula suelta
+        if _BALANCE_REGEX.search(query_lower):
+            return QueryType.BALANCE
+        if _KNOWLEDGE_REGEX.search(query_lower):
+            return QueryType.KNOWLEDGE
+        if cedula_v or _CEDULA_V_REGEX.search(query_lower):
+            return QueryType.BALANCE
         return None
 
+    def _extract_lowered(
+        self, query_lower: str, cedula_v: Optional[re.Match] = None
+    ) -> str | None:
+        """Extrae la cédula de una consulta ya pasada a minúsculas."""
+        # Prioridad: "V-XXXXXXXX" > "cédula XXXXXXXX"
+        match = (
+            cedula_v
+            or _CEDULA_V_REGEX.search(query_lower)
+            or _CEDULA_WORD_REGEX.search(query_lower)
+        )
+        return f"V-{match.group(1)}" if match else None
+
+    def get_cache_stats(self) -> Dict[str, any]:
+        """
+        Obtiene métricas del caché de clasificaciones.
+
+        Returns:
+            Diccionario con hits, misses, tasa de acierto y tamaño
+            (vacío si el caché está deshabilitado)
+        """
+        return self.cache.get_stats() if self.cache is not None else {}
+
     def get_routing_stats(self) -> Dict[str, int]:
         """
         Obtiene estadísticas de routing (para debugging).
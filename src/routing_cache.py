@@ -0,0 +1,197 @@
+"""
+Caché LRU de decisiones de routing.
+Evita repetir la clasificación por LLM para consultas ya vistas.
+"""
+
+import atexit
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.config import (
+    ROUTING_CACHE_MAX_SIZE,
+    ROUTING_CACHE_PATH,
+    ROUTING_CACHE_SAVE_DELAY_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normaliza una consulta para usarla como clave del caché.
+
+    Pasa a minúsculas, elimina acentos y signos de puntuación y colapsa
+    espacios, de modo que "¡Hola!" y "hola" comparten la misma clave.
+
+    Args:
+        query: Consulta del usuario
+
+    Returns:
+        Consulta normalizada
+    """
+    text = unicodedata.normalize("NFKD", query.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s-]", " ", text)
+    return " ".join(text.split())
+
+
+class RoutingCache:
+    """Caché LRU thread-safe de consulta normalizada -> tipo de consulta."""
+
+    def __init__(
+        self,
+        max_size: int = ROUTING_CACHE_MAX_SIZE,
+        persist_path: Optional[Path] = ROUTING_CACHE_PATH,
+        save_delay: float = ROUTING_CACHE_SAVE_DELAY_SECONDS,
+    ):
+        """
+        Inicializa el caché de routing.
+
+        Args:
+            max_size: Número máximo de entradas
+            persist_path: Archivo JSON donde persistir el caché (None = solo memoria)
+            save_delay: Segundos que se agrupan los cambios antes de escribirlos
+                en un thread de fondo (0 = escribir en cada put). Los cambios
+                pendientes se escriben también con flush() y al salir del proceso
+        """
+        if max_size < 1:
+            raise ValueError("max_size debe ser al menos 1")
+
+        self.max_size = max_size
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.save_delay = save_delay
+
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+
+        self.hits = 0
+        self.misses = 0
+
+        if self.persist_path:
+            if self.persist_path.exists():
+                self._load()
+            atexit.register(self.flush)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Obtiene la clasificación almacenada para una consulta normalizada.
+
+        Args:
+            key: Consulta normalizada
+
+        Returns:
+            Valor del tipo de consulta (ej: "general") o None
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        """
+        Almacena la clasificación de una consulta normalizada.
+
+        Args:
+            key: Consulta normalizada
+            value: Valor del tipo de consulta
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._dirty = True
+        self._schedule_save()
+
+    def clear(self) -> None:
+        """Elimina todas las entradas del caché."""
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+        self._schedule_save()
+
+    def flush(self) -> None:
+        """Escribe en disco los cambios pendientes (no hace nada si no hay)."""
+        if not self.persist_path:
+            return
+        # La copia se toma con el lock de escritura tomado: las escrituras
+        # quedan en el mismo orden que las copias y una más vieja nunca
+        # pisa a una más nueva
+        with self._write_lock:
+            with self._lock:
+                self._save_timer = None
+                if not self._dirty:
+                    return
+                snapshot = dict(self._entries)
+                self._dirty = False
+            self._save(snapshot)
+
+    def get_stats(self) -> Dict[str, any]:
+        """
+        Obtiene métricas del caché.
+
+        Returns:
+            Diccionario con hits, misses, tasa de acierto y tamaño
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups * 100 if lookups > 0 else 0,
+                "size": len(self._entries),
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> None:
+        """Carga el caché persistido en disco (las entradas más recientes al final)."""
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            for key, value in list(entries.items())[-self.max_size :]:
+                self._entries[key] = value
+            logger.info(f"Caché de routing cargado: {len(self._entries)} entradas")
+        except Exception as e:
+            logger.error(f"Error al cargar caché de routing: {e}")
+
+    def _schedule_save(self) -> None:
+        """Programa la escritura de los cambios (una por ventana de save_delay)."""
+        if not self.persist_path:
+            return
+        if self.save_delay <= 0:
+            self.flush()
+            return
+        with self._lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(self.save_delay, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _save(self, entries: Dict[str, str]) -> None:
+        """Escribe el caché en disco de forma atómica (con el lock de escritura tomado)."""
+        tmp_path = self.persist_path.with_suffix(self.persist_path.suffix + ".tmp")
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            logger.error(f"Error al guardar caché de routing: {e}")
@@ -0,0 +1,178 @@
+"""
+Caché semántico de respuestas.
+Reutiliza respuestas de consultas previas cuyo embedding es suficientemente
+similar al de la consulta actual (similaridad coseno).
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.config import (
+    SEMANTIC_CACHE_MAX_SIZE,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CacheEntry:
+    """Entrada del caché: respuesta almacenada y momento de creación."""
+
+    value: Dict[str, any]
+    created_at: float
+
+
+class SemanticCache:
+    """Caché LRU/TTL indexado por embeddings de consultas."""
+
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_size: int = SEMANTIC_CACHE_MAX_SIZE,
+        ttl_seconds: Optional[float] = SEMANTIC_CACHE_TTL_SECONDS,
+    ):
+        """
+        Inicializa el caché semántico.
+
+        Args:
+            threshold: Similaridad coseno mínima para considerar un hit
+            max_size: Número máximo de entradas (se desaloja la menos usada)
+            ttl_seconds: Tiempo de vida de cada entrada (None = sin expiración)
+        """
+        if max_size < 1:
+            raise ValueError("max_size debe ser al menos 1")
+
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        # slot -> entrada, en orden LRU (la más reciente al final)
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        # Matriz preasignada de embeddings normalizados, una fila por slot
+        self._vectors: Optional[np.ndarray] = None
+        self._free_slots: List[int] = list(range(max_size - 1, -1, -1))
+        # Momento de creación por slot (para desalojar expiradas sin recorrer entradas)
+        self._created_at = np.zeros(max_size, dtype=np.float64)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, embedding: List[float]) -> Optional[Dict[str, any]]:
+        """
+        Busca una respuesta para una consulta similar.
+
+        Args:
+            embedding: Embedding de la consulta
+
+        Returns:
+            Respuesta almacenada o None si no hay hit
+        """
+        query_vector = self._normalize(embedding)
+
+        with self._lock:
+            # Desalojar las expiradas antes de elegir: una entrada vencida
+            # no debe ocultar otra vigente que también supera el umbral
+            self._remove_expired()
+            if not self._entries or self._vectors is None:
+                self.misses += 1
+                return None
+
+            slots = np.fromiter(self._entries.keys(), dtype=np.int64)
+            similarities = self._vectors[slots] @ query_vector
+            best = int(np.argmax(similarities))
+            best_slot = int(slots[best])
+            best_score = float(similarities[best])
+
+            if best_score < self.threshold:
+                self.misses += 1
+                return None
+
+            entry = self._entries[best_slot]
+            self._entries.move_to_end(best_slot)
+            self.hits += 1
+
+        logger.info(f"Hit en caché semántico (similaridad {best_score:.3f})")
+        return entry.value
+
+    def put(self, embedding: List[float], value: Dict[str, any]) -> None:
+        """
+        Almacena una respuesta asociada al embedding de su consulta.
+
+        Args:
+            embedding: Embedding de la consulta
+            value: Respuesta a almacenar
+        """
+        vector = self._normalize(embedding)
+
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_size, vector.shape[0]), dtype=np.float32)
+
+            if not self._free_slots:
+                oldest_slot = next(iter(self._entries))
+                self._remove(oldest_slot)
+                self.evictions += 1
+
+            slot = self._free_slots.pop()
+            created_at = time.monotonic()
+            self._vectors[slot] = vector
+            self._created_at[slot] = created_at
+            self._entries[slot] = _CacheEntry(value=value, created_at=created_at)
+
+    def clear(self) -> None:
+        """Elimina todas las entradas (p. ej. al recargar la base de conocimientos)."""
+        with self._lock:
+            self._entries.clear()
+            self._vectors = None
+            self._free_slots = list(range(self.max_size - 1, -1, -1))
+        logger.info("Caché semántico invalidado")
+
+    def get_stats(self) -> Dict[str, any]:
+        """
+        Obtiene métricas del caché.
+
+        Returns:
+            Diccionario con hits, misses, tasa de acierto y tamaño
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups * 100 if lookups > 0 else 0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, slot: int) -> None:
+        """Libera un slot (debe llamarse con el lock tomado)."""
+        del self._entries[slot]
+        self._free_slots.append(slot)
+
+    def _remove_expired(self) -> None:
+        """Libera los slots de las entradas expiradas (debe llamarse con el lock tomado)."""
+        if self.ttl_seconds is None:
+            return
+        slots = np.fromiter(self._entries.keys(), dtype=np.int64, count=len(self._entries))
+        deadline = time.monotonic() - self.ttl_seconds
+        for slot in slots[self._created_at[slots] < deadline]:
+            self._remove(int(slot))
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
@@ -0,0 +1,110 @@
+"""
+Tests del servicio HTTP (src/api.py).
+"""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.agent import CustomerServiceAgent
+from src.api import create_app
+from src.router import QueryType
+
+
+def create_agent() -> CustomerServiceAgent:
+    """Agente con LLM falso; las consultas no de balance se clasifican como generales."""
+    with patch("src.agent.SEMANTIC_CACHE_ENABLED", False), patch(
+        "src.agent.INTENT_CLASSIFIER_ENABLED", False
+    ):
+        agent = CustomerServiceAgent()
+    agent.llm = FakeListChatModel(responses=["Hola, bienvenido a BANCO HENRY"])
+    agent.router.aclassify_query = AsyncMock(return_value=QueryType.GENERAL)
+    return agent
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Cliente HTTP sobre la aplicación (con lifespan)."""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr("src.config.OPENAI_API_KEY", "sk-test")
+    with TestClient(create_app(agent_factory=create_agent, warmup=False)) as client:
+        yield client
+
+
+class TestAPI:
+    """Tests para los endpoints del servicio."""
+
+    def test_query(self, client):
+        """Test que /query retorna la respuesta completa del agente."""
+        response = client.post("/query", json={"query": "Hola"})
+
+        assert response.status_code == 200
+        assert response.json()["query_type"] == "general"
+        assert response.json()["response"] == "Hola, bienvenido a BANCO HENRY"
+
+    def test_query_validation(self, client):
+        """Test que una consulta vacía se rechaza."""
+        assert client.post("/query", json={"query": ""}).status_code == 422
+
+    def test_query_stream(self, client):
+        """Test que /query/stream emite tokens NDJSON y un evento final."""
+        with client.stream("POST", "/query/stream", json={"query": "Hola"}) as response:
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+            events = [json.loads(line) for line in response.iter_lines() if line]
+
+        tokens = [event["content"] for event in events if event["type"] == "token"]
+        assert len(tokens) > 1
+        assert events[-1]["type"] == "end"
+        assert "".join(tokens) == events[-1]["result"]["response"]
+
+    def test_balance(self, client):
+        """Test de consulta de balance directa."""
+        response = client.get("/balance/V-12345678")
+
+        assert response.status_code == 200
+        assert response.json()["nombre"] == "Juan Pérez"
+
+    def test_balance_not_found(self, client):
+        """Test que una cédula inexistente retorna 404."""
+        assert client.get("/balance/V-00000000").status_code == 404
+
+    def test_stats(self, client):
+        """Test que /stats incluye estadísticas del agente y del servidor."""
+        client.post("/query", json={"query": "Hola"})
+        stats = client.get("/stats").json()
+
+        assert stats["total_queries"] == 1
+        assert stats["server"]["in_flight"] == 0
+
+    def test_metrics(self, client):
+        """Test que /metrics expone las métricas en formato Prometheus."""
+        client.post("/query", json={"query": "Hola"})
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'customer_service_queries_total{query_type="general"} 1' in response.text
+        assert 'customer_service_stage_latency_seconds_count{stage="query"} 1' in response.text
+        assert "customer_service_http_rejected_total 0" in response.text
+
+    def test_backpressure(self, monkeypatch):
+        """Test que sin capacidad disponible se responde 503 con Retry-After."""
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setattr("src.config.OPENAI_API_KEY", "sk-test")
+        app = create_app(agent_factory=create_agent, max_in_flight=0, warmup=False)
+
+        with TestClient(app) as client:
+            response = client.post("/query", json={"query": "Hola"})
+            stats = client.get("/stats").json()
+
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+        assert stats["server"]["rejected"] == 1
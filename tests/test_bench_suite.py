@@ -0,0 +1,71 @@
+"""
+Tests para la comparación contra una referencia de benchmarks/bench_suite.py.
+"""
+
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+BENCHMARKS_DIR = Path(__file__).parent.parent / "benchmarks"
+
+
+@pytest.fixture
+def bench_suite(monkeypatch):
+    """Importa la suite sin dejar LLM_BACKEND=fake en el entorno de los demás tests."""
+    monkeypatch.syspath_prepend(str(BENCHMARKS_DIR))
+    monkeypatch.setenv("LLM_BACKEND", "openai")
+    return importlib.import_module("bench_suite")
+
+
+def _result(median_us: float) -> dict:
+    return {"n": 1, "median_us": median_us, "p95_us": median_us, "ops_per_s": 1e6 / median_us}
+
+
+class TestCompare:
+    """Tests para el umbral de regresión."""
+
+    def test_same_code_never_fails(self, bench_suite):
+        """Test que dos mediciones del mismo código no se marcan como regresión."""
+        values = list(range(100))
+        baseline = {"sum": bench_suite.measure(sum, [values], 2_000)}
+        results = {"sum": bench_suite.measure(sum, [values], 2_000)}
+
+        assert bench_suite.compare(results, baseline, threshold=0.2, verbose=False) == []
+
+    def test_small_absolute_change_is_noise(self, bench_suite):
+        """Test que +70% sobre un caso de 1.4 µs no cuenta como regresión."""
+        regressions = bench_suite.compare(
+            {"csv.lookup": _result(2.4)}, {"csv.lookup": _result(1.4)}, 0.2, verbose=False
+        )
+
+        assert regressions == []
+
+    def test_large_change_is_regression(self, bench_suite):
+        """Test que un empeoramiento relativo y absoluto se reporta."""
+        regressions = bench_suite.compare(
+            {"faiss.search": _result(150.0)}, {"faiss.search": _result(100.0)}, 0.2, verbose=False
+        )
+
+        assert regressions == ["faiss.search"]
+
+    def test_min_delta_is_configurable(self, bench_suite):
+        """Test que min_delta_us=0 deja solo el umbral relativo."""
+        regressions = bench_suite.compare(
+            {"csv.lookup": _result(2.4)},
+            {"csv.lookup": _result(1.4)},
+            0.2,
+            min_delta_us=0.0,
+            verbose=False,
+        )
+
+        assert regressions == ["csv.lookup"]
+
+
+@pytest.fixture(autouse=True)
+def _forget_module():
+    """Evita que el módulo quede cacheado con el sys.path de otro test."""
+    yield
+    sys.modules.pop("bench_suite", None)
+    sys.modules.pop("bench_csv_lookup", None)
@@ -2,6 +2,13 @@
 Tests unitarios para el módulo de consultas CSV.
 """
 
+import os
+import shutil
+import threading
+import time
+from unittest.mock import patch
+
+import numpy as np
 import pytest
 import pandas as pd
 from pathlib import Path
@@ -9,7 +16,18 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.account_snapshot import (
+    SNAPSHOT_MANIFEST,
+    STALE_STAGING_SECONDS,
+    _remove_old_generations,
+    load_snapshot,
+    snapshot_path_for,
+    write_snapshot,
+)
+from src.account_store import ColumnarAccountStore, decode_cedula, encode_cedula
+from src.config import CSV_FILE
 from src.csv_query import CSVQueryManager, format_balance_response
+from src.metrics import Metrics
 
 
 @pytest.fixture
@@ -58,6 +76,14 @@ class TestCSVQueryManager:
         assert result["found"] == True
         assert result["cedula"] == "V-12345678"
 
+    def test_cedula_index_matches_dataframe(self, csv_manager):
+        """Test que el índice de cédulas cubre todas las filas del CSV."""
+        assert len(csv_manager.store.cedula_index) == csv_manager.df["ID_Cedula"].nunique()
+        for cedula in csv_manager.df["ID_Cedula"]:
+            result = csv_manager.get_balance_by_cedula(cedula)
+            assert result["found"] == True
+            assert result["cedula"] == cedula
+
     def test_get_balance_empty_cedula(self, csv_manager):
         """Test con cédula vacía."""
         with pytest.raises(ValueError):
@@ -91,6 +117,319 @@ class TestCSVQueryManager:
 
         assert len(results) > 0
 
+    @pytest.mark.parametrize("backend", ["pandas", "columnar"])
+    def test_search_by_name_accents_and_pagination(self, backend):
+        """Test búsqueda sin acentos, por prefijo y paginada, con ambos backends."""
+        manager = CSVQueryManager(backend=backend, snapshot=False)
+
+        assert list(manager.search_by_name("sanchez")["Nombre"]) == ["Carlos Sánchez"]
+        assert len(manager.search_by_name("ez", prefix=True)) == 0
+
+        everyone = list(manager.search_by_name("ez")["Nombre"])
+        first = list(manager.search_by_name("ez", limit=2)["Nombre"])
+        rest = list(manager.search_by_name("ez", offset=2)["Nombre"])
+        assert len(everyone) > 2
+        assert first + rest == everyone
+
+
+@pytest.fixture
+def columnar_manager():
+    """Fixture con el backend columnar sobre el CSV de ejemplo."""
+    return CSVQueryManager(backend="columnar", snapshot=False)
+
+
+@pytest.fixture
+def csv_copy(tmp_path):
+    """Copia del CSV de ejemplo (los snapshots se escriben junto al CSV)."""
+    path = tmp_path / "saldos.csv"
+    shutil.copy(CSV_FILE, path)
+    return path
+
+
+def append_account(path: Path, line: str) -> None:
+    """Agrega una fila al CSV."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+class TestColumnarBackend:
+    """Tests para el almacén columnar de cuentas."""
+
+    def test_same_results_as_pandas(self, csv_manager, columnar_manager):
+        """Test que ambos backends responden igual para todas las cédulas."""
+        for cedula in csv_manager.df["ID_Cedula"]:
+            assert columnar_manager.get_balance_by_cedula(cedula) == csv_manager.get_balance_by_cedula(cedula)
+
+        assert columnar_manager.get_balance_by_cedula("v-12345678 ")["found"] == True
+        assert columnar_manager.get_balance_by_cedula("V-99999999")["found"] == False
+
+    def test_search_by_name(self, columnar_manager):
+        """Test búsqueda por nombre parcial y sin distinguir mayúsculas."""
+        results = columnar_manager.search_by_name("PÉREZ")
+
+        assert list(results.columns) == ["ID_Cedula", "Nombre", "Balance"]
+        assert "Juan Pérez" in list(results["Nombre"])
+        assert len(columnar_manager.search_by_name("no existe")) == 0
+
+    def test_get_all_accounts(self, csv_manager, columnar_manager):
+        """Test que se materializan todas las cuentas, en el orden del archivo."""
+        expected = csv_manager.get_all_accounts().reset_index(drop=True)
+        actual = columnar_manager.get_all_accounts().reset_index(drop=True)
+
+        pd.testing.assert_frame_equal(actual, expected)
+
+    @pytest.mark.parametrize(
+        "query, prefix", [("a", False), ("ez", False), ("m", True), ("pérez", False)]
+    )
+    @pytest.mark.parametrize("offset", [0, 1, 3])
+    def test_search_pages_match_pandas(self, csv_manager, columnar_manager, query, prefix, offset):
+        """Test que la misma consulta y offset devuelven la misma página con ambos backends."""
+        expected = csv_manager.search_by_name(query, limit=4, offset=offset, prefix=prefix)
+        actual = columnar_manager.search_by_name(query, limit=4, offset=offset, prefix=prefix)
+
+        assert actual.to_dict("records") == expected.to_dict("records")
+
+    def test_duplicates_and_irregular_cedulas(self):
+        """Test que se conserva la primera aparición y se aceptan formatos irregulares."""
+        df = pd.DataFrame(
+            {
+                "ID_Cedula": ["V-20", "V-3", "V-20", "E-0099", "pasaporte X1"],
+                "Nombre": ["Primera", "Ñandú", "Duplicada", "Con ceros", "Irregular"],
+                "Balance": [1.0, 2.555, 3.0, 4.0, 5.0],
+            }
+        )
+        store = ColumnarAccountStore.from_dataframe(df)
+
+        assert len(store) == 4
+        assert list(store.keys) == sorted(store.keys)
+        assert store.find("V-20") == ("V-20", "Primera", 1.0)
+        assert store.find("V-3")[1] == "Ñandú"
+        assert store.find("E-0099") == ("E-0099", "Con ceros", 4.0)
+        assert store.find("PASAPORTE X1")[1] == "Irregular"
+        assert store.find("V-4") is None
+
+    def test_chunked_load_matches_full_load(self, csv_copy):
+        """Test que la lectura por bloques produce el mismo almacén."""
+        for line in ("V-12345678,Duplicada,1.0", "pasaporte X1,Irregular,2.0", "V-1,Nueva,3.0"):
+            append_account(csv_copy, line)
+
+        full = CSVQueryManager(csv_copy, backend="columnar", snapshot=False, chunk_rows=0)
+        chunked = CSVQueryManager(csv_copy, backend="columnar", snapshot=False, chunk_rows=2)
+
+        np.testing.assert_array_equal(chunked.store.keys, full.store.keys)
+        np.testing.assert_array_equal(chunked.store.name_buffer, full.store.name_buffer)
+        np.testing.assert_array_equal(chunked.store.name_offsets, full.store.name_offsets)
+        np.testing.assert_array_equal(chunked.store.balance_cents, full.store.balance_cents)
+        np.testing.assert_array_equal(chunked.store.file_rows, full.store.file_rows)
+        assert chunked.store.irregular_index == full.store.irregular_index
+        assert chunked.get_balance_by_cedula("V-12345678")["nombre"] != "Duplicada"
+
+    def test_chunked_load_logs_peak_memory(self, csv_copy, caplog):
+        """Test que el log de carga incluye el pico de memoria."""
+        with caplog.at_level("INFO", logger="src.csv_query"):
+            CSVQueryManager(csv_copy, backend="columnar", snapshot=False, chunk_rows=3)
+
+        assert "por bloques de 3 filas" in caplog.text
+        assert "pico de memoria" in caplog.text
+
+    def test_cedula_encoding_roundtrip(self):
+        """Test que la codificación de cédulas es reversible y conserva el orden."""
+        assert decode_cedula(encode_cedula("V-12345678")) == "V-12345678"
+        assert encode_cedula("V-1") < encode_cedula("V-2") < encode_cedula("V-10")
+        assert encode_cedula("V-012") is None
+
+    def test_unknown_backend(self):
+        """Test que un backend desconocido se rechaza."""
+        with pytest.raises(ValueError):
+            CSVQueryManager(backend="sqlite")
+
+
+class TestAccountSnapshot:
+    """Tests para el snapshot binario del backend columnar."""
+
+    def test_written_then_memory_mapped(self, csv_copy):
+        """Test que la primera carga escribe el snapshot y la siguiente lo mapea."""
+        first = CSVQueryManager(csv_copy, backend="columnar")
+        second = CSVQueryManager(csv_copy, backend="columnar")
+
+        assert first.loaded_from == "csv"
+        assert second.loaded_from == "snapshot"
+        assert isinstance(second.store.keys, np.memmap)
+        assert second.get_balance_by_cedula("V-12345678") == first.get_balance_by_cedula("V-12345678")
+        pd.testing.assert_frame_equal(
+            second.search_by_name("a", limit=4, offset=2), first.search_by_name("a", limit=4, offset=2)
+        )
+
+    def test_stale_snapshot_ignored(self, csv_copy):
+        """Test que un CSV modificado invalida el snapshot y se reescribe."""
+        CSVQueryManager(csv_copy, backend="columnar")
+        with open(csv_copy, "a", encoding="utf-8") as f:
+            f.write("V-11111111,Nueva Cuenta,10.0\n")
+
+        manager = CSVQueryManager(csv_copy, backend="columnar")
+        assert manager.loaded_from == "csv"
+        assert manager.get_balance_by_cedula("V-11111111")["found"] == True
+
+        reloaded = CSVQueryManager(csv_copy, backend="columnar")
+        assert reloaded.loaded_from == "snapshot"
+        assert reloaded.get_balance_by_cedula("V-11111111")["found"] == True
+
+        # Quedan la generación vigente y la anterior
+        generations = [p for p in snapshot_path_for(csv_copy).iterdir() if p.is_dir()]
+        assert len(generations) == 2
+
+    def test_writers_keep_published_generation(self, csv_copy):
+        """Test que un escritor no borra la generación que publicó otro."""
+        store = CSVQueryManager(csv_copy, backend="columnar", snapshot=False).store
+        path = snapshot_path_for(csv_copy)
+
+        # Otro escritor está armando su staging mientras se escribe
+        in_progress = path / ".gen-0-otro"
+        in_progress.mkdir(parents=True)
+
+        # A publica su manifiesto, B publica el suyo y recién entonces A limpia
+        with patch("src.account_snapshot._remove_old_generations"):
+            first = write_snapshot(store, csv_copy)
+        second = write_snapshot(store, csv_copy)
+        _remove_old_generations(path)
+
+        assert in_progress.exists()
+        assert first.exists() and second.exists()
+        assert load_snapshot(csv_copy) is not None
+
+    def test_out_of_order_publish_keeps_newer_generation(self, csv_copy):
+        """Test que una generación más nueva que la vigente no se borra."""
+        store = CSVQueryManager(csv_copy, backend="columnar", snapshot=False).store
+
+        # B arma su generación antes que A pero publica el manifiesto después
+        with patch("src.account_snapshot.time.time_ns", side_effect=[200, 100, 300]):
+            first = write_snapshot(store, csv_copy)
+            second = write_snapshot(store, csv_copy)
+            assert first.exists() and load_snapshot(csv_copy) is not None
+
+            # Con una generación posterior, la más vieja (100) ya no se conserva
+            third = write_snapshot(store, csv_copy)
+
+        assert first.exists() and third.exists()
+        assert not second.exists()
+
+    def test_stale_staging_removed(self, csv_copy):
+        """Test que el staging de una escritura interrumpida se borra."""
+        store = CSVQueryManager(csv_copy, backend="columnar", snapshot=False).store
+        abandoned = snapshot_path_for(csv_copy) / ".gen-0-abandonado"
+        abandoned.mkdir(parents=True)
+        old = time.time() - STALE_STAGING_SECONDS - 1
+        os.utime(abandoned, (old, old))
+
+        write_snapshot(store, csv_copy)
+
+        assert not abandoned.exists()
+
+    def test_concurrent_writers(self, csv_copy):
+        """Test que escritores simultáneos dejan siempre un snapshot cargable."""
+        store = CSVQueryManager(csv_copy, backend="columnar", snapshot=False).store
+
+        def write_many():
+            for _ in range(10):
+                write_snapshot(store, csv_copy)
+
+        threads = [threading.Thread(target=write_many) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert load_snapshot(csv_copy) is not None
+        assert len([p for p in snapshot_path_for(csv_copy).iterdir() if p.is_dir()]) <= 2
+
+    def test_pandas_backend_ignores_snapshot(self, csv_copy):
+        """Test que el backend pandas no escribe snapshots."""
+        manager = CSVQueryManager(csv_copy, backend="pandas")
+
+        assert manager.loaded_from == "csv"
+        assert not (snapshot_path_for(csv_copy) / SNAPSHOT_MANIFEST).exists()
+
+
+class TestHotReload:
+    """Tests para la recarga en caliente de las cuentas."""
+
+    @pytest.mark.parametrize("backend", ["pandas", "columnar"])
+    def test_reload_publishes_new_version(self, csv_copy, backend):
+        """Test que la recarga publica la versión nueva sin afectar a la anterior."""
+        metrics = Metrics()
+        manager = CSVQueryManager(csv_copy, backend=backend, metrics=metrics)
+        previous = manager.store
+
+        assert manager.reload() == False
+        append_account(csv_copy, "V-11111111,Nueva Cuenta,10.0")
+        assert manager.reload() == True
+
+        assert manager.store is not previous
+        assert manager.get_balance_by_cedula("V-11111111")["found"] == True
+        assert previous.find("V-11111111") is None
+        assert previous.find("V-12345678") is not None
+        assert manager.get_stats()["reloads"] == 1
+        assert metrics.get_latency_stats()["account_reload"]["count"] == 1
+
+    def test_reload_prebuilds_name_index(self, csv_copy):
+        """Test que si ya se buscaba por nombre, la recarga publica el índice construido."""
+        manager = CSVQueryManager(csv_copy)
+        assert manager.store.name_index_built == False
+        manager.search_by_name("pérez")
+
+        append_account(csv_copy, "V-11111111,Nueva Pérez,10.0")
+        manager.reload()
+
+        assert manager.store.name_index_built == True
+        assert "Nueva Pérez" in list(manager.search_by_name("perez")["Nombre"])
+
+    def test_failed_reload_keeps_previous_version(self, csv_copy):
+        """Test que un CSV inválido no reemplaza la versión en uso."""
+        metrics = Metrics()
+        manager = CSVQueryManager(csv_copy, metrics=metrics)
+        previous = manager.store
+
+        append_account(csv_copy, "V-11111111,Nueva Cuenta,no es un número")
+        with pytest.raises(ValueError):
+            manager.reload()
+
+        assert manager.store is previous
+        assert manager.get_balance_by_cedula("V-12345678")["found"] == True
+        stats = manager.get_stats()
+        assert stats["reload_failures"] == 1
+        assert stats["last_reload_error"]
+        assert metrics.get_counter("account_reload_errors") == 1
+
+    def test_staleness(self, csv_copy):
+        """Test que se reporta el tiempo desde el cambio no publicado."""
+        manager = CSVQueryManager(csv_copy)
+        assert manager.get_stats()["staleness_seconds"] == 0.0
+
+        append_account(csv_copy, "V-11111111,Nueva Cuenta,10.0")
+        changed_at = time.time() - 30
+        os.utime(csv_copy, (changed_at, changed_at))
+
+        assert manager.get_stats()["staleness_seconds"] >= 30
+        manager.reload()
+        assert manager.get_stats()["staleness_seconds"] == 0.0
+
+    def test_watcher_reloads_in_background(self, csv_copy):
+        """Test que el thread de recarga detecta el cambio del CSV."""
+        manager = CSVQueryManager(csv_copy)
+        manager.start_watching(interval=0.02, settle=0)
+        try:
+            assert manager.get_stats()["watching"] == True
+            append_account(csv_copy, "V-11111111,Nueva Cuenta,10.0")
+
+            deadline = time.monotonic() + 10
+            while manager.reloads == 0 and time.monotonic() < deadline:
+                time.sleep(0.02)
+            assert manager.get_balance_by_cedula("V-11111111")["found"] == True
+        finally:
+            manager.stop_watching()
+
+        assert manager.get_stats()["watching"] == False
+
 
 class TestFormatBalanceResponse:
     """Tests para la función de formateo de respuestas."""
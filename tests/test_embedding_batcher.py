@@ -0,0 +1,94 @@
+"""
+Tests unitarios para el micro-batching de embeddings.
+"""
+
+import asyncio
+
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.embedding_batcher import MicroBatchingEmbeddings
+
+
+class CountingEmbeddings:
+    """Embeddings falsos que registran el tamaño de cada llamada."""
+
+    def __init__(self):
+        self.embeddings = DeterministicFakeEmbedding(size=16)
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(len(texts))
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text):
+        return self.embeddings.embed_query(text)
+
+
+@pytest.fixture
+def base_embeddings():
+    """Embeddings base con registro de llamadas vacío."""
+    return CountingEmbeddings()
+
+
+class TestMicroBatchingEmbeddings:
+    """Tests para MicroBatchingEmbeddings."""
+
+    def test_concurrent_queries_are_batched(self, base_embeddings):
+        """Test que consultas concurrentes se embeben en pocas llamadas."""
+        embeddings = MicroBatchingEmbeddings(base_embeddings, max_batch_size=32)
+        texts = [f"consulta {i}" for i in range(20)]
+
+        async def embed_all():
+            return await asyncio.gather(*(embeddings.aembed_query(text) for text in texts))
+
+        vectors = asyncio.run(embed_all())
+
+        assert vectors == [base_embeddings.embed_query(text) for text in texts]
+        assert len(base_embeddings.calls) < len(texts)
+        assert embeddings.get_stats()["requests"] == len(texts)
+
+    def test_batch_size_limit(self, base_embeddings):
+        """Test que ningún lote supera max_batch_size."""
+        embeddings = MicroBatchingEmbeddings(base_embeddings, max_batch_size=4)
+
+        async def embed_all():
+            return await asyncio.gather(*(embeddings.aembed_query(str(i)) for i in range(10)))
+
+        asyncio.run(embed_all())
+
+        assert max(base_embeddings.calls) <= 4
+        assert sum(base_embeddings.calls) == 10
+
+    def test_sync_calls_pass_through(self, base_embeddings):
+        """Test que las llamadas síncronas no pasan por la cola."""
+        embeddings = MicroBatchingEmbeddings(base_embeddings)
+
+        assert embeddings.embed_query("hola") == base_embeddings.embed_query("hola")
+        assert embeddings.get_stats()["batches"] == 0
+
+    def test_error_propagates(self, base_embeddings, monkeypatch):
+        """Test que un error del modelo llega a cada consulta del lote."""
+        embeddings = MicroBatchingEmbeddings(base_embeddings)
+
+        def fail(texts):
+            raise RuntimeError("modelo no disponible")
+
+        monkeypatch.setattr(base_embeddings, "embed_documents", fail)
+
+        with pytest.raises(RuntimeError, match="modelo no disponible"):
+            asyncio.run(embeddings.aembed_query("hola"))
+
+    def test_multiple_event_loops(self, base_embeddings):
+        """Test que el envoltorio funciona en event loops sucesivos."""
+        embeddings = MicroBatchingEmbeddings(base_embeddings)
+
+        first = asyncio.run(embeddings.aembed_query("hola"))
+        second = asyncio.run(embeddings.aembed_query("hola"))
+
+        assert first == second
@@ -2,13 +2,22 @@
 Tests de integración para el sistema completo.
 """
 
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
 import pytest
 from pathlib import Path
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from langchain_core.retrievers import BaseRetriever
+
 from src.agent import CustomerServiceAgent
+from src.csv_query import CSVQueryManager
 from src.router import QueryType
 
 
@@ -147,6 +156,296 @@ class TestCustomerServiceAgent:
         assert stats["general_queries"] == 0
 
 
+class TestLazyInitialization:
+    """Tests para la inicialización lazy de componentes."""
+
+    def test_balance_query_does_not_load_knowledge_base(self):
+        """Test que una consulta de balance no carga el modelo ni el índice."""
+        with patch("src.knowledge_base.KnowledgeBaseManager") as kb_class:
+            agent = CustomerServiceAgent()
+            result = agent.process_query("Balance de la cédula V-12345678")
+
+        assert result["success"] == True
+        assert "Juan Pérez" in result["response"]
+        kb_class.assert_not_called()
+        assert set(agent.init_times) == {"csv_manager"}
+
+    def test_general_query_does_not_load_knowledge_base(self):
+        """Test que una consulta que las reglas no cubren tampoco carga la base de conocimientos."""
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+        with patch("src.knowledge_base.KnowledgeBaseManager") as kb_class:
+            agent = CustomerServiceAgent()
+            agent.router.llm = FakeListChatModel(responses=["general"])
+            agent.llm = FakeListChatModel(responses=["¡Hola! ¿En qué puedo ayudarte?"])
+            result = agent.process_query("Hola")
+
+        assert result["query_type"] == "general"
+        kb_class.assert_not_called()
+
+    def test_concurrent_first_use_initializes_once(self):
+        """Test que threads concurrentes comparten una única instancia."""
+        created = []
+
+        def slow_csv_manager(**kwargs):
+            created.append(threading.get_ident())
+            time.sleep(0.05)  # Ventana para que los demás threads compitan
+            return CSVQueryManager(**kwargs)
+
+        agent = CustomerServiceAgent()
+        managers = []
+        with patch("src.csv_query.CSVQueryManager", slow_csv_manager):
+            threads = [
+                threading.Thread(target=lambda: managers.append(agent.csv_manager))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len(created) == 1
+        assert all(manager is managers[0] for manager in managers)
+
+    def test_warmup_initializes_all_components(self):
+        """Test que warmup() inicializa todo y reporta los tiempos."""
+        with patch("src.knowledge_base.KnowledgeBaseManager"), patch(
+            "src.agent.INTENT_CLASSIFIER_ENABLED", False
+        ), patch.object(CustomerServiceAgent, "_build_knowledge_chain", lambda self: object()):
+            agent = CustomerServiceAgent()
+            init_times = agent.warmup()
+
+        assert set(init_times) == {"llm", "csv_manager", "kb_manager", "knowledge_chain"}
+        assert agent.knowledge_chain is agent.knowledge_chain
+
+    def test_index_change_rebuilds_chain(self):
+        """Test que al cambiar el índice el chain se reconstruye en el siguiente uso."""
+        with patch("src.knowledge_base.KnowledgeBaseManager"), patch.object(
+            CustomerServiceAgent, "_build_knowledge_chain", lambda self: object()
+        ):
+            agent = CustomerServiceAgent()
+            first_chain = agent.knowledge_chain
+            agent._on_index_changed()
+
+            assert agent.knowledge_chain is not first_chain
+
+
+class FakeRetriever(BaseRetriever):
+    """Retriever con documentos fijos."""
+
+    documents: list
+
+    def _get_relevant_documents(self, query, *, run_manager):
+        return self.documents
+
+
+@pytest.fixture
+def streaming_agent():
+    """Agente con LLM falso (responde en streaming carácter a carácter) y sin caché."""
+    from langchain_core.documents import Document
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    with patch("src.agent.SEMANTIC_CACHE_ENABLED", False):
+        agent = CustomerServiceAgent()
+    agent.llm = FakeListChatModel(responses=["Hola, bienvenido a BANCO HENRY"])
+    agent.knowledge_chain = SimpleNamespace(
+        retriever=FakeRetriever(
+            documents=[Document(page_content="Requisitos: cédula", metadata={"source": "cuentas.txt"})]
+        )
+    )
+    return agent
+
+
+def collect(events):
+    """Separa los tokens emitidos y el resultado del evento final."""
+    tokens = [event["content"] for event in events if event["type"] == "token"]
+    assert events[-1]["type"] == "end"
+    return tokens, events[-1]["result"]
+
+
+class TestStreaming:
+    """Tests para la API de streaming del agente."""
+
+    def test_general_query_streams_tokens(self, streaming_agent):
+        """Test que una consulta general emite varios tokens y luego el resultado."""
+        with patch.object(
+            streaming_agent.router, "classify_query", return_value=QueryType.GENERAL
+        ):
+            tokens, result = collect(list(streaming_agent.stream_query("Hola")))
+
+        assert len(tokens) > 1
+        assert "".join(tokens) == result["response"] == "Hola, bienvenido a BANCO HENRY"
+        assert result["query_type"] == "general"
+        assert streaming_agent.get_statistics()["general_queries"] == 1
+
+    def test_knowledge_query_includes_sources(self, streaming_agent):
+        """Test que el evento final incluye las fuentes de la respuesta."""
+        with patch.object(
+            streaming_agent.router, "classify_query", return_value=QueryType.KNOWLEDGE
+        ):
+            tokens, result = collect(list(streaming_agent.stream_query("¿Cómo abrir una cuenta?")))
+
+        assert "".join(tokens) == result["response"]
+        assert result["query_type"] == "knowledge"
+        assert result["source_documents"] == [
+            {"content": "Requisitos: cédula", "source": "cuentas.txt"}
+        ]
+
+    def test_balance_query_single_token(self, streaming_agent):
+        """Test que el balance (sin LLM) se emite completo en un único token."""
+        tokens, result = collect(list(streaming_agent.stream_query("Balance de la cédula V-12345678")))
+
+        assert tokens == [result["response"]]
+        assert result["query_type"] == "balance"
+        assert result["data"]["found"] == True
+
+    def test_balance_reuses_routing_cedula(self, streaming_agent):
+        """Test que la cédula sale de la misma pasada que clasifica (sin extraer otra vez)."""
+        with patch.object(
+            streaming_agent.router, "extract_cedula", side_effect=AssertionError("segunda pasada")
+        ):
+            result = streaming_agent.process_query("Balance de la cédula V-12345678")
+            streamed = collect(list(streaming_agent.stream_query("Saldo V-12345678")))[1]
+
+        assert result["cedula"] == streamed["cedula"] == "V-12345678"
+        assert result["data"]["found"] == True
+
+    def test_llm_error_ends_stream(self, streaming_agent):
+        """Test que un error del LLM termina el stream con un resultado de error."""
+        with patch.object(
+            streaming_agent.router, "classify_query", return_value=QueryType.GENERAL
+        ), patch.object(type(streaming_agent.llm), "stream", side_effect=RuntimeError("timeout")):
+            tokens, result = collect(list(streaming_agent.stream_query("Hola")))
+
+        assert tokens == [result["response"]]
+        assert result["success"] == False
+        assert result["error"] == "timeout"
+
+        stats = streaming_agent.get_statistics()
+        assert stats["errors"] == 1
+        assert stats["errors_by_type"] == {"general": 1}
+        assert stats["success_rate"] == 0
+
+    def test_llm_error_after_tokens(self, streaming_agent):
+        """Test que un fallo a mitad de respuesta no agrega el error como texto."""
+        from langchain_core.messages import AIMessageChunk
+
+        def failing_stream(*args, **kwargs):
+            yield AIMessageChunk(content="Hola, ")
+            yield AIMessageChunk(content="bienve")
+            raise RuntimeError("conexión cortada")
+
+        with patch.object(
+            streaming_agent.router, "classify_query", return_value=QueryType.GENERAL
+        ), patch.object(type(streaming_agent.llm), "stream", side_effect=failing_stream):
+            events = list(streaming_agent.stream_query("Hola"))
+        tokens, result = collect(events)
+
+        assert tokens == ["Hola, ", "bienve"]
+        assert events[-1]["error"] == True
+        assert result["success"] == False
+        assert result["error"] == "conexión cortada"
+        assert result["partial_response"] == "Hola, bienve"
+
+    def test_stage_latency(self, streaming_agent):
+        """Test que se registran la latencia por etapa y los tokens del LLM."""
+        with patch.object(
+            streaming_agent.router, "classify_query", return_value=QueryType.KNOWLEDGE
+        ):
+            list(streaming_agent.stream_query("¿Cómo abrir una cuenta?"))
+        list(streaming_agent.stream_query("Balance de la cédula V-12345678"))
+
+        latency = streaming_agent.get_statistics()["latency"]
+        for stage in ("extract_cedula", "csv_lookup", "retrieve", "llm_generate", "llm_first_token"):
+            assert latency[stage]["count"] == 1, stage
+        assert latency["route"]["count"] == latency["query"]["count"] == 2
+        assert streaming_agent.get_statistics()["llm"]["calls"] == 1
+
+    def test_async_stream(self, streaming_agent):
+        """Test que astream_query emite los mismos eventos."""
+
+        async def consume():
+            return [event async for event in streaming_agent.astream_query("Hola")]
+
+        with patch.object(
+            streaming_agent.router,
+            "aclassify_query",
+            AsyncMock(return_value=QueryType.GENERAL),
+        ):
+            tokens, result = collect(asyncio.run(consume()))
+
+        assert len(tokens) > 1
+        assert "".join(tokens) == result["response"]
+
+
+class CountingEmbeddings:
+    """Embeddings deterministas que cuentan las consultas embebidas."""
+
+    def __init__(self):
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+
+        self.embeddings = DeterministicFakeEmbedding(size=8)
+        self.queries = []
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return self.embeddings.embed_query(text)
+
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+
+
+@pytest.fixture
+def cached_knowledge_agent():
+    """Agente con caché semántico y una base de conocimientos falsa que cuenta embeddings."""
+    from langchain_core.documents import Document
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    with patch("src.agent.INTENT_CLASSIFIER_ENABLED", False):
+        agent = CustomerServiceAgent()
+    documents = [Document(page_content="Requisitos: cédula", metadata={"source": "cuentas.txt"})]
+    agent.llm = FakeListChatModel(responses=["Necesitas tu cédula"])
+    agent.kb_manager = SimpleNamespace(
+        embeddings=CountingEmbeddings(),
+        k=3,
+        vectorstore=SimpleNamespace(
+            similarity_search_by_vector=lambda embedding, k: documents,
+            asimilarity_search_by_vector=AsyncMock(return_value=documents),
+        ),
+    )
+    agent.knowledge_chain = SimpleNamespace()  # No debe usarse si hay embedding
+    return agent
+
+
+class TestKnowledgeEmbeddingReuse:
+    """Tests para la reutilización del embedding del caché en la recuperación."""
+
+    @pytest.mark.parametrize("mode", ["process", "aprocess", "stream"])
+    def test_cache_miss_embeds_once(self, cached_knowledge_agent, mode):
+        """Test que un fallo del caché no vuelve a embeber la consulta para recuperar."""
+        agent = cached_knowledge_agent
+        query = "¿Cómo abrir una cuenta?"
+        with patch.object(agent.router, "classify_query", return_value=QueryType.KNOWLEDGE), patch.object(
+            agent.router, "aclassify_query", AsyncMock(return_value=QueryType.KNOWLEDGE)
+        ):
+            if mode == "process":
+                result = agent.process_query(query)
+            elif mode == "aprocess":
+                result = asyncio.run(agent.aprocess_query(query))
+            else:
+                result = collect(list(agent.stream_query(query)))[1]
+
+            assert result["response"] == "Necesitas tu cédula"
+            assert result["source_documents"] == [
+                {"content": "Requisitos: cédula", "source": "cuentas.txt"}
+            ]
+            assert agent.kb_manager.embeddings.queries == [query]
+
+            # Segunda vez: hit del caché, sin llamar al LLM
+            assert agent.process_query(query)["cached"] == True
+        assert agent.get_statistics()["llm"]["calls"] == 1
+
+
 class TestEndToEndScenarios:
     """Tests de escenarios completos end-to-end."""
 
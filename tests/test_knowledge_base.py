@@ -0,0 +1,359 @@
+"""
+Tests unitarios para la base de conocimientos (indexación incremental).
+"""
+
+import shutil
+
+import faiss
+import numpy as np
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.config import KNOWLEDGE_BASE_DIR
+from src.knowledge_base import (
+    KnowledgeBaseManager,
+    build_faiss_index,
+    build_text_splitter,
+    set_search_params,
+)
+from src.mmap_docstore import DOCSTORE_DATA_FILENAME, MmapDocstore
+
+
+@pytest.fixture
+def kb_dir(tmp_path):
+    """Copia de la base de conocimientos en un directorio temporal."""
+    path = tmp_path / "knowledge_base"
+    shutil.copytree(KNOWLEDGE_BASE_DIR, path)
+    return path
+
+
+@pytest.fixture
+def kb_manager(tmp_path, kb_dir):
+    """KnowledgeBaseManager con embeddings falsos (sin descargar modelos)."""
+    return KnowledgeBaseManager(
+        index_path=tmp_path / "index",
+        knowledge_base_path=kb_dir,
+        embeddings=DeterministicFakeEmbedding(size=16),
+    )
+
+
+class TestIncrementalIndexing:
+    """Tests para la indexación incremental con manifiesto de hashes."""
+
+    def test_create_index_writes_manifest(self, kb_manager):
+        """Test que crear el índice guarda un manifiesto con cada archivo."""
+        manifest = kb_manager._read_manifest()
+
+        assert set(manifest["files"]) == {
+            "nueva_cuenta.txt",
+            "tarjeta_credito.txt",
+            "transferencia.txt",
+        }
+        indexed_ids = [i for f in manifest["files"].values() for i in f["ids"]]
+        assert kb_manager.vectorstore.index.ntotal == len(indexed_ids)
+
+    def test_update_without_changes(self, kb_manager):
+        """Test que sin cambios no se re-embebe nada."""
+        summary = kb_manager.update_index()
+
+        assert summary == {"added": [], "changed": [], "deleted": []}
+
+    def test_update_applies_added_changed_deleted(self, kb_manager, kb_dir):
+        """Test que solo se actualizan los archivos agregados, modificados o eliminados."""
+        (kb_dir / "prestamos.txt").write_text("Requisitos de préstamos", encoding="utf-8")
+        (kb_dir / "transferencia.txt").write_text("Nuevo procedimiento", encoding="utf-8")
+        (kb_dir / "tarjeta_credito.txt").unlink()
+
+        summary = kb_manager.update_index()
+
+        assert summary == {
+            "added": ["prestamos.txt"],
+            "changed": ["transferencia.txt"],
+            "deleted": ["tarjeta_credito.txt"],
+        }
+        manifest = kb_manager._read_manifest()
+        assert "tarjeta_credito.txt" not in manifest["files"]
+        assert manifest["files"]["transferencia.txt"]["ids"] == ["transferencia.txt#0"]
+        assert kb_manager.vectorstore.index.ntotal == len(
+            kb_manager.vectorstore.docstore._dict
+        )
+        contents = {
+            doc.page_content for doc in kb_manager.vectorstore.docstore._dict.values()
+        }
+        assert "Nuevo procedimiento" in contents
+        assert "Requisitos de préstamos" in contents
+
+    def test_changes_detected_on_reload(self, kb_manager, kb_dir, tmp_path, monkeypatch):
+        """Test que con KB_REFRESH_ON_LOAD al cargar el índice se aplican los cambios pendientes."""
+        import src.knowledge_base as knowledge_base
+
+        monkeypatch.setattr(knowledge_base, "KB_REFRESH_ON_LOAD", True)
+        (kb_dir / "transferencia.txt").write_text("Nuevo procedimiento", encoding="utf-8")
+
+        reloaded = KnowledgeBaseManager(
+            index_path=tmp_path / "index",
+            knowledge_base_path=kb_dir,
+            embeddings=DeterministicFakeEmbedding(size=16),
+        )
+
+        assert reloaded.update_index()["changed"] == []
+        assert reloaded.search("Nuevo procedimiento", k=3)
+
+    def test_load_does_not_refresh_by_default(self, kb_manager, kb_dir, tmp_path):
+        """Test que por defecto cargar el índice no lo modifica (lo actualiza el indexer)."""
+        (kb_dir / "transferencia.txt").write_text("Nuevo procedimiento", encoding="utf-8")
+        manifest_before = kb_manager.manifest_path.read_bytes()
+
+        KnowledgeBaseManager(
+            index_path=tmp_path / "index",
+            knowledge_base_path=kb_dir,
+            embeddings=DeterministicFakeEmbedding(size=16),
+        )
+
+        assert kb_manager.manifest_path.read_bytes() == manifest_before
+
+
+class TestChunking:
+    """Tests para el chunking de documentos."""
+
+    def test_chunks_preserve_source(self, kb_manager):
+        """Test que cada chunk conserva la ruta del documento de origen."""
+        docs = kb_manager.vectorstore.docstore._dict.values()
+
+        assert len(docs) > 3
+        for doc in docs:
+            assert Path(doc.metadata["source"]).name.endswith(".txt")
+            assert len(doc.page_content) <= kb_manager.chunk_size
+
+    def test_splits_on_sentence_boundaries(self):
+        """Test que se corta al final de una oración antes que a mitad de ella."""
+        splitter = build_text_splitter(chunk_size=60, chunk_overlap=0)
+        text = (
+            "Visita la sucursal más cercana con tu cédula. "
+            "¿Necesitas ayuda? Llama al centro de atención al cliente."
+        )
+
+        chunks = splitter.split_text(text)
+
+        assert chunks[0].endswith(".")
+        assert all(not chunk.startswith((".", "?")) for chunk in chunks)
+
+    def test_chunking_change_triggers_rebuild(self, kb_manager, kb_dir, tmp_path):
+        """Test que cambiar el tamaño de chunk reconstruye el índice completo."""
+        rechunked = KnowledgeBaseManager(
+            index_path=tmp_path / "index",
+            knowledge_base_path=kb_dir,
+            embeddings=DeterministicFakeEmbedding(size=16),
+            auto_load=False,
+            chunk_size=200,
+        )
+
+        summary = rechunked.update_index()
+
+        assert len(summary["added"]) == 3
+        assert rechunked._read_manifest()["chunking"]["size"] == 200
+
+
+class TestEmbeddingPipeline:
+    """Tests para el embedding en lotes y en múltiples procesos."""
+
+    def _index_contents(self, manager):
+        docstore = manager.vectorstore.docstore._dict
+        mapping = manager.vectorstore.index_to_docstore_id
+        vectors = manager.vectorstore.index.reconstruct_n(0, manager.vectorstore.index.ntotal)
+        return {mapping[i]: (docstore[mapping[i]].page_content, tuple(vectors[i])) for i in mapping}
+
+    def test_batched_build_preserves_ids(self, tmp_path, kb_dir, kb_manager):
+        """Test que lotes pequeños producen el mismo índice que un lote único."""
+        small_batches = KnowledgeBaseManager(
+            index_path=tmp_path / "index_small",
+            knowledge_base_path=kb_dir,
+            embeddings=DeterministicFakeEmbedding(size=16),
+            embedding_batch_size=2,
+        )
+
+        assert self._index_contents(small_batches) == self._index_contents(kb_manager)
+
+    def test_multiprocess_matches_single_process(self, tmp_path, kb_dir, kb_manager):
+        """Test que repartir el embedding en procesos no cambia el resultado."""
+        sharded = KnowledgeBaseManager(
+            index_path=tmp_path / "index_sharded",
+            knowledge_base_path=kb_dir,
+            embeddings=DeterministicFakeEmbedding(size=16),
+            embedding_batch_size=3,
+            embedding_workers=2,
+        )
+
+        assert self._index_contents(sharded) == self._index_contents(kb_manager)
+
+
+class TestAnnIndexes:
+    """Tests para los índices aproximados (IVF/HNSW/PQ)."""
+
+    @pytest.fixture
+    def vectors(self):
+        rng = np.random.default_rng(0)
+        return rng.standard_normal((2000, 16)).astype(np.float32)
+
+    @pytest.mark.parametrize("index_type", ["ivf_flat", "hnsw", "ivf_pq"])
+    def test_ann_recall_against_flat(self, vectors, index_type):
+        """Test que cada índice aproximado recupera casi los mismos vecinos."""
+        exact = build_faiss_index("flat", vectors)
+        exact.add(vectors)
+        index = build_faiss_index(index_type, vectors, nlist=16, pq_m=8)
+        index.add(vectors)
+        set_search_params(index, nprobe=16, ef_search=128)
+
+        queries = vectors[:50]
+        _, expected = exact.search(queries, 5)
+        _, found = index.search(queries, 5)
+
+        recall = np.mean([len(set(e) & set(f)) / 5 for e, f in zip(expected, found)])
+        assert recall >= (0.5 if index_type == "ivf_pq" else 0.95)
+
+    def test_small_corpus_falls_back_to_flat(self, vectors):
+        """Test que sin vectores suficientes para entrenar se usa un índice exacto."""
+        index = build_faiss_index("ivf_flat", vectors[:10], nlist=16)
+
+        assert isinstance(index, faiss.IndexFlatL2)
+
+    def test_unknown_index_type(self, tmp_path, kb_dir):
+        """Test que un tipo de índice inválido se rechaza al inicializar."""
+        with pytest.raises(ValueError):
+            KnowledgeBaseManager(
+                index_path=tmp_path / "index",
+                knowledge_base_path=kb_dir,
+                embeddings=DeterministicFakeEmbedding(size=16),
+                index_type="lsh",
+            )
+
+    def test_hnsw_index_search_and_update(self, tmp_path, kb_dir):
+        """Test que HNSW se reconstruye al modificar archivos (no admite borrados)."""
+        manager = KnowledgeBaseManager(
+            index_path=tmp_path / "index",
+            knowledge_base_path=kb_dir,
+            embeddings=DeterministicFakeEmbedding(size=16),
+            index_type="hnsw",
+            ef_search=32,
+        )
+
+        assert isinstance(manager.vectorstore.index, faiss.IndexHNSWFlat)
+        assert manager.vectorstore.index.hnsw.efSearch == 32
+        assert len(manager.search("cuenta de ahorros", k=2)) == 2
+
+        target = sorted(kb_dir.glob("*.txt"))[0]
+        target.write_text("Documento reescrito.", encoding="utf-8")
+        summary = manager.update_index()
+
+        assert summary["changed"] == [target.name]
+        assert isinstance(manager.vectorstore.index, faiss.IndexHNSWFlat)
+        assert manager.vectorstore.index.ntotal == sum(
+            len(entry["ids"]) for entry in manager._read_manifest()["files"].values()
+        )
+
+    def test_index_type_change_triggers_rebuild(self, kb_manager, kb_dir, tmp_path):
+        """Test que cambiar el tipo de índice reconstruye el índice completo."""
+        rebuilt = KnowledgeBaseManager(
+            index_path=tmp_path / "index",
+            knowledge_base_path=kb_dir,
+            embeddings=DeterministicFakeEmbedding(size=16),
+            auto_load=False,
+            index_type="hnsw",
+        )
+
+        summary = rebuilt.update_index()
+
+        assert len(summary["added"]) == 3
+        assert rebuilt._read_manifest()["index"]["type"] == "hnsw"
+
+
+class TestMmapLoading:
+    """Tests para la carga del índice con memory-mapping."""
+
+    def _mmap_manager(self, tmp_path, kb_dir):
+        return KnowledgeBaseManager(
+            index_path=tmp_path / "index",
+            knowledge_base_path=kb_dir,
+            embeddings=DeterministicFakeEmbedding(size=16),
+            mmap=True,
+        )
+
+    def test_mmap_search_matches_memory(self, kb_manager, kb_dir, tmp_path):
+        """Test que el índice mapeado devuelve los mismos resultados."""
+        mapped = self._mmap_manager(tmp_path, kb_dir)
+
+        assert isinstance(mapped.vectorstore.docstore, MmapDocstore)
+        for query in ["cuenta de ahorros", "tarjeta de crédito", "transferencia"]:
+            expected = kb_manager.search_with_score(query, k=3)
+            found = mapped.search_with_score(query, k=3)
+            assert [(d.page_content, d.metadata, s) for d, s in found] == [
+                (d.page_content, d.metadata, s) for d, s in expected
+            ]
+
+    def test_unknown_id(self, kb_manager, kb_dir, tmp_path):
+        """Test que un ID inexistente sigue el contrato de InMemoryDocstore."""
+        mapped = self._mmap_manager(tmp_path, kb_dir)
+
+        assert mapped.vectorstore.docstore.search("no-existe") == "ID no-existe not found."
+
+    def test_update_with_mmap(self, kb_manager, kb_dir, tmp_path):
+        """Test que la actualización incremental reabre el índice mapeado."""
+        mapped = self._mmap_manager(tmp_path, kb_dir)
+        (kb_dir / "transferencia.txt").write_text("Nuevo procedimiento", encoding="utf-8")
+
+        summary = mapped.update_index()
+
+        assert summary["changed"] == ["transferencia.txt"]
+        assert isinstance(mapped.vectorstore.docstore, MmapDocstore)
+        contents = [doc.page_content for doc in mapped.search("Nuevo procedimiento", k=20)]
+        assert "Nuevo procedimiento" in contents
+
+    def test_falls_back_without_mmap_docstore(self, kb_manager, kb_dir, tmp_path):
+        """Test que un índice sin docstore mapeable se carga en memoria."""
+        (kb_manager._index_dir() / DOCSTORE_DATA_FILENAME).unlink()
+
+        mapped = self._mmap_manager(tmp_path, kb_dir)
+
+        assert not isinstance(mapped.vectorstore.docstore, MmapDocstore)
+        assert len(mapped.search("cuenta", k=2)) == 2
+
+    def test_save_publishes_new_generation(self, kb_manager, kb_dir, tmp_path):
+        """Test que cada guardado escribe una generación nueva y conserva la anterior."""
+        old_dir = kb_manager._index_dir()
+        old_reader = self._mmap_manager(tmp_path, kb_dir)
+        ntotal = old_reader.vectorstore.index.ntotal
+
+        (kb_dir / "prestamos.txt").write_text("Requisitos de préstamos", encoding="utf-8")
+        kb_manager.update_index()
+        (kb_dir / "prestamos.txt").write_text("Préstamos personales", encoding="utf-8")
+        kb_manager.update_index()
+
+        new_dir = kb_manager._index_dir()
+        generations = sorted(p.name for p in (tmp_path / "index").iterdir() if p.is_dir())
+        assert new_dir.name.startswith("gen-") and new_dir != old_dir
+        assert len(generations) == 2 and new_dir.name in generations
+        assert not (tmp_path / "index" / "index.faiss").exists()
+
+        # El índice y el docstore de una generación siempre son de la misma versión
+        reloaded = self._mmap_manager(tmp_path, kb_dir)
+        assert reloaded.vectorstore.index.ntotal == len(reloaded.vectorstore.docstore) > ntotal
+        assert "Préstamos personales" in [doc.page_content for doc in reloaded.search("préstamos", k=20)]
+
+    def test_loads_index_without_generations(self, kb_manager, kb_dir, tmp_path):
+        """Test que un índice guardado en la raíz (sin generaciones) se sigue cargando."""
+        index_dir = tmp_path / "index"
+        generation = kb_manager._index_dir()
+        for path in generation.iterdir():
+            path.rename(index_dir / path.name)
+        generation.rmdir()
+        kb_manager.manifest_path.unlink()
+
+        legacy = self._mmap_manager(tmp_path, kb_dir)
+
+        assert legacy._index_dir() == index_dir
+        assert len(legacy.search("cuenta", k=2)) == 2
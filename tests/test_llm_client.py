@@ -0,0 +1,142 @@
+"""
+Tests unitarios para la fábrica de clientes LLM compartidos.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import llm_client
+from src.config import LLM_CONNECT_TIMEOUT_SECONDS, LLM_MAX_RETRIES
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients(monkeypatch):
+    """Clientes nuevos en cada test (backend OpenAI, con una API key de prueba)."""
+    # Independiente de LLM_BACKEND en el entorno (ej: "fake" sin red)
+    monkeypatch.setattr(llm_client, "LLM_BACKEND", "openai")
+    monkeypatch.setattr("src.config.OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    llm_client.reset_clients()
+    yield
+    llm_client.reset_clients()
+
+
+class TestLLMClient:
+    """Tests para get_chat_model y el pool HTTP compartido."""
+
+    def test_same_parameters_share_instance(self):
+        """Test que la misma configuración retorna la misma instancia."""
+        assert llm_client.get_chat_model("gpt-4", 0.0) is llm_client.get_chat_model("gpt-4", 0.0)
+
+    def test_models_share_http_pool(self):
+        """Test que distintos modelos usan el mismo pool de conexiones."""
+        router_llm = llm_client.get_chat_model("gpt-4", 0.0)
+        agent_llm = llm_client.get_chat_model("gpt-4", 0.7)
+
+        assert router_llm is not agent_llm
+        assert router_llm.http_client is agent_llm.http_client is llm_client.get_http_client()
+        assert router_llm.http_async_client is llm_client.get_async_http_client()
+
+    def test_client_configuration(self):
+        """Test que timeouts y reintentos vienen de la configuración."""
+        chat_model = llm_client.get_chat_model("gpt-4", 0.0)
+
+        assert chat_model.max_retries == LLM_MAX_RETRIES
+        assert llm_client.get_http_client().timeout.connect == LLM_CONNECT_TIMEOUT_SECONDS
+
+    def test_router_and_agent_share_client(self):
+        """Test que el router y el agente reutilizan el cliente compartido."""
+        from src.agent import CustomerServiceAgent
+
+        agent = CustomerServiceAgent(temperature=0.0)
+
+        assert agent.llm is agent.router.llm
+
+    def test_missing_api_key(self, monkeypatch):
+        """Test que sin API key se informa el error al crear el cliente."""
+        monkeypatch.setattr("src.config.OPENAI_API_KEY", None)
+
+        with pytest.raises(ValueError, match="OPENAI_API_KEY"):
+            llm_client.get_chat_model("gpt-4", 0.0)
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    """Backend "fake" sin API key configurada."""
+    monkeypatch.setattr("src.llm_client.LLM_BACKEND", "fake")
+    monkeypatch.setattr("src.config.OPENAI_API_KEY", None)
+
+
+class TestFakeBackend:
+    """Tests para el backend local determinista."""
+
+    def test_no_api_key_required(self, fake_backend):
+        """Test que el backend fake no necesita API key."""
+        from src.fake_llm import FakeChatModel
+
+        assert isinstance(llm_client.get_chat_model("gpt-4", 0.0), FakeChatModel)
+
+    def test_unknown_backend(self, monkeypatch):
+        """Test que un backend desconocido se informa al crear el cliente."""
+        monkeypatch.setattr("src.llm_client.LLM_BACKEND", "otro")
+
+        with pytest.raises(ValueError, match="Backend LLM desconocido"):
+            llm_client.get_chat_model("gpt-4", 0.0)
+
+    def test_deterministic_responses(self):
+        """Test que el mismo prompt produce la misma respuesta y latencia."""
+        from src.fake_llm import FakeChatModel
+
+        first = FakeChatModel(latency_ms=0, tokens_per_second=0)
+        second = FakeChatModel(latency_ms=0, tokens_per_second=0)
+
+        assert first.invoke("¿Qué servicios ofrecen?").content == second.invoke(
+            "¿Qué servicios ofrecen?"
+        ).content
+
+    def test_cedula_extraction_format(self):
+        """Test que responde a la extracción de cédula en el formato esperado."""
+        from src.fake_llm import FakeChatModel
+
+        agent_prompt = 'Consulta: "mi cédula es v-12345678"\n\nCédula:'
+        llm = FakeChatModel(latency_ms=0, tokens_per_second=0)
+
+        assert llm.invoke(agent_prompt).content == "V-12345678"
+        assert llm.invoke('Consulta: "hola"\n\nCédula:').content == "NONE"
+
+    def test_latency_and_token_rate(self):
+        """Test que el stream respeta la latencia al primer token y la velocidad."""
+        import time
+
+        from src.fake_llm import FakeChatModel
+
+        llm = FakeChatModel(
+            latency_ms=50, latency_sigma=0.0, tokens_per_second=200, response_tokens=20
+        )
+        start_time = time.perf_counter()
+        chunks = list(llm.stream("Hola"))
+        elapsed = time.perf_counter() - start_time
+
+        assert len(chunks) == 20
+        assert 0.05 + 20 / 200 <= elapsed < 0.5
+
+    def test_agent_runs_offline(self, fake_backend):
+        """Test que el agente procesa consultas con el backend fake, sin red."""
+        from src.agent import CustomerServiceAgent
+
+        with patch("src.agent.SEMANTIC_CACHE_ENABLED", False), patch(
+            "src.agent.INTENT_CLASSIFIER_ENABLED", False
+        ):
+            agent = CustomerServiceAgent()
+        agent.llm.latency_ms = 0
+        agent.llm.tokens_per_second = 0
+
+        result = agent.process_query("Hola, ¿qué tal?")
+
+        assert result["success"] == True
+        assert result["query_type"] == "general"
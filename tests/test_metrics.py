@@ -0,0 +1,122 @@
+"""
+Tests para las métricas por etapa (src/metrics.py).
+"""
+
+from unittest.mock import patch
+
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.fake_llm import FakeChatModel
+from src.metrics import LatencyHistogram, Metrics
+
+
+class TestLatencyHistogram:
+    """Tests para el histograma de latencias."""
+
+    def test_empty(self):
+        """Test que un histograma vacío reporta ceros."""
+        stats = LatencyHistogram().get_stats()
+
+        assert stats["count"] == 0
+        assert stats["p99_ms"] == 0.0
+
+    def test_quantiles_within_bucket(self):
+        """Test que los percentiles caen en el bucket correcto sin superar el máximo."""
+        histogram = LatencyHistogram(buckets=(0.01, 0.1, 1.0))
+        for _ in range(90):
+            histogram.observe(0.005)
+        for _ in range(10):
+            histogram.observe(0.5)
+
+        assert 0 < histogram.quantile(0.5) <= 0.01
+        assert 0.1 < histogram.quantile(0.99) <= 0.5
+        assert histogram.get_stats()["max_ms"] == pytest.approx(500)
+
+    def test_overflow_bucket(self):
+        """Test que las muestras mayores al último bucket se acotan al máximo observado."""
+        histogram = LatencyHistogram(buckets=(0.1,))
+        histogram.observe(3.0)
+
+        assert histogram.counts == [0, 1]
+        assert histogram.quantile(0.5) <= 3.0
+
+
+class TestMetrics:
+    """Tests para el registro de métricas."""
+
+    def test_time_records_on_exception(self):
+        """Test que el tiempo se registra aunque el bloque falle."""
+        metrics = Metrics()
+        with pytest.raises(RuntimeError):
+            with metrics.time("csv_lookup"):
+                raise RuntimeError("boom")
+
+        assert metrics.get_latency_stats()["csv_lookup"]["count"] == 1
+
+    def test_counters_with_labels(self):
+        """Test de contadores con etiquetas."""
+        metrics = Metrics()
+        metrics.increment("errors", query_type="knowledge")
+        metrics.increment("errors", query_type="knowledge")
+        metrics.increment("errors", query_type="general")
+
+        assert metrics.get_counter("errors") == 3
+        assert metrics.get_counter("errors", query_type="knowledge") == 2
+        assert metrics.get_counter_values("errors", "query_type") == {"knowledge": 2, "general": 1}
+
+    def test_stage_order(self):
+        """Test que las etapas se reportan en el orden del pipeline."""
+        metrics = Metrics()
+        for stage in ("llm_generate", "route", "csv_lookup"):
+            metrics.observe(stage, 0.001)
+
+        assert list(metrics.get_latency_stats()) == ["route", "csv_lookup", "llm_generate"]
+
+    def test_prometheus_format(self):
+        """Test del formato de texto de Prometheus."""
+        metrics = Metrics(buckets=(0.01, 0.1), prefix="test")
+        metrics.observe("route", 0.005)
+        metrics.observe("route", 0.05)
+        metrics.increment("errors", query_type="general")
+
+        text = metrics.to_prometheus([("up", "gauge", "Servicio activo", {(): 1})])
+
+        assert "# TYPE test_stage_latency_seconds histogram" in text
+        assert 'test_stage_latency_seconds_bucket{stage="route",le="0.01"} 1' in text
+        assert 'test_stage_latency_seconds_bucket{stage="route",le="+Inf"} 2' in text
+        assert 'test_stage_latency_seconds_count{stage="route"} 2' in text
+        assert 'test_errors_total{query_type="general"} 1' in text
+        assert "test_up 1" in text
+
+    def test_llm_callbacks(self):
+        """Test que los callbacks registran latencia, tokens y tiempo al primer token."""
+        metrics = Metrics()
+        llm = FakeChatModel(latency_ms=0, tokens_per_second=0, responses=["uno dos tres"])
+
+        llm.invoke("hola", config=metrics.llm_config())
+        list(llm.stream("hola", config=metrics.llm_config()))
+
+        latency = metrics.get_latency_stats()
+        assert latency["llm_generate"]["count"] == 2
+        assert latency["llm_first_token"]["count"] == 1
+        assert metrics.get_counter("llm_calls") == 2
+        assert metrics.get_counter("llm_tokens", kind="completion") == 6
+        assert metrics.get_counter("llm_tokens", kind="prompt") == 2
+
+    def test_llm_errors(self):
+        """Test que los errores del LLM se cuentan."""
+        metrics = Metrics()
+        llm = FakeListChatModel(responses=["x"])
+
+        with patch.object(FakeListChatModel, "_call", side_effect=RuntimeError("timeout")):
+            with pytest.raises(RuntimeError):
+                llm.invoke("hola", config=metrics.llm_config())
+
+        assert metrics.get_counter("llm_errors") == 1
+        assert metrics.get_latency_stats()["llm_generate"]["count"] == 1
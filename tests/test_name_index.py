@@ -0,0 +1,107 @@
+"""
+Tests para el índice de búsqueda por nombre (src/name_index.py).
+"""
+
+import random
+
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.name_index import NameSearchIndex, fold_text
+
+NAMES = [
+    "Juan Pérez",
+    "María José González",
+    "José Pérez Gómez",
+    "Ana  GONZÁLEZ",
+    "Peña Núñez",
+    "",
+]
+
+
+@pytest.fixture
+def index():
+    """Fixture con un índice sobre nombres de ejemplo."""
+    return NameSearchIndex(NAMES)
+
+
+def scan(names, query, prefix=False):
+    """Referencia: recorrido lineal sobre los nombres normalizados."""
+    needle = " ".join(fold_text(query).split())
+    rows = []
+    for row, name in enumerate(names):
+        folded = " ".join(fold_text(name).split())
+        if prefix and needle:
+            found = folded.startswith(needle) or f" {needle}" in folded
+        else:
+            found = needle in folded
+        if found:
+            rows.append(row)
+    return rows
+
+
+class TestFoldText:
+    """Tests para la normalización de nombres."""
+
+    def test_accents_case_and_spaces(self):
+        """Test que se quitan acentos y mayúsculas y se colapsan los espacios."""
+        assert fold_text("José  PÉREZ Ñandú") == "jose perez nandu"
+        assert fold_text("a\nB") == "a\nb"
+
+
+class TestNameSearchIndex:
+    """Tests para las búsquedas por subcadena y prefijo."""
+
+    def test_substring(self, index):
+        """Test búsqueda por subcadena sin distinguir mayúsculas ni acentos."""
+        assert list(index.search("perez")) == [0, 2]
+        assert list(index.search("PÉR")) == [0, 2]
+        assert list(index.search("ez")) == [0, 1, 2, 3, 4]
+        assert list(index.search("no existe")) == []
+
+    def test_prefix(self, index):
+        """Test que el prefijo debe empezar al inicio de una palabra."""
+        assert list(index.search("gonz", prefix=True)) == [1, 3]
+        assert list(index.search("onz", prefix=True)) == []
+        assert list(index.search("onz")) == [1, 3]
+
+    def test_phrase(self, index):
+        """Test consultas de varias palabras."""
+        assert list(index.search("jose perez")) == [2]
+        assert list(index.search("se pe")) == [2]
+        assert list(index.search("se pe", prefix=True)) == []
+        assert list(index.search("jose pe", prefix=True)) == [2]
+
+    def test_prefix_phrase_first_word_is_complete(self):
+        """Test que con prefix y varias palabras la primera debe ser completa."""
+        index = NameSearchIndex(["Josefina Pérez", "José Pérez", "Ña Ézedd", "Ñe Ézedd"])
+
+        assert list(index.search("jose per", prefix=True)) == [1]
+        assert list(index.search("jose per")) == [1]
+        assert list(index.search("ñ e", prefix=True)) == []
+        assert list(index.search("ñe e", prefix=True)) == [3]
+
+    def test_empty_query_matches_all(self, index):
+        """Test que una consulta vacía coincide con todas las filas."""
+        assert list(index.search("")) == list(range(len(NAMES)))
+
+    def test_limit_and_offset(self, index):
+        """Test paginación en orden de fila."""
+        assert list(index.search("ez", limit=2)) == [0, 1]
+        assert list(index.search("ez", limit=2, offset=2)) == [2, 3]
+        assert list(index.search("jose p", limit=1, offset=1)) == []
+
+    def test_matches_linear_scan(self):
+        """Test que el índice coincide con un recorrido lineal en nombres aleatorios."""
+        rng = random.Random(0)
+        words = ["José", "Pérez", "Peña", "Ana", "Ángel", "Núñez", "Gómez", "Luz", "Díaz", "Li"]
+        names = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 4))) for _ in range(500)]
+        index = NameSearchIndex(names)
+
+        queries = ["e", "ez", "pe", "pérez", "z d", "jose pe", "ANA", "li", "gel nu", "ñez gó", "x"]
+        for query in queries:
+            assert list(index.search(query)) == scan(names, query), query
+            assert list(index.search(query, prefix=True)) == scan(names, query, prefix=True), query
@@ -3,12 +3,76 @@ Tests unitarios para el sistema de routing.
 """
 
 import pytest
+import re
+import time
 from pathlib import Path
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.router import QueryRouter, QueryType
+from src.router import (
+    BALANCE_PATTERNS,
+    KNOWLEDGE_PATTERNS,
+    QueryRouter,
+    QueryType,
+)
+from src.routing_cache import RoutingCache, normalize_query
+
+
+ROUTING_CORPUS = [
+    "¿Cuál es el balance de la cédula V-12345678?",
+    "Consultar saldo V-87654321",
+    "¿Cuánto dinero tengo en mi cuenta?",
+    "cuanto tengo disponible",
+    "Estado de cuenta",
+    "¿Cómo abrir una cuenta de ahorros?",
+    "como puedo abrir una cuenta",
+    "Requisitos para tarjeta de crédito",
+    "requisitos para consultar saldo",
+    "Información sobre transferencias",
+    "Procedimiento para transferir",
+    "La cédula V-99999999",
+    "cedula 12345678",
+    "CÉDULA 1234567 y también v-7654321",
+    "mi número es v-1234567",
+    "Hola, buenos días",
+    "¿Qué hora es?",
+    "Gracias\nmi saldo por favor",
+    "",
+    "Hola " * 100 + "¿Cómo abrir una cuenta?",
+]
+
+
+def legacy_rule_based_classification(query: str):
+    """Implementación original (patrones evaluados uno por uno) como referencia."""
+    query_lower = query.lower()
+    for pattern in BALANCE_PATTERNS:
+        if re.search(pattern, query_lower):
+            return QueryType.BALANCE
+    for pattern in KNOWLEDGE_PATTERNS:
+        if re.search(pattern, query_lower):
+            return QueryType.KNOWLEDGE
+    if re.search(r"v-\d{7,8}", query_lower):
+        return QueryType.BALANCE
+    return None
+
+
+def legacy_extract_cedula(query: str):
+    """Extracción original de cédula (cuatro búsquedas) como referencia."""
+    patterns = [
+        r"(V-\d{7,8})",
+        r"v-(\d{7,8})",
+        r"cedula\s*(\d{7,8})",
+        r"cédula\s*(\d{7,8})",
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, query, re.IGNORECASE)
+        if match:
+            cedula = match.group(1).upper()
+            if not cedula.startswith("V-"):
+                cedula = f"V-{cedula}"
+            return cedula
+    return None
 
 
 @pytest.fixture
@@ -150,6 +214,19 @@ class TestRuleBasedClassification:
         result = router._rule_based_classification(query)
         assert result == QueryType.KNOWLEDGE
 
+    def test_async_classification_rule_based(self, router):
+        """Test que aclassify_query usa las mismas reglas que classify_query."""
+        import asyncio
+
+        queries = [
+            "Balance de la cuenta V-12345678",
+            "¿Cómo abrir una cuenta de ahorros?",
+        ]
+
+        for query in queries:
+            result = asyncio.run(router.aclassify_query(query))
+            assert result == router._rule_based_classification(query)
+
     def test_rule_based_no_match(self, router):
         """Test cuando no hay match en reglas."""
         query = "Hola, buenos días"
@@ -157,6 +234,151 @@ class TestRuleBasedClassification:
         assert result is None
 
 
+class TestRoutingTable:
+    """Tests de la tabla de routing precompilada."""
+
+    @pytest.mark.parametrize("query", ROUTING_CORPUS)
+    def test_matches_legacy_classification(self, router, query):
+        """Test que la tabla compilada clasifica igual que los patrones originales."""
+        assert router._rule_based_classification(query) == (
+            legacy_rule_based_classification(query)
+        )
+
+    @pytest.mark.parametrize("query", ROUTING_CORPUS)
+    def test_matches_legacy_extraction(self, router, query):
+        """Test que la tabla compilada extrae la misma cédula que antes."""
+        assert router.extract_cedula(query) == legacy_extract_cedula(query)
+
+    @pytest.mark.parametrize("query", ROUTING_CORPUS)
+    def test_analyze_query_matches_legacy(self, router, query):
+        """Test que la pasada única da el mismo tipo y cédula que las dos búsquedas originales."""
+        assert router.analyze_query(query) == (
+            legacy_rule_based_classification(query),
+            legacy_extract_cedula(query),
+        )
+
+    def test_analyze_query_single_pass(self, router):
+        """Test que analyze_query retorna tipo y cédula a la vez."""
+        result = router.analyze_query("Balance de V-12345678")
+
+        assert result.query_type == QueryType.BALANCE
+        assert result.cedula == "V-12345678"
+
+
+class KeywordEmbeddings:
+    """Embeddings falsos: un eje por palabra clave (solo para tests)."""
+
+    VOCABULARY = ["saldo", "balance", "cuenta", "abrir", "tarjeta", "hola", "gracias"]
+
+    def embed_query(self, text):
+        text = text.lower()
+        return [float(word in text) for word in self.VOCABULARY] + [0.01]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+class TestIntentClassifier:
+    """Tests para el clasificador de intención local."""
+
+    @pytest.fixture
+    def classifier(self):
+        from src.intent_classifier import EmbeddingIntentClassifier
+
+        examples = {
+            QueryType.BALANCE: ["saldo", "balance"],
+            QueryType.KNOWLEDGE: ["abrir cuenta", "tarjeta"],
+            QueryType.GENERAL: ["hola", "gracias"],
+        }
+        return EmbeddingIntentClassifier(
+            KeywordEmbeddings(), examples=examples, threshold=0.6, min_margin=0.05
+        )
+
+    def test_confident_prediction(self, classifier):
+        """Test que una consulta cercana a un ejemplo se clasifica localmente."""
+        assert classifier.classify("hola que tal") == QueryType.GENERAL
+        assert classifier.classify("quiero una tarjeta") == QueryType.KNOWLEDGE
+
+    def test_low_confidence_escalates(self, classifier):
+        """Test que una consulta lejana a todos los ejemplos retorna None."""
+        assert classifier.classify("el clima de mañana") is None
+
+    def test_router_uses_local_classifier_before_llm(self, router, classifier):
+        """Test que el router no llama al LLM si el clasificador local está seguro."""
+        from unittest.mock import MagicMock
+
+        router.cache = None
+        router.intent_classifier = classifier
+        router.llm = MagicMock()
+        router.llm.invoke.return_value.content = "general"
+
+        assert router.classify_query("hola") == QueryType.GENERAL
+        router.llm.invoke.assert_not_called()
+
+        router.classify_query("el clima de mañana")
+        router.llm.invoke.assert_called_once()
+
+
+class TestRoutingCache:
+    """Tests para el caché de decisiones de routing."""
+
+    def test_normalize_query(self):
+        """Test que consultas equivalentes comparten clave."""
+        assert normalize_query("¡Hola!") == normalize_query("hola")
+        assert normalize_query("  Horarios   de ATENCIÓN? ") == "horarios de atencion"
+
+    def test_lru_eviction(self):
+        """Test que se desaloja la entrada menos usada recientemente."""
+        cache = RoutingCache(max_size=2, persist_path=None)
+        cache.put("hola", "general")
+        cache.put("gracias", "general")
+        cache.get("hola")
+        cache.put("adios", "general")
+
+        assert cache.get("hola") == "general"
+        assert cache.get("gracias") is None
+        assert cache.get_stats()["hits"] == 2
+
+    def test_persistence(self, tmp_path):
+        """Test que el caché sobrevive a un reinicio."""
+        path = tmp_path / "routing_cache.json"
+        cache = RoutingCache(max_size=10, persist_path=path, save_delay=60)
+        cache.put("hola", "general")
+        cache.put("gracias", "general")
+
+        # Las escrituras se agrupan: nada en disco hasta el flush
+        assert not path.exists()
+        cache.flush()
+
+        restored = RoutingCache(max_size=10, persist_path=path)
+        assert restored.get("hola") == "general"
+        assert restored.get("gracias") == "general"
+
+    def test_debounced_save(self, tmp_path):
+        """Test que el thread de fondo escribe una vez los cambios de la ventana."""
+        path = tmp_path / "routing_cache.json"
+        cache = RoutingCache(max_size=10, persist_path=path, save_delay=0.05)
+        cache.put("hola", "general")
+        cache.put("adios", "general")
+
+        deadline = time.monotonic() + 5
+        while not path.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert RoutingCache(max_size=10, persist_path=path).get("adios") == "general"
+
+    def test_router_skips_llm_on_cache_hit(self, router):
+        """Test que una consulta cacheada no llama al LLM."""
+        from unittest.mock import MagicMock
+
+        router.cache = RoutingCache(max_size=10, persist_path=None)
+        router.llm = MagicMock()
+        router.llm.invoke.return_value.content = "general"
+
+        assert router.classify_query("Hola") == QueryType.GENERAL
+        assert router.classify_query("¡hola!") == QueryType.GENERAL
+        assert router.llm.invoke.call_count == 1
+
+
 # Tests de integración
 class TestRouterIntegration:
     """Tests de integración para el router."""
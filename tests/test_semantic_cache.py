@@ -0,0 +1,87 @@
+"""
+Tests unitarios para el caché semántico de respuestas.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def cache():
+    """Fixture para crear un caché pequeño con umbral alto."""
+    return SemanticCache(threshold=0.95, max_size=2, ttl_seconds=None)
+
+
+class TestSemanticCache:
+    """Tests para SemanticCache."""
+
+    def test_miss_on_empty_cache(self, cache):
+        """Test que un caché vacío no retorna resultados."""
+        assert cache.get([1.0, 0.0, 0.0]) is None
+        assert cache.get_stats()["misses"] == 1
+
+    def test_hit_on_similar_embedding(self, cache):
+        """Test hit cuando la similaridad supera el umbral."""
+        cache.put([1.0, 0.0, 0.0], {"response": "abrir cuenta"})
+
+        result = cache.get([0.99, 0.05, 0.0])
+
+        assert result == {"response": "abrir cuenta"}
+        assert cache.get_stats()["hits"] == 1
+
+    def test_miss_on_dissimilar_embedding(self, cache):
+        """Test miss cuando la similaridad está bajo el umbral."""
+        cache.put([1.0, 0.0, 0.0], {"response": "abrir cuenta"})
+
+        assert cache.get([0.0, 1.0, 0.0]) is None
+
+    def test_lru_eviction(self, cache):
+        """Test que se desaloja la entrada menos usada recientemente."""
+        cache.put([1.0, 0.0, 0.0], {"response": "a"})
+        cache.put([0.0, 1.0, 0.0], {"response": "b"})
+        cache.get([1.0, 0.0, 0.0])  # "a" pasa a ser la más reciente
+        cache.put([0.0, 0.0, 1.0], {"response": "c"})
+
+        assert cache.get([1.0, 0.0, 0.0]) == {"response": "a"}
+        assert cache.get([0.0, 1.0, 0.0]) is None
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_ttl_expiration(self, monkeypatch):
+        """Test que las entradas expiradas no se retornan."""
+        import src.semantic_cache as semantic_cache
+
+        cache = SemanticCache(threshold=0.95, max_size=2, ttl_seconds=60)
+        monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: 1000.0)
+        cache.put([1.0, 0.0, 0.0], {"response": "a"})
+        monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: 1061.0)
+
+        assert cache.get([1.0, 0.0, 0.0]) is None
+        assert len(cache) == 0
+
+    def test_expired_best_match_does_not_hide_valid_entry(self, monkeypatch):
+        """Test que una entrada expirada más similar no impide el hit de otra vigente."""
+        import src.semantic_cache as semantic_cache
+
+        cache = SemanticCache(threshold=0.95, max_size=2, ttl_seconds=60)
+        monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: 1000.0)
+        cache.put([1.0, 0.0, 0.0], {"response": "vieja"})
+        monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: 1050.0)
+        cache.put([1.0, 0.1, 0.0], {"response": "vigente"})
+        monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: 1061.0)
+
+        assert cache.get([1.0, 0.0, 0.0]) == {"response": "vigente"}
+        assert len(cache) == 1
+        assert cache.get_stats()["hits"] == 1
+
+    def test_clear(self, cache):
+        """Test invalidación completa del caché."""
+        cache.put([1.0, 0.0, 0.0], {"response": "a"})
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.get([1.0, 0.0, 0.0]) is None